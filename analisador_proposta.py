@@ -10,6 +10,7 @@ import os
 # Verificar dependências críticas
 try:
     import pdfplumber
+    from paginas_pdf import iterar_paginas
     print("✓ pdfplumber importado com sucesso", file=sys.stderr)
 except ImportError as e:
     print(f"❌ ERRO: pdfplumber não encontrado: {e}", file=sys.stderr)
@@ -54,8 +55,7 @@ def configure_ai():
         # Usar API key do ambiente
         api_key = os.environ.get('GOOGLE_AI_API_KEY')
         if not api_key:
-            print(json.dumps({"error": "GOOGLE_AI_API_KEY não encontrada no ambiente"}), file=sys.stderr)
-            sys.exit(1)
+            raise RuntimeError("GOOGLE_AI_API_KEY não encontrada no ambiente")
         
         genai.configure(api_key=api_key)
         print(f"✓ API key configurada", file=sys.stderr)
@@ -72,20 +72,20 @@ def configure_ai():
         return model
     except Exception as e:
         print(json.dumps({"error": f"Erro ao configurar a IA. Detalhes: {str(e)}"}), file=sys.stderr)
-        sys.exit(1)
+        raise RuntimeError(f"Erro ao configurar a IA. Detalhes: {str(e)}") from e
 
 def extract_full_text_with_pages(pdf_path):
     """Extrai o texto completo do PDF, mantendo a referência de página."""
     print(f"✓ Extraindo texto de: {pdf_path}", file=sys.stderr)
-    full_text = ""
+    partes = []
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            print(f"✓ PDF aberto: {len(pdf.pages)} páginas", file=sys.stderr)
-            for i, page in enumerate(pdf.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += f"[Página {i+1}]\\n{page_text}\\n\\n"
-                    print(f"✓ Página {i+1}: {len(page_text)} caracteres", file=sys.stderr)
+        # Uma página por vez: o cache de layout de cada página é liberado antes da próxima
+        for i, page in iterar_paginas(pdf_path):
+            page_text = page.extract_text()
+            if page_text:
+                partes.append(f"[Página {i+1}]\\n{page_text}\\n\\n")
+                print(f"✓ Página {i+1}: {len(page_text)} caracteres", file=sys.stderr)
+        full_text = "".join(partes)
         print(f"✓ Extração concluída: {len(full_text)} caracteres totais", file=sys.stderr)
     except Exception as e:
         error_msg = f"Erro ao ler o PDF {os.path.basename(pdf_path)}: {str(e)}"
@@ -350,6 +350,55 @@ def analyze_proposal_compliance_one_by_one(model, requirements, proposal_text):
     print(f"✓ Análise individual concluída: {len(analysis_report)} itens", file=sys.stderr)
     return analysis_report
 
+def analisar_proposta(tr_path, proposal_paths=None, item_name=None):
+    """
+    Ponto de entrada de biblioteca. Sem 'item_name', identifica os itens do TR ({"items": [...]});
+    com 'item_name' e 'proposal_paths', analisa a conformidade das propostas ({"analysisItems": [...]}).
+    Erros de entrada ou da análise são levantados como ValueError.
+    """
+    model = configure_ai()
+    print("✓ Modelo de IA configurado", file=sys.stderr)
+
+    tr_text = extract_full_text_with_pages(tr_path)
+    if "Erro" in tr_text:
+        raise ValueError(tr_text)
+
+    if not item_name:
+        print("=== MODO: IDENTIFICAR ITENS ===", file=sys.stderr)
+        return {"items": identify_items_in_tr(model, tr_text)}
+
+    print("=== MODO: ANALISAR ITEM ===", file=sys.stderr)
+    if not proposal_paths:
+        raise ValueError("Para 'analyze_item', os argumentos --proposal e --item_name são obrigatórios.")
+
+    # Concatena o texto de todos os arquivos de proposta fornecidos
+    partes_proposta = []
+    for i, proposal_path in enumerate(proposal_paths):
+        print(f"✓ Processando proposta {i+1}: {proposal_path}", file=sys.stderr)
+        # Adiciona um separador claro entre os conteúdos dos arquivos
+        separator = f"\\n\\n--- INÍCIO DO DOCUMENTO DA PROPOSTA {i+1} ({os.path.basename(proposal_path)}) ---\\n\\n"
+        partes_proposta.append(separator)
+        
+        proposal_text = extract_full_text_with_pages(proposal_path)
+        if "Erro" in proposal_text:
+            raise ValueError(f"Erro ao processar o arquivo de proposta {proposal_path}: {proposal_text}")
+        partes_proposta.append(proposal_text)
+    full_proposal_text = "".join(partes_proposta)
+
+    requirements = get_requirements_from_tr(model, tr_text, item_name)
+    if isinstance(requirements, dict) and 'error' in requirements:
+        raise ValueError(requirements['error'])
+    
+    if not requirements:
+        raise ValueError(f"Nenhum requisito técnico encontrado para o item '{item_name}'.")
+
+    analysis_report = analyze_proposal_compliance_batch(model, requirements, full_proposal_text)
+    
+    if not analysis_report:
+        raise ValueError("A análise da IA não produziu resultados. Verifique os PDFs ou a chave de API.")
+
+    return {"analysisItems": analysis_report}
+
 def main():
     """Função principal que orquestra a análise."""
     try:
@@ -363,56 +412,19 @@ def main():
         
         args = parser.parse_args()
         print(f"Argumentos recebidos: {args}", file=sys.stderr)
-        
-        model = configure_ai()
-        print("✓ Modelo de IA configurado", file=sys.stderr)
 
-        tr_text = extract_full_text_with_pages(args.tr)
-        if "Erro" in tr_text:
-            print(json.dumps({"error": tr_text}))
+        if args.mode == 'analyze_item' and (not args.proposal or not args.item_name):
+            print(json.dumps({"error": "Para 'analyze_item', os argumentos --proposal e --item_name são obrigatórios."}))
             sys.exit(1)
 
-        if args.mode == 'identify_items':
-            print("=== MODO: IDENTIFICAR ITENS ===", file=sys.stderr)
-            items = identify_items_in_tr(model, tr_text)
-            print(json.dumps({"items": items}, ensure_ascii=False, indent=2))
-        
-        elif args.mode == 'analyze_item':
-            print("=== MODO: ANALISAR ITEM ===", file=sys.stderr)
-            if not args.proposal or not args.item_name:
-                print(json.dumps({"error": "Para 'analyze_item', os argumentos --proposal e --item_name são obrigatórios."}))
-                sys.exit(1)
-
-            # Concatena o texto de todos os arquivos de proposta fornecidos
-            full_proposal_text = ""
-            for i, proposal_path in enumerate(args.proposal):
-                print(f"✓ Processando proposta {i+1}: {proposal_path}", file=sys.stderr)
-                # Adiciona um separador claro entre os conteúdos dos arquivos
-                separator = f"\\n\\n--- INÍCIO DO DOCUMENTO DA PROPOSTA {i+1} ({os.path.basename(proposal_path)}) ---\\n\\n"
-                full_proposal_text += separator
-                
-                proposal_text = extract_full_text_with_pages(proposal_path)
-                if "Erro" in proposal_text:
-                    print(json.dumps({"error": f"Erro ao processar o arquivo de proposta {proposal_path}: {proposal_text}"}))
-                    sys.exit(1)
-                full_proposal_text += proposal_text
-
-            requirements = get_requirements_from_tr(model, tr_text, args.item_name)
-            if isinstance(requirements, dict) and 'error' in requirements:
-                print(json.dumps(requirements))
-                sys.exit(1)
-            
-            if not requirements:
-                print(json.dumps({"error": f"Nenhum requisito técnico encontrado para o item '{args.item_name}'."}))
-                sys.exit(1)
-
-            analysis_report = analyze_proposal_compliance_batch(model, requirements, full_proposal_text)
-            
-            if not analysis_report:
-                print(json.dumps({"error": "A análise da IA não produziu resultados. Verifique os PDFs ou a chave de API."}))
-                sys.exit(1)
+        item_name = args.item_name if args.mode == 'analyze_item' else None
+        try:
+            resultado = analisar_proposta(args.tr, args.proposal, item_name)
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
 
-            print(json.dumps({"analysisItems": analysis_report}, ensure_ascii=False, indent=2))
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
 
         print("=== PROCESSAMENTO CONCLUÍDO COM SUCESSO ===", file=sys.stderr)
         
@@ -15,7 +15,7 @@ import argparse
 from pathlib import Path
 from typing import Dict, List, Optional
 import fitz  # PyMuPDF
-import tabula
+from paginas_pdf import tabelas_da_pagina
 import pandas as pd
 import google.generativeai as genai
 import os
@@ -118,23 +118,24 @@ class AnalisadorTREtp:
             raise ValueError(f"Erro ao processar PDF: {str(e)}")
     
     def extrair_tabelas_csv(self, caminho_arquivo: str) -> str:
-        """Extrai tabelas do PDF e converte para CSV usando tabula-py"""
+        """
+        Extrai tabelas do PDF e converte para CSV usando o find_tables do PyMuPDF
+        (no próprio processo, sem iniciar a JVM do tabula); a primeira linha de cada tabela é o cabeçalho
+        """
         try:
-            # Extrair todas as tabelas
-            tabelas = tabula.read_pdf(caminho_arquivo, pages='all')
+            blocos = []
+            i = 0
+            with fitz.open(caminho_arquivo) as doc:
+                for pagina in doc:
+                    for tabela in tabelas_da_pagina(pagina):
+                        i += 1
+                        df = tabela.to_pandas()
+                        if not df.empty:
+                            blocos.append(f"\n--- TABELA {i} ---\n")
+                            blocos.append(df.to_csv(index=False, header=True))
+                            blocos.append("\n")
             
-            if not tabelas:
-                return ""
-            
-            # Converter cada tabela para CSV
-            csv_content = ""
-            for i, tabela in enumerate(tabelas):
-                if not tabela.empty:
-                    csv_content += f"\n--- TABELA {i+1} ---\n"
-                    csv_content += tabela.to_csv(index=False, header=True)
-                    csv_content += "\n"
-            
-            return csv_content
+            return "".join(blocos)
             
         except Exception as e:
             print(f"Aviso: Nao foi possivel extrair tabelas: {str(e)}")
@@ -335,6 +336,33 @@ IMPORTANTE: Gere pelo menos 4-6 seções diferentes e 3-5 itens por seção quan
             "raw_response": texto_resposta
         }
 
+def analisar_tr_etp(caminho_arquivo: str = None, texto: str = None, tipo_documento: str = 'etp',
+                    pontos_foco: str = "", api_key: str = None) -> Dict:
+    """
+    Ponto de entrada de biblioteca: analisa um TR/ETP a partir de um PDF ou de texto e retorna o dicionário da análise.
+    Sem 'api_key', usa GOOGLE_AI_API_KEY do ambiente
+    """
+    api_key = api_key or os.getenv('GOOGLE_AI_API_KEY')
+    if not api_key:
+        raise ValueError("GOOGLE_AI_API_KEY não encontrada no ambiente")
+    if not caminho_arquivo and not texto:
+        raise ValueError("E necessario fornecer um arquivo PDF ou texto para analise")
+
+    analisador = AnalisadorTREtp(api_key)
+    
+    tabelas_csv = ""
+    if caminho_arquivo:
+        if not Path(caminho_arquivo).exists():
+            raise ValueError(f"Arquivo nao encontrado: {caminho_arquivo}")
+        texto = analisador.extrair_texto_pdf(caminho_arquivo) or texto
+        tabelas_csv = analisador.extrair_tabelas_csv(caminho_arquivo)
+    
+    return analisador.analisar_documento(texto, tabelas_csv, tipo_documento, pontos_foco or "")
+
+def analisar_tr(caminho_arquivo: str = None, texto: str = None, pontos_foco: str = "", api_key: str = None) -> Dict:
+    """Atalho de analisar_tr_etp para Termos de Referência"""
+    return analisar_tr_etp(caminho_arquivo, texto, 'tr', pontos_foco, api_key)
+
 def main():
     parser = argparse.ArgumentParser(description='Analisador de TRs e ETPs')
     parser.add_argument('--file', help='Caminho para o arquivo PDF')
@@ -352,34 +380,14 @@ def main():
         sys.exit(1)
     
     try:
-        # Inicializar analisador
-        analisador = AnalisadorTREtp(args.api_key)
-        
-        texto = ""
-        tabelas_csv = ""
-        
-        # Processar arquivo PDF se fornecido
-        if args.file:
-            if not Path(args.file).exists():
-                print(json.dumps({
-                    "error": f"Arquivo nao encontrado: {args.file}"
-                }))
-                sys.exit(1)
-            
-            texto = analisador.extrair_texto_pdf(args.file)
-            tabelas_csv = analisador.extrair_tabelas_csv(args.file)
-        
-        # Usar texto fornecido se nao houver arquivo
-        if not texto and args.text:
-            texto = args.text
+        if args.file and not Path(args.file).exists():
+            print(json.dumps({
+                "error": f"Arquivo nao encontrado: {args.file}"
+            }))
+            sys.exit(1)
         
-        # Analisar documento
-        resultado = analisador.analisar_documento(
-            texto, 
-            tabelas_csv, 
-            args.type, 
-            args.focus or ""
-        )
+        # Analisar documento (arquivo PDF se fornecido, senão o texto)
+        resultado = analisar_tr_etp(args.file, args.text, args.type, args.focus or "", args.api_key)
         
         # Retornar resultado
         resultado_json = json.dumps(resultado, ensure_ascii=False, separators=(',', ':'), default=str)
@@ -29,7 +29,7 @@ if hasattr(sys.stderr, 'reconfigure'):
 # Importações específicas
 try:
     import fitz  # PyMuPDF
-    import tabula
+    from paginas_pdf import tabelas_da_pagina
     import pandas as pd
     import google.generativeai as genai
 except ImportError as e:
@@ -133,18 +133,20 @@ class AnalisadorTREtp:
     
     def extrair_tabelas_pdf(self, arquivo_pdf):
         try:
-            # Verificar se Java está disponível
-            tabelas_df = tabula.read_pdf(arquivo_pdf, pages='all', multiple_tables=True)
-            
-            # Converter DataFrames para CSV
-            tabelas_csv = ""
-            for i, df in enumerate(tabelas_df):
-                if not df.empty:
-                    tabelas_csv += f"TABELA {i+1}:\n"
-                    tabelas_csv += df.to_csv(index=False)
-                    tabelas_csv += "\n\n"
+            # find_tables do PyMuPDF: sem depender de Java
+            blocos = []
+            i = 0
+            with fitz.open(arquivo_pdf) as doc:
+                for pagina in doc:
+                    for tabela in tabelas_da_pagina(pagina):
+                        i += 1
+                        df = tabela.to_pandas()
+                        if not df.empty:
+                            blocos.append(f"TABELA {i}:\n")
+                            blocos.append(df.to_csv(index=False))
+                            blocos.append("\n\n")
             
-            return tabelas_csv
+            return "".join(blocos)
         except Exception as e:
             # Se falhar, retornar mensagem de erro mas continuar
             return f"Não foi possível extrair tabelas: {str(e)}"
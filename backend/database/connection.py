@@ -18,6 +18,10 @@ if not DATABASE_URL:
     
     DATABASE_URL = f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
 
+# "mysql://" usaria o driver MySQLdb, que não está nos requirements: usar o PyMySQL
+if DATABASE_URL.startswith('mysql://'):
+    DATABASE_URL = 'mysql+pymysql://' + DATABASE_URL[len('mysql://'):]
+
 # Create engine
 if DATABASE_URL.startswith('sqlite'):
     engine = create_engine(
@@ -141,4 +141,35 @@ class Contracheque(Base):
     status_validacao = Column(String(50))
     data_processamento = Column(DateTime, default=func.now())
     arquivo_origem = Column(String(255))
-    erro = Column(Text)
\ No newline at end of file
+    erro = Column(Text)
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+    
+    id = Column(String(36), primary_key=True, index=True)  # UUID devolvido ao cliente
+    tipo = Column(String(50), nullable=False)  # "pontos_eletronicos" ou "contracheques"
+    status = Column(String(20), nullable=False, default="pending")  # pending, processing, completed, failed
+    progress = Column(Integer, default=0)  # 0-100
+    message = Column(Text)
+    total_arquivos = Column(Integer, default=0)
+    arquivos_processados = Column(Integer, default=0)
+    data_criacao = Column(DateTime, default=func.now())
+    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationship with arquivos
+    arquivos = relationship("ProcessingJobFile", back_populates="job", cascade="all, delete-orphan",
+                            order_by="ProcessingJobFile.id")
+
+class ProcessingJobFile(Base):
+    __tablename__ = "processing_job_files"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(36), ForeignKey("processing_jobs.id"), nullable=False, index=True)
+    nome_arquivo = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    resultado = Column(Text)  # JSON do resultado do processador
+    erro = Column(Text)
+    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationship with ProcessingJob
+    job = relationship("ProcessingJob", back_populates="arquivos")
@@ -2,22 +2,43 @@ from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
 import os
 import sys
 from pathlib import Path
 import tempfile
 import shutil
-import json
 from typing import List, Dict, Any
 
 # Adicionar o diretório pai ao path para importar os módulos Python existentes
 sys.path.append(str(Path(__file__).parent.parent))
 
-# Importar os processadores existentes
+# OCR em paralelo no pool: cada Tesseract com uma thread OpenMP. A biblioteca lê a variável ao ser carregada
+# (import de processador_contracheque -> backend_pdf_processor -> ocr_engine), e os processos do pool herdam
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+# Importar os processadores existentes (executados no pool de processos, sem subprocessos)
 from processador_contracheque import processar_arquivo_contracheque
 from analisador_proposta import analisar_proposta
-from analisador_tr_etp import analisar_tr_etp
-from analisador_tr import analisar_tr
+from analisador_tr_etp import analisar_tr_etp, analisar_tr
+from services.executor import (
+    PoolSaturatedError,
+    PROCESSING_WORKERS,
+    pending_tasks,
+    reservar_vagas,
+    run_in_pool,
+    shutdown_executor
+)
+
+# Jobs e pontos eletrônicos dependem do banco de dados; sem ele (driver ausente, URL inválida) os demais endpoints continuam no ar
+try:
+    from services.jobs import init_jobs
+    from routers import jobs, pontos_eletronicos
+except Exception as e:
+    init_jobs = None
+    jobs = None
+    pontos_eletronicos = None
+    print(f"⚠️ Rotas com banco de dados indisponíveis: {e}", file=sys.stderr)
 
 app = FastAPI(
     title="CLP Manager API",
@@ -37,13 +58,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Jobs de processamento em segundo plano (envio + consulta de status)
+if jobs is not None:
+    app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+
+# Pontos eletrônicos (consulta, processamento e processamento com progresso em streaming)
+if pontos_eletronicos is not None:
+    app.include_router(pontos_eletronicos.router, prefix="/api/pontos-eletronicos", tags=["pontos-eletronicos"])
+
+@app.on_event("startup")
+async def startup_event():
+    if init_jobs is not None:
+        await asyncio.to_thread(init_jobs)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_executor()
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request, exc: PoolSaturatedError):
+    """Pool cheio: recusa na hora em vez de enfileirar sem limite"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+def _salvar_temporario(origem) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+        shutil.copyfileobj(origem, temp_file)
+        return temp_file.name
+
+async def analisar_upload(file: UploadFile, analisador, *args):
+    """Os analisadores leem o PDF por caminho: grava o upload em um temporário e executa no pool"""
+    with reservar_vagas(1):
+        # Cópia do upload fora do event loop
+        temp_path = await asyncio.to_thread(_salvar_temporario, file.file)
+        try:
+            return await run_in_pool(analisador, temp_path, *args)
+        finally:
+            await asyncio.to_thread(os.unlink, temp_path)
+
 @app.get("/")
 async def root():
     return {"message": "CLP Manager API - Backend Python Independente"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "CLP Manager API"}
+    return {
+        "status": "healthy",
+        "service": "CLP Manager API",
+        "workers": PROCESSING_WORKERS,
+        "tarefas_pendentes": pending_tasks()
+    }
 
 @app.post("/api/process-contracheques")
 async def process_contracheques(files: List[UploadFile] = File(...)):
@@ -56,30 +123,26 @@ async def process_contracheques(files: List[UploadFile] = File(...)):
         
         results = []
         
-        for file in files:
-            try:
-                # Criar arquivo temporário
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                    shutil.copyfileobj(file.file, temp_file)
-                    temp_path = temp_file.name
-                
-                # Processar arquivo usando o processador existente
-                resultado = processar_arquivo_contracheque(temp_path)
-                
-                # Limpar arquivo temporário
-                os.unlink(temp_path)
-                
-                results.append({
-                    "status": "sucesso",
-                    "dados": resultado
-                })
-                
-            except Exception as e:
+        # Cada arquivo vira uma tarefa do pool, processada a partir dos bytes do upload
+        with reservar_vagas(len(files)):
+            conteudos = [await file.read() for file in files]
+            resultados = await asyncio.gather(*[
+                run_in_pool(processar_arquivo_contracheque, file.filename, conteudo)
+                for file, conteudo in zip(files, conteudos)
+            ], return_exceptions=True)
+        
+        for resultado in resultados:
+            if isinstance(resultado, Exception):
                 results.append({
                     "status": "erro",
-                    "erro": str(e),
+                    "erro": str(resultado),
                     "dados": None
                 })
+            else:
+                results.append({
+                    "status": "sucesso",
+                    "dados": resultado
+                })
         
         return {
             "success": True,
@@ -87,6 +150,8 @@ async def process_contracheques(files: List[UploadFile] = File(...)):
             "message": f"Processamento concluído. {len([r for r in results if r['status'] == 'sucesso'])} de {len(results)} arquivo(s) processado(s) com sucesso."
         }
         
+    except (HTTPException, PoolSaturatedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro no processamento: {str(e)}")
 
@@ -96,22 +161,16 @@ async def analise_proposta(file: UploadFile = File(...)):
     Analisa proposta enviada pelo frontend
     """
     try:
-        # Criar arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
-        
         # Processar arquivo usando o analisador existente
-        resultado = analisar_proposta(temp_path)
-        
-        # Limpar arquivo temporário
-        os.unlink(temp_path)
+        resultado = await analisar_upload(file, analisar_proposta)
         
         return {
             "success": True,
             "resultado": resultado
         }
         
+    except (HTTPException, PoolSaturatedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na análise: {str(e)}")
 
@@ -121,22 +180,16 @@ async def analise_tr(file: UploadFile = File(...)):
     Analisa TR enviado pelo frontend
     """
     try:
-        # Criar arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
-        
         # Processar arquivo usando o analisador existente
-        resultado = analisar_tr(temp_path)
-        
-        # Limpar arquivo temporário
-        os.unlink(temp_path)
+        resultado = await analisar_upload(file, analisar_tr)
         
         return {
             "success": True,
             "resultado": resultado
         }
         
+    except (HTTPException, PoolSaturatedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na análise: {str(e)}")
 
@@ -146,22 +199,16 @@ async def analise_tr_etp(file: UploadFile = File(...)):
     Analisa TR ETP enviado pelo frontend
     """
     try:
-        # Criar arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
-        
         # Processar arquivo usando o analisador existente
-        resultado = analisar_tr_etp(temp_path)
-        
-        # Limpar arquivo temporário
-        os.unlink(temp_path)
+        resultado = await analisar_upload(file, analisar_tr_etp)
         
         return {
             "success": True,
             "resultado": resultado
         }
         
+    except (HTTPException, PoolSaturatedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na análise: {str(e)}")
 
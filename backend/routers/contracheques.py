@@ -14,6 +14,7 @@ from schemas.contracheques import (
 )
 from schemas.common import APIResponse, FileUploadResponse
 from services.pdf_processor import PDFProcessorService
+from services.executor import PoolSaturatedError
 
 router = APIRouter()
 pdf_service = PDFProcessorService()
@@ -227,7 +228,7 @@ async def process_contracheque_pdfs(
                         'tipo_documento': item.get('tipo_documento', 'contracheque'),
                         'vencimentos': item.get('vencimentos', 0.0),
                         'descontos': item.get('descontos', 0.0),
-                        'liquido': item.get('liquido', 0.0),
+                        'valor_liquido': item.get('valor_liquido'),
                         'status': item.get('status', 'processado'),
                         'status_validacao': item.get('status_validacao', 'pendente'),
                         'arquivo_origem': item.get('arquivo_origem'),
@@ -268,6 +269,8 @@ async def process_contracheque_pdfs(
         
     except HTTPException:
         raise
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from typing import List
+import asyncio
+
+from schemas.common import APIResponse, ProcessingStatus
+from services.jobs import TIPOS_JOB, criar_job, iniciar_job, obter_status
+from services.pdf_processor import PDFProcessorService
+
+router = APIRouter()
+pdf_service = PDFProcessorService()
+
+@router.post("/{tipo}", response_model=APIResponse, status_code=202)
+async def submit_job(tipo: str, files: List[UploadFile] = File(...)):
+    """Enviar PDFs para processamento em segundo plano; retorna o ID do job imediatamente"""
+    if tipo not in TIPOS_JOB:
+        raise HTTPException(status_code=404, detail=f"Tipo de job inválido: {tipo}")
+    if not files:
+        raise HTTPException(status_code=400, detail="Nenhum arquivo fornecido")
+    
+    file_contents = []
+    filenames = []
+    for file in files:
+        content = await file.read()
+        if not pdf_service.validate_pdf_file(content, file.filename):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Arquivo {file.filename} não é um PDF válido"
+            )
+        file_contents.append(content)
+        filenames.append(file.filename)
+    
+    try:
+        # Acesso síncrono ao banco fora do event loop, como em services.jobs
+        job_id = await asyncio.to_thread(criar_job, tipo, filenames)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao registrar o job: {str(e)}")
+    
+    iniciar_job(job_id, tipo, file_contents, filenames)
+    
+    return APIResponse(
+        success=True,
+        message=f"{len(filenames)} arquivo(s) enviados para processamento",
+        data={"job_id": job_id, "status_url": f"/api/jobs/{job_id}"}
+    )
+
+@router.get("/{job_id}", response_model=ProcessingStatus)
+async def get_job_status(job_id: str):
+    """Consultar o progresso e os resultados de um job"""
+    status = await asyncio.to_thread(obter_status, job_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return ProcessingStatus(**status)
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
 import os
 import tempfile
 import subprocess
 import json
 
-from database.connection import get_db
+from database.connection import get_db, SessionLocal
 from database.models import PontoEletronico as PontoEletronicoModel
 from schemas.pontos_eletronicos import (
     PontoEletronico,
@@ -17,6 +20,7 @@ from schemas.pontos_eletronicos import (
 )
 from schemas.common import APIResponse
 from services.pdf_processor import PDFProcessorService
+from services.executor import PoolSaturatedError, reservar_vagas
 
 router = APIRouter()
 
@@ -149,6 +153,31 @@ async def get_pontos_stats(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def save_ponto_result(db: Session, result: dict) -> bool:
+    """Criar ou atualizar (por colaborador e período) o ponto eletrônico de um resultado processado"""
+    try:
+        ponto_data = PontoEletronicoCreate(**result)
+        
+        # Verificar se já existe
+        existing = db.query(PontoEletronicoModel).filter(
+            PontoEletronicoModel.colaborador == ponto_data.colaborador,
+            PontoEletronicoModel.periodo == ponto_data.periodo
+        ).first()
+        
+        if existing:
+            # Atualizar
+            for field, value in ponto_data.dict().items():
+                setattr(existing, field, value)
+        else:
+            # Criar novo
+            db_ponto = PontoEletronicoModel(**ponto_data.dict())
+            db.add(db_ponto)
+        
+        return True
+    except Exception as e:
+        print(f"Erro ao salvar resultado: {e}")
+        return False
+
 @router.post("/process-pdfs", response_model=APIResponse)
 async def process_frequency_pdfs_endpoint(
     files: List[UploadFile] = File(...),
@@ -181,28 +210,8 @@ async def process_frequency_pdfs_endpoint(
         # Salvar resultados no banco de dados
         saved_count = 0
         for result in results:
-            try:
-                ponto_data = PontoEletronicoCreate(**result)
-                
-                # Verificar se já existe
-                existing = db.query(PontoEletronicoModel).filter(
-                    PontoEletronicoModel.colaborador == ponto_data.colaborador,
-                    PontoEletronicoModel.periodo == ponto_data.periodo
-                ).first()
-                
-                if existing:
-                    # Atualizar
-                    for field, value in ponto_data.dict().items():
-                        setattr(existing, field, value)
-                else:
-                    # Criar novo
-                    db_ponto = PontoEletronicoModel(**ponto_data.dict())
-                    db.add(db_ponto)
-                
+            if save_ponto_result(db, result):
                 saved_count += 1
-            except Exception as e:
-                print(f"Erro ao salvar resultado: {e}")
-                continue
         
         db.commit()
         
@@ -216,10 +225,96 @@ async def process_frequency_pdfs_endpoint(
             }
         )
         
+    except HTTPException:
+        raise
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/process-pdfs/stream")
+async def stream_frequency_pdfs_endpoint(
+    files: List[UploadFile] = File(...),
+    formato: str = "ndjson"
+):
+    """Processar PDFs de frequência com progresso em tempo real (NDJSON ou SSE com formato=sse).
+    Cada documento é salvo e enviado assim que termina; as etapas (texto, tabelas, OCR, assinatura) também são enviadas"""
+    for file in files:
+        if not file.filename.endswith('.pdf'):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Arquivo {file.filename} não é um PDF válido"
+            )
+    if formato not in ('ndjson', 'sse'):
+        raise HTTPException(status_code=400, detail="Formato deve ser 'ndjson' ou 'sse'")
+    
+    file_contents = []
+    filenames = []
+    for file in files:
+        file_contents.append(await file.read())
+        filenames.append(file.filename)
+    
+    # Reservar antes de a resposta começar, para ainda poder responder 503
+    try:
+        reserva = reservar_vagas(len(file_contents))
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    
+    def serializar(evento: dict) -> str:
+        dados = json.dumps(evento, ensure_ascii=False, default=str)
+        if formato == 'sse':
+            return f"event: {evento['tipo']}\ndata: {dados}\n\n"
+        return dados + "\n"
+    
+    async def gerar():
+        eventos = PDFProcessorService().stream_frequency_pdfs(file_contents, filenames)
+        # Sessão própria: a resposta continua sendo enviada depois que o handler retorna
+        db = SessionLocal()
+        saved_count = 0
+        processados = 0
+        
+        def salvar(resultado: dict) -> bool:
+            if not save_ponto_result(db, resultado):
+                return False
+            db.commit()
+            return True
+        
+        try:
+            async for evento in eventos:
+                if evento['tipo'] == 'documento':
+                    processados += 1
+                    # Banco síncrono fora do event loop: não trava as outras requisições nem este stream
+                    if 'resultado' in evento and await asyncio.to_thread(salvar, evento['resultado']):
+                        saved_count += 1
+                yield serializar(evento)
+        finally:
+            await eventos.aclose()
+            db.close()
+            reserva.liberar()
+        
+        yield serializar({
+            'tipo': 'fim',
+            'total_processados': processados,
+            'total_salvos': saved_count
+        })
+    
+    corpo = gerar()
+    
+    async def encerrar():
+        # Roda também quando o cliente desconecta: fecha o gerador (cancelando os PDFs pendentes)
+        # e libera as vagas mesmo que ele nunca tenha começado
+        await corpo.aclose()
+        reserva.liberar()
+    
+    try:
+        media_type = "text/event-stream" if formato == 'sse' else "application/x-ndjson"
+        return StreamingResponse(corpo, media_type=media_type, headers={"Cache-Control": "no-cache"},
+                                 background=BackgroundTask(encerrar))
+    except BaseException:
+        reserva.liberar()
+        raise
+
 @router.get("/{ponto_id}", response_model=APIResponse)
 async def get_ponto_eletronico(ponto_id: int, db: Session = Depends(get_db)):
     """Buscar um ponto eletrônico específico"""
@@ -20,7 +20,8 @@ class FileUploadResponse(BaseModel):
     content_type: str
 
 class ProcessingStatus(BaseModel):
-    status: str  # "processing", "completed", "failed"
+    job_id: Optional[str] = None
+    status: str  # "pending", "processing", "completed", "failed"
     progress: int  # 0-100
     message: str
     results: Optional[Any] = None
@@ -0,0 +1,127 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+# Os processadores ficam na raiz do repositório (backend_pdf_processor, processador_contracheque, analisadores)
+ROOT_DIR = str(Path(__file__).resolve().parent.parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+PROCESSING_WORKERS = int(os.getenv('PROCESSING_WORKERS', min(4, os.cpu_count() or 1)))
+# Tarefas aceitas (em execução + na fila do pool) antes de recusar novos envios
+PROCESSING_MAX_PENDING = int(os.getenv('PROCESSING_MAX_PENDING', PROCESSING_WORKERS * 4))
+PROCESSING_RETRY_AFTER = int(os.getenv('PROCESSING_RETRY_AFTER', 15))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_manager = None
+_manager_lock = threading.Lock()
+_pending = 0
+
+
+class PoolSaturatedError(Exception):
+    """O pool já tem PROCESSING_MAX_PENDING tarefas aceitas; o cliente deve tentar novamente depois"""
+
+    def __init__(self, retry_after: int = PROCESSING_RETRY_AFTER):
+        super().__init__("Servidor ocupado processando outros documentos, tente novamente em instantes")
+        self.retry_after = retry_after
+
+
+def _init_worker():
+    """Inicializa cada processo do pool com a raiz do repositório no path"""
+    if ROOT_DIR not in sys.path:
+        sys.path.append(ROOT_DIR)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Pool de processos compartilhado e limitado a PROCESSING_WORKERS"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PROCESSING_WORKERS, initializer=_init_worker)
+    return _executor
+
+
+def get_manager():
+    """Manager compartilhado: suas filas podem ser enviadas às tarefas do pool para publicar progresso"""
+    global _manager
+    # Chamado de threads (asyncio.to_thread): sem o lock, duas requisições podem iniciar um Manager cada
+    with _manager_lock:
+        if _manager is None:
+            _manager = multiprocessing.Manager()
+    return _manager
+
+
+async def run_in_pool(func: Callable, *args, **kwargs) -> Any:
+    """Executa uma função (de nível de módulo, serializável) no pool sem bloquear o event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+def _vagas_disponiveis(quantidade: int) -> bool:
+    return not _pending or _pending + quantidade <= PROCESSING_MAX_PENDING
+
+
+class ReservaVagas:
+    """
+    Vagas reservadas no pool. Com 'with' são liberadas no fim do bloco; quando a reserva precisa
+    sobreviver ao handler (respostas em streaming), liberar() pode ser chamado mais de uma vez
+    """
+
+    def __init__(self, quantidade: int):
+        global _pending
+        if not _vagas_disponiveis(quantidade):
+            raise PoolSaturatedError()
+        _pending += quantidade
+        self.quantidade = quantidade
+        self._liberada = False
+
+    def liberar(self):
+        global _pending
+        if not self._liberada:
+            self._liberada = True
+            _pending -= self.quantidade
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.liberar()
+
+
+def reservar_vagas(quantidade: int = 1) -> ReservaVagas:
+    """
+    Reserva vagas no pool para as tarefas de uma requisição, ou levanta PoolSaturatedError.
+    Um lote maior que o limite só é aceito com o pool vazio, para não ficar recusado para sempre
+    """
+    return ReservaVagas(quantidade)
+
+
+@asynccontextmanager
+async def aguardar_vagas(quantidade: int = 1, intervalo: float = 1.0):
+    """Como reservar_vagas, mas espera vagas em vez de recusar: para trabalhos em segundo plano (jobs)"""
+    while not _vagas_disponiveis(quantidade):
+        await asyncio.sleep(intervalo)
+    # Sem await entre a verificação e a reserva: nenhuma outra requisição ocupa as vagas no meio
+    with reservar_vagas(quantidade):
+        yield
+
+
+def pending_tasks() -> int:
+    return _pending
+
+
+def shutdown_executor():
+    global _executor, _manager
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+from database.connection import SessionLocal, engine
+from database.models import ProcessingJob, ProcessingJobFile
+from services.executor import PROCESSING_WORKERS, aguardar_vagas, run_in_pool
+from services.pdf_processor import PDFProcessorService
+
+# Jobs executados ao mesmo tempo; os demais aguardam com status "pending"
+JOBS_MAX_CONCURRENTES = int(os.getenv('JOBS_MAX_CONCURRENTES', PROCESSING_WORKERS))
+
+# pontos_eletronicos_lote: PDFs com as folhas de vários colaboradores, um resultado por colaborador
+TIPOS_JOB = ('pontos_eletronicos', 'pontos_eletronicos_lote', 'contracheques')
+
+_semaforo: Optional[asyncio.Semaphore] = None
+_tarefas = set()
+
+
+def init_jobs():
+    """Cria as tabelas de jobs e marca como falhos os jobs interrompidos por um reinício do servidor"""
+    try:
+        ProcessingJob.__table__.create(bind=engine, checkfirst=True)
+        ProcessingJobFile.__table__.create(bind=engine, checkfirst=True)
+
+        db = SessionLocal()
+        try:
+            interrompidos = db.query(ProcessingJob).filter(
+                ProcessingJob.status.in_(['pending', 'processing'])
+            ).all()
+            for job in interrompidos:
+                job.status = 'failed'
+                job.message = 'Processamento interrompido pelo reinício do servidor; envie os arquivos novamente'
+            db.commit()
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"❌ Erro ao inicializar os jobs de processamento: {e}")
+
+
+def criar_job(tipo: str, filenames: List[str]) -> str:
+    """Registra o job e um registro por arquivo; retorna o ID devolvido ao cliente"""
+    if tipo not in TIPOS_JOB:
+        raise ValueError(f"Tipo de job inválido: {tipo}")
+
+    job_id = str(uuid.uuid4())
+    db = SessionLocal()
+    try:
+        job = ProcessingJob(
+            id=job_id,
+            tipo=tipo,
+            status='pending',
+            progress=0,
+            message='Aguardando processamento',
+            total_arquivos=len(filenames)
+        )
+        job.arquivos = [ProcessingJobFile(nome_arquivo=filename, status='pending') for filename in filenames]
+        db.add(job)
+        db.commit()
+    finally:
+        db.close()
+    return job_id
+
+
+def iniciar_job(job_id: str, tipo: str, files: List[bytes], filenames: List[str]):
+    """Agenda a execução no event loop; a requisição de envio retorna imediatamente"""
+    tarefa = asyncio.create_task(_executar_job(job_id, tipo, files, filenames))
+    # Manter referência até o fim, senão a tarefa pode ser coletada
+    _tarefas.add(tarefa)
+    tarefa.add_done_callback(_tarefas.discard)
+
+
+def obter_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status no formato de ProcessingStatus, com o resultado de cada arquivo"""
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job:
+            return None
+
+        results = []
+        errors = []
+        for arquivo in job.arquivos:
+            results.append({
+                'arquivo': arquivo.nome_arquivo,
+                'status': arquivo.status,
+                'resultado': json.loads(arquivo.resultado) if arquivo.resultado else None,
+                'erro': arquivo.erro
+            })
+            if arquivo.erro:
+                errors.append(f"{arquivo.nome_arquivo}: {arquivo.erro}")
+
+        return {
+            'job_id': job.id,
+            'status': job.status,
+            'progress': job.progress or 0,
+            'message': job.message or '',
+            'results': results,
+            'errors': errors or None
+        }
+    finally:
+        db.close()
+
+
+def _atualizar(job_id: str, nome_arquivo: str = None, arquivo_status: str = None,
+               resultado: Any = None, erro: str = None, **campos_job):
+    """Grava o progresso de um arquivo e/ou os campos do job em uma transação curta"""
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        if not job:
+            return
+
+        if nome_arquivo is not None:
+            # Arquivos com o mesmo nome: 'processing' só vale para um ainda pendente
+            abertos = ('pending',) if arquivo_status == 'processing' else ('pending', 'processing')
+            arquivo = next((a for a in job.arquivos
+                            if a.nome_arquivo == nome_arquivo and a.status in abertos), None)
+            if arquivo:
+                arquivo.status = arquivo_status
+                if resultado is not None:
+                    arquivo.resultado = json.dumps(resultado, ensure_ascii=False, default=str)
+                arquivo.erro = erro
+                job.arquivos_processados = sum(1 for a in job.arquivos if a.status in ('completed', 'failed'))
+                if job.total_arquivos:
+                    job.progress = int(job.arquivos_processados * 100 / job.total_arquivos)
+
+        for campo, valor in campos_job.items():
+            setattr(job, campo, valor)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _executar_job(job_id: str, tipo: str, files: List[bytes], filenames: List[str]):
+    global _semaforo
+    if _semaforo is None:
+        _semaforo = asyncio.Semaphore(JOBS_MAX_CONCURRENTES)
+
+    # Pontos: uma tarefa do pool por arquivo; contracheques: o lote inteiro é uma tarefa.
+    # Em lote, o número de trechos só se sabe depois de dividir: as vagas são reservadas por arquivo
+    vagas = {'pontos_eletronicos': len(files), 'pontos_eletronicos_lote': 0}.get(tipo, 1)
+
+    async with _semaforo:
+        try:
+            # Mesmo limite de tarefas aceitas das requisições síncronas; o job espera na fila em vez de ser recusado
+            async with aguardar_vagas(vagas):
+                await asyncio.to_thread(_atualizar, job_id, status='processing', message='Processando arquivos')
+                if tipo == 'pontos_eletronicos':
+                    await _executar_pontos(job_id, files, filenames)
+                elif tipo == 'pontos_eletronicos_lote':
+                    await _executar_pontos_lote(job_id, files, filenames)
+                else:
+                    await _executar_contracheques(job_id, files, filenames)
+
+            status = await asyncio.to_thread(obter_status, job_id)
+            falhas = len(status['errors'] or []) if status else 0
+            await asyncio.to_thread(
+                _atualizar, job_id, status='completed', progress=100,
+                message=f"{len(filenames) - falhas} de {len(filenames)} arquivo(s) processado(s)"
+            )
+        except Exception as e:
+            print(f"❌ Erro no job {job_id}: {e}")
+            await asyncio.to_thread(_atualizar, job_id, status='failed', message=f"Erro no processamento: {str(e)}")
+
+
+async def _executar_pontos(job_id: str, files: List[bytes], filenames: List[str]):
+    """Um PDF por tarefa do pool; o progresso avança a cada arquivo concluído"""
+    from backend_pdf_processor import processar_pdf_ponto
+
+    async def processar(filename: str, conteudo: bytes):
+        await asyncio.to_thread(_atualizar, job_id, filename, 'processing')
+        try:
+            return filename, await run_in_pool(processar_pdf_ponto, filename, conteudo)
+        except Exception as e:
+            return filename, {'error': f"Erro ao processar {filename}: {str(e)}"}
+
+    for tarefa in asyncio.as_completed([processar(f, c) for f, c in zip(filenames, files)]):
+        filename, resultado = await tarefa
+        if 'error' in resultado:
+            await asyncio.to_thread(_atualizar, job_id, filename, 'failed', erro=resultado['error'])
+        else:
+            dados = PDFProcessorService._to_ponto_eletronico(resultado, filename)
+            await asyncio.to_thread(_atualizar, job_id, filename, 'completed', resultado=dados)
+
+
+async def _executar_pontos_lote(job_id: str, files: List[bytes], filenames: List[str]):
+    """Cada PDF é dividido por colaborador e os trechos vão para o pool em paralelo;
+    o resultado do arquivo é a lista de colaboradores, na ordem do documento"""
+    from backend_pdf_processor import PontoProcessor, processar_pdf_ponto, recortar_pdf_lote
+
+    async def processar(filename: str, conteudo: bytes):
+        await asyncio.to_thread(_atualizar, job_id, filename, 'processing')
+        try:
+            async with aguardar_vagas(1):
+                trechos = await run_in_pool(recortar_pdf_lote, filename, conteudo)
+            # No máximo PROCESSING_WORKERS vagas por arquivo (mais não roda em paralelo): um lote grande não
+            # espera o pool esvaziar, e cada trecho entra assim que outro do mesmo arquivo termina
+            vagas = min(len(trechos), PROCESSING_WORKERS)
+            limite = asyncio.Semaphore(vagas)
+            
+            async def processar_trecho(nome: str, dados: bytes):
+                async with limite:
+                    return await run_in_pool(processar_pdf_ponto, nome, dados)
+            
+            async with aguardar_vagas(vagas):
+                resultados = await asyncio.gather(*[processar_trecho(nome, dados) for _, nome, dados in trechos])
+        except Exception as e:
+            return filename, {'error': f"Erro ao processar {filename}: {str(e)}"}
+        return filename, [PontoProcessor.completar_lote(segmento, resultado)
+                          for (segmento, _, _), resultado in zip(trechos, resultados)]
+
+    for tarefa in asyncio.as_completed([processar(f, c) for f, c in zip(filenames, files)]):
+        filename, resultado = await tarefa
+        if isinstance(resultado, dict):
+            await asyncio.to_thread(_atualizar, job_id, filename, 'failed', erro=resultado['error'])
+            continue
+        dados = [{**PDFProcessorService._to_ponto_eletronico(r, filename), 'paginas': r.get('paginas')}
+                 for r in resultado if 'error' not in r]
+        erros = [r['error'] for r in resultado if 'error' in r]
+        await asyncio.to_thread(_atualizar, job_id, filename, 'completed', resultado=dados,
+                                erro='; '.join(erros) or None)
+
+
+async def _executar_contracheques(job_id: str, files: List[bytes], filenames: List[str]):
+    """Contracheques e recibos são cruzados entre si, então o lote é uma única tarefa do pool"""
+    from processador_contracheque import process_documents
+
+    for filename in filenames:
+        await asyncio.to_thread(_atualizar, job_id, filename, 'processing')
+    resultados = await run_in_pool(process_documents, list(filenames), list(files))
+    por_arquivo = {r.get('arquivo'): r for r in resultados}
+
+    for filename in filenames:
+        resultado = por_arquivo.get(os.path.basename(filename))
+        dados = PDFProcessorService._to_contracheque(resultado) if resultado else None
+        # Recibos não geram resultado próprio: são usados na validação dos contracheques
+        await asyncio.to_thread(_atualizar, job_id, filename, 'completed', resultado=dados)
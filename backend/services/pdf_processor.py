@@ -1,133 +1,134 @@
-import os
-import subprocess
-import json
-import tempfile
-from typing import List, Dict, Any
-from pathlib import Path
+import asyncio
+import queue
+from typing import List, Dict, Any, AsyncIterator
+
+from services.executor import get_manager, reservar_vagas, run_in_pool
 
 class PDFProcessorService:
-    """Serviço para processamento de PDFs de frequência"""
+    """Serviço para processamento de PDFs de frequência e contracheques.
+    Chama os processadores em processo, através do pool limitado de services.executor"""
     
-    def __init__(self, python_scripts_dir: str = None):
-        self.python_scripts_dir = python_scripts_dir or os.getenv('PYTHON_SCRIPTS_DIR', './scripts')
-        self.temp_dir = os.getenv('TEMP_FILES_DIR', './temp')
+    async def process_frequency_pdfs(self, files: List[bytes], filenames: List[str]) -> Dict[str, Any]:
+        """Processar PDFs de frequência: um PDF por tarefa do pool, resultados na ordem de envio"""
+        from backend_pdf_processor import processar_pdf_ponto
+        
+        with reservar_vagas(len(files)):
+            try:
+                results = await asyncio.gather(*[
+                    run_in_pool(processar_pdf_ponto, filename, file_content)
+                    for file_content, filename in zip(files, filenames)
+                ])
+            except Exception as e:
+                raise Exception(f"Erro no processamento dos PDFs: {str(e)}")
         
-        # Garantir que os diretórios existam
-        Path(self.temp_dir).mkdir(parents=True, exist_ok=True)
+        data = []
+        errors = []
+        for filename, result in zip(filenames, results):
+            if 'error' in result:
+                errors.append(result['error'])
+            else:
+                data.append(self._to_ponto_eletronico(result, filename))
+        
+        return {
+            'success': True,
+            'message': f"{len(data)} de {len(filenames)} PDF(s) processado(s)",
+            'data': data,
+            'errors': errors
+        }
     
-    async def process_frequency_pdfs(self, files: List[bytes], filenames: List[str]) -> Dict[str, Any]:
-        """Processar PDFs de frequência usando o script Python existente"""
+    async def stream_frequency_pdfs(self, files: List[bytes], filenames: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Processar PDFs de frequência emitindo eventos à medida que acontecem:
+        {'tipo': 'etapa', ...} ao fim de cada etapa e {'tipo': 'documento', ...} assim que um PDF termina.
+        As vagas no pool são reservadas pelo chamador antes de a resposta começar (recusa com PoolSaturatedError);
+        aclose() cancela os PDFs ainda pendentes
+        """
+        from backend_pdf_processor import processar_pdf_ponto
+        
+        progress_queue = await asyncio.to_thread(lambda: get_manager().Queue())
+        tarefas = {
+            asyncio.ensure_future(run_in_pool(processar_pdf_ponto, filename, file_content, progress_queue)): (indice, filename)
+            for indice, (file_content, filename) in enumerate(zip(files, filenames))
+        }
+        pendentes = set(tarefas)
+        
         try:
-            # Criar diretório temporário para os arquivos
-            with tempfile.TemporaryDirectory(dir=self.temp_dir) as temp_dir:
-                temp_files = []
-                
-                # Salvar arquivos temporariamente
-                for i, (file_content, filename) in enumerate(zip(files, filenames)):
-                    temp_file_path = os.path.join(temp_dir, f"file_{i}_{filename}")
-                    with open(temp_file_path, 'wb') as f:
-                        f.write(file_content)
-                    temp_files.append(temp_file_path)
-                
-                # Executar script de processamento
-                script_path = os.path.join(self.python_scripts_dir, 'process_frequency.py')
-                
-                if not os.path.exists(script_path):
-                    raise FileNotFoundError(f"Script de processamento não encontrado: {script_path}")
-                
-                # Preparar comando
-                cmd = [
-                    'python',
-                    script_path,
-                    '--input-dir', temp_dir,
-                    '--output-format', 'json'
-                ]
-                
-                # Executar script
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minutos timeout
-                )
-                
-                if result.returncode != 0:
-                    raise Exception(f"Erro no processamento: {result.stderr}")
-                
-                # Parsear resultado
-                try:
-                    processed_data = json.loads(result.stdout)
-                except json.JSONDecodeError:
-                    # Se não for JSON, assumir que é texto simples
-                    processed_data = {
-                        'success': True,
-                        'message': result.stdout,
-                        'data': []
-                    }
-                
-                return processed_data
-                
-        except subprocess.TimeoutExpired:
-            raise Exception("Timeout no processamento dos PDFs")
-        except Exception as e:
-            raise Exception(f"Erro no processamento dos PDFs: {str(e)}")
+            while pendentes:
+                concluidas, pendentes = await asyncio.wait(pendentes, timeout=0.25, return_when=asyncio.FIRST_COMPLETED)
+                
+                for evento in await asyncio.to_thread(self._drenar, progress_queue):
+                    yield {'tipo': 'etapa', **evento}
+                
+                for tarefa in concluidas:
+                    indice, filename = tarefas[tarefa]
+                    try:
+                        result = tarefa.result()
+                    except Exception as e:
+                        result = {'error': f"Erro ao processar {filename}: {str(e)}"}
+                    
+                    if 'error' in result:
+                        yield {'tipo': 'documento', 'indice': indice, 'arquivo': filename, 'erro': result['error']}
+                    else:
+                        yield {'tipo': 'documento', 'indice': indice, 'arquivo': filename,
+                               'resultado': self._to_ponto_eletronico(result, filename)}
+        finally:
+            # Cliente desconectado: não processar o restante do lote
+            for tarefa in pendentes:
+                tarefa.cancel()
+    
+    @staticmethod
+    def _drenar(progress_queue) -> List[Dict[str, Any]]:
+        eventos = []
+        while True:
+            try:
+                eventos.append(progress_queue.get_nowait())
+            except queue.Empty:
+                return eventos
     
     async def process_contracheque_pdfs(self, files: List[bytes], filenames: List[str]) -> Dict[str, Any]:
-        """Processar PDFs de contracheques usando o script Python existente"""
-        try:
-            # Criar diretório temporário para os arquivos
-            with tempfile.TemporaryDirectory(dir=self.temp_dir) as temp_dir:
-                temp_files = []
-                
-                # Salvar arquivos temporariamente
-                for i, (file_content, filename) in enumerate(zip(files, filenames)):
-                    temp_file_path = os.path.join(temp_dir, f"file_{i}_{filename}")
-                    with open(temp_file_path, 'wb') as f:
-                        f.write(file_content)
-                    temp_files.append(temp_file_path)
-                
-                # Executar script de processamento
-                script_path = os.path.join(self.python_scripts_dir, 'process_contracheques.py')
-                
-                if not os.path.exists(script_path):
-                    raise FileNotFoundError(f"Script de processamento não encontrado: {script_path}")
-                
-                # Preparar comando
-                cmd = [
-                    'python',
-                    script_path,
-                    '--input-dir', temp_dir,
-                    '--output-format', 'json'
-                ]
-                
-                # Executar script
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minutos timeout
-                )
-                
-                if result.returncode != 0:
-                    raise Exception(f"Erro no processamento: {result.stderr}")
-                
-                # Parsear resultado
-                try:
-                    processed_data = json.loads(result.stdout)
-                except json.JSONDecodeError:
-                    # Se não for JSON, assumir que é texto simples
-                    processed_data = {
-                        'success': True,
-                        'message': result.stdout,
-                        'data': []
-                    }
-                
-                return processed_data
-                
-        except subprocess.TimeoutExpired:
-            raise Exception("Timeout no processamento dos PDFs")
-        except Exception as e:
-            raise Exception(f"Erro no processamento dos PDFs: {str(e)}")
+        """Processar PDFs de contracheques: o lote vai inteiro para uma tarefa, pois contracheques e recibos são cruzados"""
+        from processador_contracheque import process_documents
+        
+        with reservar_vagas(len(files)):
+            try:
+                results = await run_in_pool(process_documents, list(filenames), list(files))
+            except Exception as e:
+                raise Exception(f"Erro no processamento dos PDFs: {str(e)}")
+        
+        return {
+            'success': True,
+            'message': f"{len(results)} contracheque(s) processado(s)",
+            'data': [self._to_contracheque(result) for result in results]
+        }
+    
+    @staticmethod
+    def _to_ponto_eletronico(result: Dict[str, Any], filename: str) -> Dict[str, Any]:
+        """Adapta o resultado do PontoProcessor aos campos de PontoEletronicoCreate"""
+        return {
+            'colaborador': result.get('colaborador'),
+            'periodo': result.get('periodo'),
+            'previsto': result.get('previsto'),
+            'realizado': result.get('realizado'),
+            'saldo': result.get('saldo'),
+            'saldo_minutos': result.get('saldo_minutos', 0),
+            'assinatura': 'OK' if result.get('assinatura') else 'Pendente',
+            'arquivo_origem': filename
+        }
+    
+    @staticmethod
+    def _to_contracheque(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Adapta o resultado de process_documents aos campos do modelo Contracheque"""
+        return {
+            'colaborador': result.get('colaborador'),
+            'periodo': result.get('mesReferencia'),
+            'tipo_documento': 'contracheque',
+            'vencimentos': result.get('vencimentos'),
+            'descontos': result.get('descontos'),
+            'valor_liquido': result.get('liquido'),
+            'status': 'processado',
+            'status_validacao': result.get('status'),
+            'arquivo_origem': result.get('arquivo')
+        }
     
     def validate_pdf_file(self, file_content: bytes, filename: str) -> bool:
         """Validar se o arquivo é um PDF válido"""
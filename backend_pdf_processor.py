@@ -7,6 +7,11 @@ Converte PDFs para CSV e calcula banco de horas automaticamente
 import sys
 import os
 
+if __name__ == "__main__":
+    # Linha de comando: o OCR roda em várias threads e cada Tesseract não deve abrir também várias threads
+    # OpenMP. A variável é lida ao carregar a biblioteca, então precisa vir antes dos imports do OCR
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
 # Verificar dependências críticas
 try:
     import pdfplumber
@@ -26,15 +31,33 @@ except ImportError as e:
 
 try:
     import re
+    import io
     import json
     import argparse
     from datetime import datetime, date
     from typing import Dict, List, Tuple, Optional
+    import threading
+    from collections import OrderedDict
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
     print("[OK] Bibliotecas padrão importadas com sucesso", file=sys.stderr)
 except ImportError as e:
     print(f"[ERRO] Biblioteca padrão não encontrada: {e}")
     sys.exit(1)
 
+from extraction_cache import ExtractionCache, get_default_cache
+from colaboradores_index import ColaboradoresIndex, get_colaboradores_index
+from tokenizador_ponto import extrair_dias_estrito, extrair_dias_tolerante
+from ocr_engine import get_ocr_engine
+from padroes_ponto import (
+    RE_DATA, RE_NUMERO_DATA_HORA, RE_NUMERO_DATA_HORA_SEM_DOIS_PONTOS, RE_DUAS_PALAVRAS_LONGAS,
+    RE_TRES_PALAVRAS_LONGAS, RE_CINCO_PALAVRAS_LONGAS, RE_NOME_ANTES_PERIODO, RE_NOME_LONGO,
+    RE_CABECALHO_COLABORADOR, RE_ASSINATURA_TEXTO, RE_CPF, RE_ASSINATURA_TABELA_ESPECIFICA,
+    RE_ASSINATURA_TABELA_GENERICA, RE_CABECALHOS_TABELA, RE_CABECALHOS_TEXTO, RE_CODIGOS_PROBLEMATICOS,
+    RE_EXCLUSOES_NOME, RE_EXCLUSOES_NOME_TABELA, RE_EXCLUSOES_LINHA_NOME
+)
+from extracao_tabelas import PaginaTabelas, get_seletor_tabelas
+from paginas_pdf import iterar_paginas
+
 # Configurar encoding
 if hasattr(sys.stdout, 'reconfigure'):
     try:
@@ -49,47 +72,387 @@ print(f"Python version: {sys.version}", file=sys.stderr)
 print(f"Diretório atual: {os.getcwd()}", file=sys.stderr)
 print(f"Script: {__file__}", file=sys.stderr)
 
+class DocumentoPDF:
+    """Contexto de um PDF já aberto: abre o arquivo uma única vez e calcula texto e
+    tabelas de cada página uma única vez, compartilhando-os entre todas as etapas"""
+    
+    # Triagem de páginas: abaixo deste número de caracteres úteis a camada de texto é considerada vazia
+    TRIAGEM_MIN_CARACTERES = int(os.getenv('TRIAGEM_MIN_CARACTERES', 20))
+    # Fração máxima de glifos CID (sem mapeamento Unicode) para confiar na camada de texto
+    TRIAGEM_MAX_CID = float(os.getenv('TRIAGEM_MAX_CID', 0.3))
+    # Fração da página coberta por imagens a partir da qual o conteúdo da imagem também é lido por OCR
+    TRIAGEM_COBERTURA_IMAGEM = float(os.getenv('TRIAGEM_COBERTURA_IMAGEM', 0.5))
+    
+    # OCR por regiões de interesse: faixa inferior da página, margem em torno de cada região (pontos)
+    # e cobertura a partir da qual vale mais ler a página inteira
+    ROI_FAIXA_RODAPE = float(os.getenv('ROI_FAIXA_RODAPE', 0.2))
+    ROI_MARGEM = float(os.getenv('ROI_MARGEM', 6))
+    ROI_MAX_COBERTURA = float(os.getenv('ROI_MAX_COBERTURA', 0.6))
+    
+    # Páginas renderizadas mantidas em memória (em cinza, na maior escala do OCR) por documento
+    RENDER_CACHE_MB = float(os.getenv('RENDER_CACHE_MB', 128))
+    
+    def __init__(self, pdf_path: str, cache: ExtractionCache = None, conteudo: bytes = None):
+        self.pdf_path = pdf_path
+        self.conteudo = conteudo  # bytes do PDF quando ele não está em disco
+        self.cache = cache or get_default_cache()
+        self._hash = None
+        self._pages = None
+        self._fitz_doc = None
+        self._assinatura_estrutural = False  # False = ainda não verificado
+        self._triagem = None
+        self._renders = OrderedDict()  # (página, recorte) -> (escala, matriz em cinza), em ordem LRU
+        self._renders_bytes = 0
+        self.render_lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            if self.conteudo is not None:
+                self._hash = self.cache.hash_bytes(self.conteudo)
+            else:
+                self._hash = self.cache.hash_file(self.pdf_path)
+        return self._hash
+    
+    @property
+    def pages(self) -> List[Dict]:
+        """Texto e tabelas brutos de cada página (pdfplumber), calculados uma vez"""
+        if self._pages is None:
+            self._pages = self._load_pages()
+        return self._pages
+    
+    def _load_pages(self) -> List[Dict]:
+        params = {'pdfplumber': getattr(pdfplumber, '__version__', ''), 'tabelas': 'motores'}
+        
+        # Acerto completo no cache: nem abrir o PDF
+        num_pages = self.cache.get(self.hash, None, 'paginas')
+        if num_pages is not None:
+            pages = [self.cache.get(self.hash, i, 'pdfplumber', params) for i in range(num_pages)]
+            if all(page is not None for page in pages):
+                print(f"♻️ Cache: texto e tabelas de {self.pdf_path} reaproveitados ({num_pages} páginas)", file=sys.stderr)
+                return pages
+        
+        pages = []
+        source = io.BytesIO(self.conteudo) if self.conteudo is not None else self.pdf_path
+        # Uma página pdfplumber viva por vez: só o texto e as tabelas ficam em memória
+        for page_num, page in iterar_paginas(source):
+            cached = self.cache.get(self.hash, page_num, 'pdfplumber', params)
+            if cached is None:
+                # Motor de tabelas escolhido pela impressão digital do layout da página
+                pagina = PaginaTabelas(page, self, page_num)
+                motor, tabelas = get_seletor_tabelas().extrair(pagina)
+                cached = {
+                    'text': page.extract_text() or "",
+                    'tables': tabelas,
+                    'layout': pagina.assinatura,
+                    'motor_tabelas': motor
+                }
+                self.cache.set(self.hash, page_num, 'pdfplumber', cached, params)
+            pages.append(cached)
+        self.cache.set(self.hash, None, 'paginas', len(pages))
+        return pages
+    
+    @property
+    def fitz_doc(self):
+        """Documento PyMuPDF aberto sob demanda (OCR, renderização)"""
+        if self._fitz_doc is None:
+            import fitz  # PyMuPDF
+            if self.conteudo is not None:
+                self._fitz_doc = fitz.open(stream=self.conteudo, filetype="pdf")
+            else:
+                self._fitz_doc = fitz.open(self.pdf_path)
+        return self._fitz_doc
+    
+    def triagem_paginas(self) -> List[str]:
+        """Extração necessária em cada página: 'texto' (só a camada de texto), 'ocr' ou 'ambos'"""
+        if self._triagem is None:
+            params = {
+                'min_caracteres': self.TRIAGEM_MIN_CARACTERES,
+                'max_cid': self.TRIAGEM_MAX_CID,
+                'cobertura_imagem': self.TRIAGEM_COBERTURA_IMAGEM,
+            }
+            triagem = self.cache.get(self.hash, None, 'triagem', params)
+            if triagem is None:
+                triagem = [self._classificar_pagina(page_num) for page_num in range(len(self.pages))]
+                self.cache.set(self.hash, None, 'triagem', triagem, params)
+            self._triagem = triagem
+            print(f"🗂️ Triagem de {self.pdf_path}: {', '.join(triagem)}", file=sys.stderr)
+        return self._triagem
+    
+    def _classificar_pagina(self, page_num: int) -> str:
+        texto = self.pages[page_num]['text'] or ""
+        
+        # Glifos sem mapeamento Unicode aparecem como (cid:N) no pdfplumber
+        glifos_cid = len(re.findall(r'\(cid:\d+\)', texto))
+        uteis = len(re.sub(r'\(cid:\d+\)|\s', '', texto))
+        fracao_cid = glifos_cid / (glifos_cid + uteis) if glifos_cid + uteis else 0.0
+        
+        if uteis < self.TRIAGEM_MIN_CARACTERES or fracao_cid > self.TRIAGEM_MAX_CID:
+            return 'ocr'
+        
+        return 'ambos' if self._cobertura_imagens(page_num) >= self.TRIAGEM_COBERTURA_IMAGEM else 'texto'
+    
+    def _cobertura_imagens(self, page_num: int) -> float:
+        """Fração da área da página ocupada por imagens (retângulos limitados à página, sem descontar sobreposição)"""
+        try:
+            with self.render_lock:
+                page = self.fitz_doc.load_page(page_num)
+                area_pagina = abs(page.rect)
+                area_imagens = 0.0
+                for img in page.get_images(full=True):
+                    for rect in page.get_image_rects(img[0]):
+                        area_imagens += abs(rect & page.rect)
+        except Exception as e:
+            print(f"⚠️ Erro ao medir imagens da página {page_num + 1}: {e}", file=sys.stderr)
+            return 1.0  # na dúvida, ler também por OCR
+        return min(1.0, area_imagens / area_pagina) if area_pagina else 0.0
+    
+    def render_cinza(self, page_num: int, escala: float, clip: Tuple[float, float, float, float] = None,
+                     escala_maxima: float = None):
+        """Página (ou recorte) em cinza como matriz NumPy na escala pedida. A rasterização acontece uma
+        única vez, em escala_maxima; escalas menores são obtidas por redução da imagem já renderizada,
+        que fica no cache LRU do documento para o OCR de texto e o de assinatura"""
+        import fitz  # PyMuPDF
+        import numpy as np
+        from preprocessamento_ocr import pixmap_para_cinza, reduzir
+        
+        escala_maxima = max(escala, escala_maxima or escala)
+        chave = (page_num, tuple(clip) if clip else None)
+        
+        # PyMuPDF não é thread-safe: renderizar uma página por vez
+        with self.render_lock:
+            guardado = self._renders.get(chave)
+            if guardado is not None and guardado[0] >= escala:
+                self._renders.move_to_end(chave)
+            else:
+                page = self.fitz_doc.load_page(page_num)
+                pix = page.get_pixmap(matrix=fitz.Matrix(escala_maxima, escala_maxima),
+                                      clip=fitz.Rect(clip) if clip else None,
+                                      colorspace=fitz.csGRAY, alpha=False)
+                # Cópia única: a matriz guardada não depende do pixmap, que é liberado em seguida
+                guardado = (escala_maxima, np.array(pixmap_para_cinza(pix)))
+                del pix
+                self._guardar_render(chave, guardado)
+        
+        escala_render, cinza = guardado
+        return reduzir(cinza, escala / escala_render)
+    
+    def _guardar_render(self, chave, guardado):
+        antigo = self._renders.pop(chave, None)
+        if antigo is not None:
+            self._renders_bytes -= antigo[1].nbytes
+        
+        limite = self.RENDER_CACHE_MB * 1024 * 1024
+        if guardado[1].nbytes > limite:
+            return
+        while self._renders and self._renders_bytes + guardado[1].nbytes > limite:
+            _, removido = self._renders.popitem(last=False)
+            self._renders_bytes -= removido[1].nbytes
+        self._renders[chave] = guardado
+        self._renders_bytes += guardado[1].nbytes
+    
+    def regioes_interesse(self, page_num: int, rotulos: Tuple[str, ...] = ()) -> Optional[List[Tuple[float, float, float, float]]]:
+        """Retângulos (x0, y0, x1, y1) candidatos ao OCR: imagens embutidas, a faixa do rodapé e a área
+        ao lado/abaixo dos rótulos encontrados na camada de texto. None se as regiões somadas cobrem
+        tanto da página que o OCR da página inteira sai mais barato, ou se alguma imagem da página
+        não pôde ser localizada (ela ficaria de fora dos recortes)"""
+        import fitz  # PyMuPDF
+        
+        with self.render_lock:
+            page = self.fitz_doc.load_page(page_num)
+            pagina = page.rect
+            regioes = []
+            
+            for img in page.get_images(full=True):
+                retangulos = page.get_image_rects(img[0])
+                if not retangulos:
+                    return None
+                for rect in retangulos:
+                    rect = rect & pagina
+                    # Ignorar marcas minúsculas (linhas, pixels de espaçamento)
+                    if rect.width > 20 and rect.height > 10:
+                        regioes.append(rect)
+            
+            regioes.append(fitz.Rect(pagina.x0, pagina.y1 - pagina.height * self.ROI_FAIXA_RODAPE, pagina.x1, pagina.y1))
+            
+            for rotulo in rotulos:
+                for rect in page.search_for(rotulo):
+                    # O valor costuma estar à direita na mesma linha ou logo abaixo do rótulo
+                    regioes.append(fitz.Rect(rect.x0, rect.y0, pagina.x1, rect.y1 + 2 * rect.height))
+        
+        regioes = [(r + (-self.ROI_MARGEM, -self.ROI_MARGEM, self.ROI_MARGEM, self.ROI_MARGEM)) & pagina for r in regioes]
+        regioes = self._unir_regioes([r for r in regioes if not r.is_empty])
+        
+        area_pagina = abs(pagina)
+        if area_pagina and sum(abs(r) for r in regioes) / area_pagina > self.ROI_MAX_COBERTURA:
+            return None
+        # Ordem de leitura: de cima para baixo
+        return [tuple(r) for r in sorted(regioes, key=lambda r: (r.y0, r.x0))]
+    
+    @staticmethod
+    def _unir_regioes(regioes: List) -> List:
+        """Funde retângulos que se sobrepõem, para que nenhum trecho seja lido duas vezes"""
+        unidas = []
+        for rect in regioes:
+            rect = +rect
+            mudou = True
+            while mudou:
+                mudou = False
+                for outra in unidas:
+                    if rect.intersects(outra):
+                        unidas.remove(outra)
+                        rect |= outra
+                        mudou = True
+                        break
+            unidas.append(rect)
+        return unidas
+    
+    def assinatura_estrutural(self) -> Optional[str]:
+        """Descrição da assinatura digital embutida no PDF, ou None se a estrutura não tiver nenhuma.
+        Lê apenas o dicionário de objetos (sem renderizar): SigFlags do AcroForm, campos /Sig
+        preenchidos e dicionários de assinatura com /ByteRange e /Contents"""
+        if self._assinatura_estrutural is False:
+            try:
+                self._assinatura_estrutural = self._detectar_assinatura_estrutural()
+            except Exception as e:
+                print(f"⚠️ Não foi possível ler a estrutura de assinatura de {self.pdf_path}: {e}", file=sys.stderr)
+                self._assinatura_estrutural = None
+        return self._assinatura_estrutural
+    
+    def _detectar_assinatura_estrutural(self) -> Optional[str]:
+        import fitz  # PyMuPDF
+        doc = self.fitz_doc
+        
+        # Bit 1 de /SigFlags: o formulário declara que contém assinaturas
+        sigflags = doc.get_sigflags() if doc.is_form_pdf else -1
+        if sigflags > 0 and sigflags & 1:
+            return 'AcroForm /SigFlags'
+        
+        # Campos de assinatura com valor (/V) apontando para um dicionário de assinatura
+        for page in doc:
+            for widget in page.widgets() or []:
+                if widget.field_type != fitz.PDF_WIDGET_TYPE_SIGNATURE:
+                    continue
+                tipo, valor = doc.xref_get_key(widget.xref, 'V')
+                if tipo == 'xref':
+                    return f'campo /Sig preenchido ({widget.field_name or "sem nome"}, página {page.number + 1})'
+        
+        # Dicionários de assinatura soltos (ex.: atualização incremental sem AcroForm)
+        for xref in range(1, doc.xref_length()):
+            if doc.xref_get_key(xref, 'ByteRange')[0] == 'array' and doc.xref_get_key(xref, 'Contents')[0] != 'null':
+                return f'dicionário de assinatura /ByteRange (objeto {xref})'
+        return None
+    
+    def close(self):
+        self._renders.clear()
+        self._renders_bytes = 0
+        if self._fitz_doc is not None:
+            self._fitz_doc.close()
+            self._fitz_doc = None
+
 class PontoProcessor:
-    def __init__(self):
+    # Confiança média mínima (0-100) para encerrar a cascata de OCR, por tipo de documento
+    OCR_CONFIDENCE_THRESHOLDS = {
+        'ponto': 70,
+        'contracheque': 75,
+        'recibo': 70,
+        'assinatura': 60,
+        'padrao': 70,
+    }
+    
+    # Resoluções testadas em ordem crescente de custo
+    OCR_RESOLUTIONS = [2, 4, 6]
+    
+    # Rótulos da camada de texto que indicam onde procurar, no modo de OCR por regiões de interesse
+    OCR_ROI_ROTULOS = {
+        'assinatura': ('Assinado', 'Assinatura'),
+        'contracheque': ('Líquido', 'Liquido', 'Total', 'Vencimentos', 'Descontos'),
+    }
+    
+    # Máximo de páginas processadas em paralelo pelo OCR de um único documento
+    OCR_MAX_THREADS = int(os.getenv('OCR_MAX_THREADS', min(4, os.cpu_count() or 1)))
+    
+    # Configurações do Tesseract em ordem de prioridade (a primeira é a principal)
+    OCR_CONFIGS = [
+        # Padrão otimizado para português
+        {'lang': 'por', 'config': r'--oem 3 --psm 6'},
+        # Simples sem restrições
+        {'lang': 'eng', 'config': r'--oem 3 --psm 6'},
+        # Para texto livre
+        {'lang': 'eng', 'config': r'--oem 3 --psm 3'},
+        # Inglês com lista de caracteres permitidos
+        {'lang': 'eng', 'config': r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzÀÁÂÃÇÉÊÍÓÔÕÚàáâãçéêíóôõú0123456789.,:-/\s'},
+    ]
+    
+    def __init__(self, cache: ExtractionCache = None, progress_callback=None, colaboradores: ColaboradoresIndex = None):
         self.results = []
+        self.cache = cache or get_default_cache()
+        self.colaboradores = colaboradores or get_colaboradores_index()
+        # Chamado como progress_callback(etapa, dados) ao fim de cada etapa do processamento
+        self.progress_callback = progress_callback
     
-
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
+    def _notificar(self, etapa: str, **dados):
+        """Repassa um evento de progresso; falhas do callback não interrompem o processamento"""
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(etapa, dados)
+        except Exception as e:
+            print(f"⚠️ Falha ao notificar progresso ({etapa}): {e}", file=sys.stderr)
+    
+    def open_document(self, pdf_path: str, conteudo: bytes = None) -> DocumentoPDF:
+        """Abre o contexto compartilhado de um PDF (usar com 'with'); aceita os bytes do arquivo"""
+        return DocumentoPDF(pdf_path, self.cache, conteudo)
+    
+    def extract_text_from_pdf(self, pdf_path: str, documento: DocumentoPDF = None) -> str:
         """Extrai texto completo de um PDF - SOLUÇÃO ROBUSTA"""
+        # Documento aberto aqui (e não pelo chamador) é fechado no fim
+        own_documento = documento is None
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = ""
-                table_data = []
-                
-                for page_num, page in enumerate(pdf.pages):
-                    # Tentar extrair texto
-                    text = page.extract_text()
-                    if text:
-                        text = self.clean_text(text)
-                        full_text += text + "\n"
-                        print(f"Página {page_num + 1}: {len(text)} caracteres extraídos")
-                        if page_num == 0:
-                            print(f"Primeiros 200 chars: {text[:200]}")
-                    
-                    # SEMPRE tentar extrair tabelas
-                    tables = page.extract_tables()
-                    if tables:
-                        for table in tables:
-                            for row in table:
-                                if row and any(cell for cell in row if cell):
-                                    row_text = " ".join([str(cell) for cell in row if cell])
-                                    table_data.append(row_text)
-                                    full_text += row_text + "\n"
-                
-                # Se não conseguiu extrair texto legível, usar dados das tabelas
-                if len(full_text.strip()) < 100 or not re.search(r'[A-Za-z]', full_text):
-                    print("Texto extraído muito pobre, usando dados das tabelas...")
-                    full_text = "\n".join(table_data)
+            documento = documento or self.open_document(pdf_path)
+            partes = []
+            table_data = []
+            
+            for page_num, page in enumerate(documento.pages):
+                # Tentar extrair texto
+                text = page['text']
+                if text:
+                    text = self.clean_text(text)
+                    partes.append(text)
+                    print(f"Página {page_num + 1}: {len(text)} caracteres extraídos")
+                    if page_num == 0:
+                        print(f"Primeiros 200 chars: {text[:200]}")
                 
-                return full_text
+                # SEMPRE tentar extrair tabelas
+                tables = page['tables']
+                if tables:
+                    for table in tables:
+                        for row in table:
+                            if row and any(cell for cell in row if cell):
+                                row_text = " ".join([str(cell) for cell in row if cell])
+                                table_data.append(row_text)
+                                partes.append(row_text)
+            
+            full_text = "".join(parte + "\n" for parte in partes)
+            
+            # Se não conseguiu extrair texto legível, usar dados das tabelas
+            if len(full_text.strip()) < 100 or not re.search(r'[A-Za-z]', full_text):
+                print("Texto extraído muito pobre, usando dados das tabelas...")
+                full_text = "\n".join(table_data)
+            
+            return full_text
         except Exception as e:
             print(f"Erro ao extrair texto de {pdf_path}: {e}")
             return ""
+        finally:
+            if own_documento and documento is not None:
+                documento.close()
     
     def clean_text(self, text: str) -> str:
         """Limpa texto removendo caracteres especiais e normalizando"""
@@ -111,17 +474,10 @@ class PontoProcessor:
         return text.strip()
     
     def load_valid_colaboradores(self) -> List[str]:
-        """Carrega a lista de colaboradores válidos do arquivo"""
+        """Lista de colaboradores válidos (arquivo e/ou banco), mantida em memória pelo índice compartilhado"""
         try:
-            colaboradores_file = os.path.join(os.getcwd(), 'colaboradores_validos.txt')
-            if os.path.exists(colaboradores_file):
-                with open(colaboradores_file, 'r', encoding='utf-8') as f:
-                    colaboradores = [linha.strip() for linha in f.readlines() if linha.strip()]
-                print(f"Lista de colaboradores carregada: {len(colaboradores)} nomes")
-                return colaboradores
-            else:
-                print("Arquivo colaboradores_validos.txt não encontrado, usando validação padrão")
-                return []
+            self.colaboradores.atualizar()
+            return list(self.colaboradores.nomes)
         except Exception as e:
             print(f"Erro ao carregar lista de colaboradores: {e}")
             return []
@@ -131,17 +487,11 @@ class PontoProcessor:
         if not nome or nome == "Não encontrado":
             return False
         
-        # Carregar lista de colaboradores válidos
-        colaboradores_validos = self.load_valid_colaboradores()
-        
-        # Se existe lista de colaboradores válidos, usar apenas ela
-        if colaboradores_validos:
-            # Verificar se o nome está na lista (case-insensitive)
-            nome_normalizado = nome.strip().upper()
-            for colaborador_valido in colaboradores_validos:
-                if colaborador_valido.strip().upper() == nome_normalizado:
-                    print(f"✅ Colaborador '{nome}' encontrado na lista válida", file=sys.stderr)
-                    return True
+        # Se existe lista de colaboradores válidos, usar apenas ela (consulta em memória, sem acentos/caixa)
+        if len(self.colaboradores):
+            if self.colaboradores.contem(nome):
+                print(f"✅ Colaborador '{nome}' encontrado na lista válida", file=sys.stderr)
+                return True
             
             print(f"❌ Colaborador '{nome}' NÃO encontrado na lista válida", file=sys.stderr)
             return False
@@ -168,6 +518,25 @@ class PontoProcessor:
             
         return True
     
+    def resolve_colaborador_name(self, nome: str, text: str = "") -> str:
+        """Troca o nome extraído pelo nome cadastrado mais parecido (busca aproximada no índice);
+        se o candidato não corresponder a ninguém, procura um colaborador no texto completo"""
+        if not len(self.colaboradores):
+            return nome
+        
+        encontrado = None
+        if nome and nome != "Não encontrado":
+            encontrado = self.colaboradores.melhor_correspondencia(nome)
+        if not encontrado and text:
+            encontrado = self.colaboradores.encontrar_no_texto(text)
+        
+        if encontrado:
+            nome_cadastrado, score = encontrado
+            if nome_cadastrado != nome:
+                print(f"Nome ajustado pela lista de colaboradores: '{nome}' -> '{nome_cadastrado}' ({score:.2f})", file=sys.stderr)
+            return nome_cadastrado
+        return nome
+    
     def extract_header_info(self, text: str) -> Tuple[str, str]:
         """Extrai nome do colaborador e período do cabeçalho - SOLUÇÃO UNIVERSAL"""
         # Aplicar limpeza de texto primeiro
@@ -264,34 +633,44 @@ class PontoProcessor:
         
         return nome, "Não encontrado"
     
-    def check_digital_signature(self, text: str, pdf_path: str = None) -> bool:
+    def check_digital_signature(self, text: str, pdf_path: str = None, documento: DocumentoPDF = None) -> bool:
         """Verifica se o documento tem assinatura - FOCO EM 'ASSINADO'"""
-        text_lower = text.lower()
-        
-        # PRIMEIRA PRIORIDADE: Procurar diretamente por "assinado" no texto extraído
+        assinado, _ = self.detect_signature(text, pdf_path, documento)
+        return assinado
+    
+    def detect_signature(self, text: str, pdf_path: str = None, documento: DocumentoPDF = None,
+                         usar_ocr: bool = True) -> Tuple[bool, str]:
+        """Retorna (assinado, método que decidiu): 'estrutura', 'texto', 'ocr' ou 'nenhum'.
+        O OCR só roda quando a estrutura do PDF e o texto extraído não são conclusivos"""
+        # PRIMEIRA PRIORIDADE: Assinatura digital real na estrutura do PDF (sem OCR, sem renderização)
+        estrutura = None
+        if documento is not None:
+            estrutura = documento.assinatura_estrutural()
+        elif pdf_path:
+            estrutura = self._assinatura_estrutural_arquivo(pdf_path)
+        if estrutura:
+            print(f"✅ ASSINATURA DETECTADA na estrutura do PDF: {estrutura}")
+            return True, 'estrutura'
+        
+        text_lower = (text or '').lower()
+        
+        # SEGUNDA PRIORIDADE: Procurar diretamente por "assinado" no texto extraído
         if 'assinado' in text_lower:
             print(f"✅ ASSINATURA DETECTADA: Palavra 'assinado' encontrada no texto")
-            return True
-        
-        # SEGUNDA PRIORIDADE: Outros padrões comuns de assinatura
-        simple_patterns = [
-            r'assinado',
-            r'assinatura\s*(digital|eletrônica)',
-            r'documento\s*assinado',
-            r'digitalmente\s*assinado',
-            r'pré-assinado',
-            r'pre-assinado'
-        ]
-        
-        for pattern in simple_patterns:
-            if re.search(pattern, text_lower):
-                print(f"✅ ASSINATURA DETECTADA no texto: {pattern}")
-                return True
-        
-        # TERCEIRA PRIORIDADE: Se não encontrou no texto, usar OCR nas imagens
-        if pdf_path:
-            print(f"🔍 Executando OCR para buscar 'assinado' nas imagens: {pdf_path}", file=sys.stderr)
-            ocr_text = self.extract_text_with_ocr(pdf_path)
+            return True, 'texto'
+        
+        # Outros padrões comuns de assinatura (alternação pré-compilada, uma passada)
+        match = RE_ASSINATURA_TEXTO.search(text_lower)
+        if match:
+            print(f"✅ ASSINATURA DETECTADA no texto: {match.group()}")
+            return True, 'texto'
+        
+        # TERCEIRA PRIORIDADE: Se não encontrou na estrutura nem no texto, usar OCR nas imagens
+        if pdf_path and usar_ocr:
+            # Só as regiões onde o carimbo pode estar (imagens, rodapé, rótulos). A página inteira é lida
+            # apenas onde as regiões não servem: cobririam quase tudo ou há imagem sem posição conhecida
+            print(f"🔍 Executando OCR por regiões para buscar 'assinado': {pdf_path}", file=sys.stderr)
+            ocr_text = self.extract_text_with_ocr(pdf_path, doc_type='assinatura', documento=documento, roi=True)
             if ocr_text:
                 ocr_text_lower = ocr_text.lower()
                 print(f"📄 Texto OCR extraído ({len(ocr_text)} chars): {ocr_text[:300]}...", file=sys.stderr)
@@ -299,141 +678,96 @@ class PontoProcessor:
                 # Verificar especificamente por "assinado" no texto OCR
                 if 'assinado' in ocr_text_lower:
                     print(f"✅ ASSINATURA DETECTADA via OCR: Palavra 'assinado' encontrada")
-                    return True
+                    return True, 'ocr'
                 
                 # Verificar outros padrões no OCR
-                for pattern in simple_patterns:
-                    if re.search(pattern, ocr_text_lower):
-                        print(f"✅ ASSINATURA DETECTADA via OCR: {pattern}")
-                        return True
+                match = RE_ASSINATURA_TEXTO.search(ocr_text_lower)
+                if match:
+                    print(f"✅ ASSINATURA DETECTADA via OCR: {match.group()}")
+                    return True, 'ocr'
                         
                 print(f"❌ Palavra 'assinado' não encontrada no OCR", file=sys.stderr)
             else:
                 print("❌ OCR não retornou texto", file=sys.stderr)
         
         print("❌ ASSINATURA NÃO DETECTADA")
-        return False
+        return False, 'nenhum'
     
-    def extract_text_with_ocr(self, pdf_path: str) -> str:
-        """Extrai texto de imagens no PDF usando OCR AVANÇADO com múltiplas estratégias"""
+    def _assinatura_estrutural_arquivo(self, pdf_path: str) -> Optional[str]:
+        """Verificação estrutural para chamadas sem documento aberto"""
+        with self.open_document(pdf_path) as documento:
+            return documento.assinatura_estrutural()
+    
+    def extract_text_with_ocr(self, pdf_path: str, doc_type: str = 'ponto', documento: DocumentoPDF = None,
+                              paginas: List[int] = None, roi: bool = False) -> str:
+        """Extrai texto de imagens no PDF usando OCR em cascata adaptativa com parada antecipada
+        
+        paginas restringe o OCR a esses índices (base 0); por padrão todas as páginas são lidas.
+        Com roi=True apenas as regiões de interesse de cada página (imagens, rodapé e vizinhança dos
+        rótulos de OCR_ROI_ROTULOS[doc_type]) são recortadas e lidas.
+        """
         try:
-            import pytesseract
             import fitz  # PyMuPDF
-            from PIL import Image, ImageEnhance, ImageFilter, ImageOps
-            import io
-            import numpy as np
             
-            print(f"🔍 Executando OCR AVANÇADO: {pdf_path}", file=sys.stderr)
+            threshold = self.OCR_CONFIDENCE_THRESHOLDS.get(doc_type, self.OCR_CONFIDENCE_THRESHOLDS['padrao'])
+            print(f"🔍 Executando OCR em cascata ({doc_type}, confiança mínima {threshold}): {pdf_path}", file=sys.stderr)
             
-            # Configurar caminho do Tesseract se necessário
-            try:
-                pytesseract.get_tesseract_version()
-            except:
-                # Tentar caminhos comuns do Tesseract no Windows
-                possible_paths = [
-                    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                    r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
-                ]
-                for path in possible_paths:
-                    if os.path.exists(path):
-                        pytesseract.pytesseract.tesseract_cmd = path
-                        print(f"⚙️ Tesseract configurado: {path}", file=sys.stderr)
-                        break
+            # Motor residente (tesserocr) ou pytesseract; ImportError se nenhum estiver instalado
+            get_ocr_engine()
             
-            # Abrir PDF com PyMuPDF
-            doc = fitz.open(pdf_path)
+            # Reaproveitar o documento já aberto, se houver; senão abrir só para este OCR
+            own_documento = documento is None
+            documento = documento or self.open_document(pdf_path)
             
-            all_ocr_text = ""
-            
-            for page_num in range(len(doc)):
-                print(f"📄 Processando página {page_num+1} com OCR AVANÇADO...", file=sys.stderr)
-                page = doc.load_page(page_num)
+            try:
+                # Parâmetros que influenciam o resultado entram na chave do cache, inclusive o pré-processamento:
+                # textos lidos com variantes antigas não são reaproveitados
+                from preprocessamento_ocr import FATOR_CONTRASTE, NOMES_VARIANTES, VERSAO_PREPROCESSAMENTO
+                cache_params = {
+                    'threshold': threshold,
+                    'resolutions': self.OCR_RESOLUTIONS,
+                    'configs': self.OCR_CONFIGS,
+                    'preprocessamento': VERSAO_PREPROCESSAMENTO,
+                    'variantes': NOMES_VARIANTES,
+                    'contraste': FATOR_CONTRASTE,
+                }
                 
-                # ESTRATÉGIA 1: Múltiplas resoluções para capturar diferentes partes do documento
-                resolutions = [(2, 2), (4, 4), (6, 6)]  # Baixa, média, alta resolução
-                page_texts = []
+                # Renderização e OCR das páginas em paralelo; o Tesseract roda fora do GIL
+                if paginas is None:
+                    paginas = list(range(len(documento.fitz_doc)))
+                num_pages = len(paginas)
+                if not num_pages:
+                    return ""
+                workers = max(1, min(self.OCR_MAX_THREADS, num_pages))
+                if workers > 1:
+                    print(f"🧵 OCR de {num_pages} páginas com {workers} threads", file=sys.stderr)
                 
-                for res_x, res_y in resolutions:
-                    try:
-                        print(f"   🔍 Testando resolução {res_x}x{res_y}...", file=sys.stderr)
-                        
-                        # Converter página para imagem com resolução específica
-                        pix = page.get_pixmap(matrix=fitz.Matrix(res_x, res_y))
-                        img_data = pix.tobytes("png")
-                        
-                        # Converter para PIL Image
-                        img = Image.open(io.BytesIO(img_data))
-                        
-                        # ESTRATÉGIA 2: Múltiplos pré-processamentos
-                        processed_images = self._preprocess_image_variants(img)
-                        
-                        for i, processed_img in enumerate(processed_images):
-                            try:
-                                # ESTRATÉGIA 3: Múltiplas configurações do Tesseract
-                                ocr_configs = [
-                                    # Configuração 1: Padrão otimizado para português
-                                    {'lang': 'por', 'config': r'--oem 3 --psm 6'},
-                                    
-                                    # Configuração 2: Inglês com configuração avançada
-                                    {'lang': 'eng', 'config': r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzÀÁÂÃÇÉÊÍÓÔÕÚàáâãçéêíóôõú0123456789.,:-/\s'},
-                                    
-                                    # Configuração 3: Para capturar valores monetários
-                                    {'lang': 'eng', 'config': r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789.,'},
-                                    
-                                    # Configuração 4: Para texto livre
-                                    {'lang': 'eng', 'config': r'--oem 3 --psm 3'},
-                                    
-                                    # Configuração 5: Simples sem restrições
-                                    {'lang': 'eng', 'config': r'--oem 3 --psm 6'}
-                                ]
-                                
-                                for config in ocr_configs:
-                                    try:
-                                        text = pytesseract.image_to_string(
-                                            processed_img, 
-                                            lang=config['lang'], 
-                                            config=config['config']
-                                        )
-                                        
-                                        if text.strip() and len(text) > 20:  # Só aceitar textos significativos
-                                            page_texts.append(text)
-                                            print(f"      ✅ Sucesso: {config['lang']} - prep {i+1} - {len(text)} chars", file=sys.stderr)
-                                            
-                                            # Se encontrar valores importantes, destacar
-                                            important_values = ['7.066', '1.648', '5.418', 'Total', 'Líquido', 'Vencimento', 'Desconto']
-                                            for value in important_values:
-                                                if value.lower() in text.lower():
-                                                    print(f"         🎯 VALOR IMPORTANTE ENCONTRADO: {value}", file=sys.stderr)
-                                            
-                                            break  # Se deu certo, não precisa testar outras configs
-                                    except Exception as config_error:
-                                        continue
-                                        
-                            except Exception as prep_error:
-                                continue
-                                
-                    except Exception as res_error:
-                        print(f"   ❌ Erro na resolução {res_x}x{res_y}: {res_error}", file=sys.stderr)
-                        continue
+                self._notificar('ocr', doc_type=doc_type, paginas=num_pages)
                 
-                # ESTRATÉGIA 4: Combinar todos os textos capturados da página
-                if page_texts:
-                    # Escolher o texto mais longo como principal
-                    best_text = max(page_texts, key=len)
-                    all_ocr_text += best_text + "\n"
-                    
-                    print(f"✅ Página {page_num+1}: {len(best_text)} chars extraídos (de {len(page_texts)} tentativas)", file=sys.stderr)
-                    
-                    # Log das primeiras linhas para debug
-                    first_lines = '\n'.join(best_text.split('\n')[:3])
-                    print(f"📝 Primeiras linhas: {first_lines}", file=sys.stderr)
-                else:
-                    print(f"❌ Página {page_num+1}: Nenhum texto extraído", file=sys.stderr)
-            
-            doc.close()
+                rotulos = self.OCR_ROI_ROTULOS.get(doc_type, ())
+                
+                def ocr_pagina(page_num):
+                    regioes = documento.regioes_interesse(page_num, rotulos) if roi else None
+                    if regioes is None:
+                        texto = self._ocr_page(documento, page_num, threshold, cache_params)
+                    else:
+                        print(f"✂️ Página {page_num+1}: OCR de {len(regioes)} região(ões) de interesse", file=sys.stderr)
+                        textos = [self._ocr_page(documento, page_num, threshold, cache_params, clip) for clip in regioes]
+                        texto = "\n".join(t for t in textos if t)
+                    self._notificar('ocr_pagina', doc_type=doc_type, pagina=page_num + 1, paginas=num_pages)
+                    return texto
+                
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    page_texts = list(executor.map(ocr_pagina, paginas))
+                
+                # Reagrupar as páginas na ordem original
+                all_ocr_text = "".join(text + "\n" for text in page_texts if text)
+            finally:
+                if own_documento:
+                    documento.close()
             
             if all_ocr_text.strip():
-                print(f"✅ OCR AVANÇADO concluído. Texto total: {len(all_ocr_text)} caracteres", file=sys.stderr)
+                print(f"✅ OCR em cascata concluído. Texto total: {len(all_ocr_text)} caracteres", file=sys.stderr)
                 # Salvar texto para debug se necessário
                 try:
                     with open(f'debug_ocr_{os.path.basename(pdf_path)}.txt', 'w', encoding='utf-8') as f:
@@ -442,7 +776,7 @@ class PontoProcessor:
                 except:
                     pass
             else:
-                print(f"❌ OCR AVANÇADO não extraiu nenhum texto", file=sys.stderr)
+                print(f"❌ OCR em cascata não extraiu nenhum texto", file=sys.stderr)
             
             return all_ocr_text
             
@@ -450,80 +784,160 @@ class PontoProcessor:
             print(f"❌ Erro: Dependências OCR não instaladas: {e}", file=sys.stderr)
             return ""
         except Exception as e:
-            print(f"❌ Erro durante OCR AVANÇADO: {e}", file=sys.stderr)
+            print(f"❌ Erro durante OCR em cascata: {e}", file=sys.stderr)
             
             # FALLBACK: Usar OCR simples
             print("🔄 FALLBACK: Tentando OCR simples...", file=sys.stderr)
-            return self._simple_ocr_fallback(pdf_path)
+            # Uploads e trechos de lote só existem em memória: o fallback lê os mesmos bytes
+            return self._simple_ocr_fallback(pdf_path, documento.conteudo if documento is not None else None)
     
-    def _preprocess_image_variants(self, img):
-        """Cria múltiplas variantes da imagem com diferentes pré-processamentos"""
-        from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+    def _ocr_page(self, documento: DocumentoPDF, page_num: int, threshold: float, cache_params: Dict,
+                  clip: Tuple[float, float, float, float] = None) -> str:
+        """OCR em cascata de uma única página, ou só do recorte clip (executado em uma thread do pool)"""
+        if clip is not None:
+            cache_params = dict(cache_params, clip=[round(c, 1) for c in clip])
+        
+        cached_text = self.cache.get(documento.hash, page_num, 'ocr', cache_params)
+        if cached_text is not None:
+            print(f"♻️ Cache: OCR da página {page_num+1} reaproveitado ({len(cached_text)} chars)", file=sys.stderr)
+            return cached_text
+        
+        print(f"📄 Processando página {page_num+1}{' (recorte)' if clip else ''} com OCR em cascata...", file=sys.stderr)
+        
+        best_text, best_conf, tentativas = "", -1.0, 0
+        
+        # Começar pela resolução mais barata e só subir se a confiança não for suficiente;
+        # a página é rasterizada uma vez na maior resolução e reduzida para as demais
+        escala_maxima = max(self.OCR_RESOLUTIONS)
+        for scale in self.OCR_RESOLUTIONS:
+            try:
+                cinza = documento.render_cinza(page_num, scale, clip, escala_maxima)
+            except Exception as res_error:
+                print(f"   ❌ Erro na resolução {scale}x{scale}: {res_error}", file=sys.stderr)
+                continue
+            
+            text, conf, n = self._ocr_cascade_for_image(cinza, threshold)
+            del cinza
+            tentativas += n
+            print(f"   🔍 Página {page_num+1}, resolução {scale}x{scale}: confiança {conf:.1f} ({len(text)} chars)", file=sys.stderr)
+            
+            if conf > best_conf:
+                best_text, best_conf = text, conf
+            if best_conf >= threshold:
+                break
         
-        variants = []
+        self.cache.set(documento.hash, page_num, 'ocr', best_text, cache_params)
         
-        # Variante 1: Original em escala de cinza
-        if img.mode != 'L':
-            gray_img = img.convert('L')
+        if best_text:
+            print(f"✅ Página {page_num+1}: {len(best_text)} chars extraídos, confiança {best_conf:.1f} ({tentativas} execuções do Tesseract)", file=sys.stderr)
+            
+            # Se encontrar valores importantes, destacar
+            important_values = ['7.066', '1.648', '5.418', 'Total', 'Líquido', 'Vencimento', 'Desconto']
+            for value in important_values:
+                if value.lower() in best_text.lower():
+                    print(f"         🎯 VALOR IMPORTANTE ENCONTRADO: {value}", file=sys.stderr)
+            
+            # Log das primeiras linhas para debug
+            first_lines = '\n'.join(best_text.split('\n')[:3])
+            print(f"📝 Primeiras linhas: {first_lines}", file=sys.stderr)
         else:
-            gray_img = img.copy()
-        variants.append(gray_img)
-        
-        # Variante 2: Alto contraste
-        high_contrast = gray_img.copy()
-        enhancer = ImageEnhance.Contrast(high_contrast)
-        high_contrast = enhancer.enhance(3.0)
-        variants.append(high_contrast)
-        
-        # Variante 3: Binarização (preto e branco puro)
-        binary_img = gray_img.copy()
-        # Converter para preto e branco usando threshold
-        threshold = 128
-        binary_img = binary_img.point(lambda x: 0 if x < threshold else 255, '1')
-        variants.append(binary_img)
-        
-        # Variante 4: Inverter cores (útil para textos em fundo escuro)
-        inverted_img = ImageOps.invert(gray_img)
-        variants.append(inverted_img)
-        
-        # Variante 5: Nitidez aumentada
-        sharp_img = gray_img.copy()
-        sharp_img = sharp_img.filter(ImageFilter.SHARPEN)
-        variants.append(sharp_img)
-        
-        # Variante 6: Denoising (redução de ruído)
-        smooth_img = gray_img.copy()
-        smooth_img = smooth_img.filter(ImageFilter.SMOOTH)
-        variants.append(smooth_img)
-        
-        return variants
-    
-    def _simple_ocr_fallback(self, pdf_path: str) -> str:
-        """OCR simples como fallback"""
+            print(f"❌ Página {page_num+1}: Nenhum texto extraído", file=sys.stderr)
+        
+        return best_text
+    
+    def _ocr_cascade_for_image(self, cinza, threshold: float) -> Tuple[str, float, int]:
+        """Executa a cascata de OCR em uma imagem em cinza (matriz NumPy): variantes com a configuração
+        principal, depois configurações alternativas apenas na melhor variante. Retorna (texto, confiança, execuções)."""
+        from PIL import Image
+        from preprocessamento_ocr import gerar_variante, variantes
+        
+        best_text, best_conf, best_variant = "", -1.0, None
+        runs = 0
+        primary, *alternatives = self.OCR_CONFIGS
+        
+        # ETAPA 1: Variantes de pré-processamento com a configuração principal, geradas sob demanda
+        for nome, variant in variantes(cinza):
+            try:
+                text, conf = self._ocr_with_confidence(Image.fromarray(variant), primary['lang'], primary['config'])
+                runs += 1
+            except Exception:
+                continue
+            if conf > best_conf:
+                best_text, best_conf, best_variant = text, conf, nome
+            if best_conf >= threshold:
+                return best_text, best_conf, runs
+        
+        # ETAPA 2: Configurações alternativas apenas na melhor variante (recriada: o buffer foi reaproveitado)
+        if best_variant is not None:
+            img = Image.fromarray(gerar_variante(cinza, best_variant))
+            for config in alternatives:
+                try:
+                    text, conf = self._ocr_with_confidence(img, config['lang'], config['config'])
+                    runs += 1
+                except Exception:
+                    continue
+                if conf > best_conf:
+                    best_text, best_conf = text, conf
+                if best_conf >= threshold:
+                    break
+        
+        return best_text, best_conf, runs
+    
+    def _ocr_with_confidence(self, img, lang: str, config: str) -> Tuple[str, float]:
+        """Executa o Tesseract e retorna o texto reconstruído e a confiança média das palavras"""
+        data = get_ocr_engine().dados(img, lang, config)
+        
+        lines = {}
+        confs = []
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            if not word:
+                continue
+            try:
+                conf = float(data['conf'][i])
+            except (TypeError, ValueError):
+                conf = -1.0
+            if conf >= 0:
+                # Ponderar pelo tamanho da palavra para que ruídos de 1 caractere pesem menos
+                confs.append((conf, len(word)))
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+        
+        text = "\n".join(" ".join(words) for words in lines.values())
+        
+        # Só aceitar textos significativos
+        if len(text) <= 20 or not confs:
+            return text, 0.0
+        
+        total_chars = sum(size for _, size in confs)
+        mean_conf = sum(conf * size for conf, size in confs) / total_chars
+        return text, mean_conf
+    
+    def _simple_ocr_fallback(self, pdf_path: str, conteudo: bytes = None) -> str:
+        """OCR simples como fallback (do arquivo ou dos bytes do PDF, quando ele não está em disco)"""
         try:
-            import pytesseract
             import fitz
             from PIL import Image
-            import io
             
-            doc = fitz.open(pdf_path)
-            simple_text = ""
+            engine = get_ocr_engine()
+            doc = fitz.open(stream=conteudo, filetype="pdf") if conteudo is not None else fitz.open(pdf_path)
+            partes = []
             
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                img_data = pix.tobytes("png")
-                img = Image.open(io.BytesIO(img_data))
+                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2), colorspace=fitz.csGRAY, alpha=False)
+                img = Image.frombytes("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride)
                 
                 # OCR simples
                 try:
-                    text = pytesseract.image_to_string(img, lang='eng')
+                    text = engine.texto(img, 'eng')
                     if text.strip():
-                        simple_text += text + "\n"
+                        partes.append(text + "\n")
                 except:
                     continue
             
             doc.close()
+            simple_text = "".join(partes)
             print(f"✅ FALLBACK simples: {len(simple_text)} caracteres", file=sys.stderr)
             return simple_text
             
@@ -531,19 +945,17 @@ class PontoProcessor:
             print(f"❌ FALLBACK simples falhou: {e}", file=sys.stderr)
             
             # FALLBACK FINAL: pdfplumber
-            return self._pdfplumber_fallback(pdf_path)
+            return self._pdfplumber_fallback(pdf_path, conteudo)
     
-    def _pdfplumber_fallback(self, pdf_path: str) -> str:
+    def _pdfplumber_fallback(self, pdf_path: str, conteudo: bytes = None) -> str:
         """Último fallback usando pdfplumber"""
         try:
-            import pdfplumber
-            fallback_text = ""
-            
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        fallback_text += page_text + "\n"
+            origem = io.BytesIO(conteudo) if conteudo is not None else pdf_path
+            fallback_text = "".join(
+                page_text + "\n"
+                for page_text in (page.extract_text() for _, page in iterar_paginas(origem))
+                if page_text
+            )
             
             if fallback_text.strip():
                 print(f"✅ FALLBACK pdfplumber: {len(fallback_text)} caracteres", file=sys.stderr)
@@ -558,72 +970,32 @@ class PontoProcessor:
     
     def parse_daily_entries(self, text: str) -> List[Dict]:
         """Extrai e analisa as entradas diárias do ponto - SOLUÇÃO UNIVERSAL"""
-        # Normalizar espaços
-        text = re.sub(r'\s+', ' ', text)
-        
         print(f"Procurando entradas diárias no texto...", file=sys.stderr)
         
-        # SOLUÇÃO UNIVERSAL: Procurar por linhas que contenham DATA + 4 campos de tempo + C.PRE
-        # Padrão: DATA + qualquer coisa + 4 horários + C.PRE (06:00:00 ou 08:00:00)
+        # SOLUÇÃO UNIVERSAL: DATA + 4 horários + C.PRE (06:00:00 ou 08:00:00), em uma única passada pelo texto
+        dias = extrair_dias_estrito(text)
+        origem = "Entrada encontrada"
         
-        # Primeiro, encontrar todas as datas no texto
-        data_pattern = r'(\d{2}/\d{2}/\d{4})'
-        datas = re.findall(data_pattern, text)
+        # Se não encontrou em sequência, aceitar outros números entre os campos
+        if not dias:
+            print("Tentando padrão alternativo...")
+            dias = extrair_dias_tolerante(text)
+            origem = "Entrada alternativa"
         
         entries = []
-        for data in datas:
-            # Para cada data, procurar a linha correspondente
-            # Padrão: DATA + qualquer coisa + 4 horários + C.PRE
-            linha_pattern = rf'{re.escape(data)}[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?(0[68]:00:00)'
-            
-            match = re.search(linha_pattern, text)
-            if match:
-                campo1 = match.group(1)
-                campo2 = match.group(2)
-                campo3 = match.group(3)
-                campo4 = match.group(4)
-                cpre = match.group(5)
-                
-                entry = {
-                    'data': data,
-                    'dia_semana': 'N/A',
-                    'campo1': campo1,
-                    'campo2': campo2,
-                    'campo3': campo3,
-                    'campo4': campo4,
-                    'cpre': cpre,
-                    'cpre_minutos': self.time_to_minutes(cpre)
-                }
-                entries.append(entry)
-                print(f"Entrada encontrada: {data} - {campo1} {campo2} {campo3} {campo4} C.PRE:{cpre}")
-        
-        # Se não encontrou com o padrão acima, tentar padrão mais genérico
-        if not entries:
-            print("Tentando padrão alternativo...")
-            # Procurar por qualquer sequência: DATA + 4 horários + C.PRE
-            alt_pattern = r'(\d{2}/\d{2}/\d{4}).*?(\d{1,2}:\d{2}).*?(\d{1,2}:\d{2}).*?(\d{1,2}:\d{2}).*?(\d{1,2}:\d{2}).*?(0[68]:00:00)'
-            
-            matches = re.finditer(alt_pattern, text)
-            for match in matches:
-                data = match.group(1)
-                campo1 = match.group(2)
-                campo2 = match.group(3)
-                campo3 = match.group(4)
-                campo4 = match.group(5)
-                cpre = match.group(6)
-                
-                entry = {
-                    'data': data,
-                    'dia_semana': 'N/A',
-                    'campo1': campo1,
-                    'campo2': campo2,
-                    'campo3': campo3,
-                    'campo4': campo4,
-                    'cpre': cpre,
-                    'cpre_minutos': self.time_to_minutes(cpre)
-                }
-                entries.append(entry)
-                print(f"Entrada alternativa: {data} - {campo1} {campo2} {campo3} {campo4} C.PRE:{cpre}")
+        for dia in dias:
+            entry = {
+                'data': dia['data'],
+                'dia_semana': 'N/A',
+                'campo1': dia['campo1'],
+                'campo2': dia['campo2'],
+                'campo3': dia['campo3'],
+                'campo4': dia['campo4'],
+                'cpre': dia['cpre'],
+                'cpre_minutos': self.time_to_minutes(dia['cpre'])
+            }
+            entries.append(entry)
+            print(f"{origem}: {dia['data']} - {dia['campo1']} {dia['campo2']} {dia['campo3']} {dia['campo4']} C.PRE:{dia['cpre']}")
         
         print(f"Total de {len(entries)} entradas diárias encontradas")
         return entries
@@ -707,20 +1079,27 @@ class PontoProcessor:
             # Casos onde há texto mas não há C.PRE válido
             return 0, 'Sem C.PRE válido'
     
-    def process_pdf(self, pdf_path: str) -> Dict:
-        """Processa um PDF completo e retorna resultados estruturados - SOLUÇÃO DEFINITIVA"""
-        print(f"Processando: {pdf_path}")
-        
-        # SOLUÇÃO HÍBRIDA: Extrair texto E tabelas
-        text_data = self.extract_text_from_pdf(pdf_path)
-        table_data = self.extract_table_data(pdf_path)
+    def process_pdf(self, pdf_path: str, conteudo: bytes = None) -> Dict:
+        """Processa um PDF completo e retorna resultados estruturados - SOLUÇÃO DEFINITIVA
         
-        if not table_data:
-            return {"error": f"Falha ao extrair dados de {pdf_path}"}
+        pdf_path identifica o arquivo; se conteudo (bytes) for informado, o PDF é lido da memória.
+        """
+        print(f"Processando: {pdf_path}")
         
-        # Analisar estrutura dos dados extraídos
-        nome, periodo = self.analyze_hybrid_structure(text_data, table_data)
-        assinado = self.check_hybrid_signature(text_data, table_data, pdf_path)
+        # SOLUÇÃO HÍBRIDA: Extrair texto E tabelas de um único documento aberto
+        with self.open_document(pdf_path, conteudo) as documento:
+            text_data = self.extract_text_from_pdf(pdf_path, documento)
+            self._notificar('texto', caracteres=len(text_data))
+            table_data = self.extract_table_data(pdf_path, documento)
+            self._notificar('tabelas', linhas=len(table_data))
+            
+            if not table_data:
+                return {"error": f"Falha ao extrair dados de {pdf_path}"}
+            
+            # Analisar estrutura dos dados extraídos
+            nome, periodo = self.analyze_hybrid_structure(text_data, table_data)
+            assinado, metodo_assinatura = self.detect_hybrid_signature(text_data, table_data, pdf_path, documento)
+            self._notificar('assinatura', assinado=bool(assinado), metodo=metodo_assinatura)
         
         # Extrair entradas diárias das tabelas (MANTIDO COMO ESTAVA)
         entries = self.parse_table_entries(table_data)
@@ -754,6 +1133,7 @@ class PontoProcessor:
             'realizado': self.minutes_to_time_str(total_realizado),
             'saldo': self.format_saldo(saldo_minutos),
             'assinatura': assinado,
+            'metodo_assinatura': metodo_assinatura,
             'saldo_minutos': saldo_minutos,
             'dias_processados': dias_processados,
             'total_previsto_minutos': total_previsto,
@@ -762,39 +1142,43 @@ class PontoProcessor:
         
         return result
     
-    def extract_table_data(self, pdf_path: str) -> List[List[str]]:
+    def extract_table_data(self, pdf_path: str, documento: DocumentoPDF = None) -> List[List[str]]:
         """Extrai dados diretamente das tabelas do PDF"""
+        own_documento = documento is None
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                all_data = []
-                
-                for page in pdf.pages:
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            if row and any(cell for cell in row if cell):
-                                # Limpar e normalizar cada célula
-                                clean_row = []
-                                for cell in row:
-                                    if cell:
-                                        cell_text = str(cell).strip()
-                                        cell_text = self.clean_text(cell_text)
-                                        clean_row.append(cell_text)
-                                    else:
-                                        clean_row.append("")
-                                
-                                if clean_row and any(cell for cell in clean_row if cell):
-                                    all_data.append(clean_row)
-                                    # Debug: mostrar primeiras linhas
-                                    if len(all_data) <= 5:
-                                        print(f"Linha {len(all_data)}: {clean_row}")
-                
-                print(f"Extraídas {len(all_data)} linhas de tabela")
-                return all_data
-                
+            documento = documento or self.open_document(pdf_path)
+            all_data = []
+            
+            for page in documento.pages:
+                tables = page['tables']
+                for table in tables:
+                    for row in table:
+                        if row and any(cell for cell in row if cell):
+                            # Limpar e normalizar cada célula
+                            clean_row = []
+                            for cell in row:
+                                if cell:
+                                    cell_text = str(cell).strip()
+                                    cell_text = self.clean_text(cell_text)
+                                    clean_row.append(cell_text)
+                                else:
+                                    clean_row.append("")
+                            
+                            if clean_row and any(cell for cell in clean_row if cell):
+                                all_data.append(clean_row)
+                                # Debug: mostrar primeiras linhas
+                                if len(all_data) <= 5:
+                                    print(f"Linha {len(all_data)}: {clean_row}")
+            
+            print(f"Extraídas {len(all_data)} linhas de tabela")
+            return all_data
+            
         except Exception as e:
             print(f"Erro ao extrair tabelas: {e}")
             return []
+        finally:
+            if own_documento and documento is not None:
+                documento.close()
     
     def analyze_table_structure(self, table_data: List[List[str]]) -> Tuple[str, str]:
         """Analisa a estrutura da tabela para extrair nome e período"""
@@ -810,15 +1194,11 @@ class PontoProcessor:
             row_text = " ".join(row)
             
             # IGNORAR linhas que são claramente cabeçalhos ou estruturais
-            if any(exclude in row_text.upper() for exclude in [
-                'HORARIO DE TRABALHO', 'TRT RN I', 'FOLHA DE PONTO', 'DIA E1 S1 E2 S2',
-                'DOM FOLGA FOLGA FOLGA FOLGA', 'SEG 07:30 12:00 13:00 16:30',
-                'DATA', 'ENT 1 - SAI 1', 'ENT 2 - SAI 2', 'C.PRE', 'H.NOT', 'H.FAL', 'H.EXT', 'E.NOT'
-            ]):
+            if RE_CABECALHOS_TABELA.search(row_text.upper()):
                 continue
             
             # FILTRO ESPECÍFICO: Rejeitar códigos problemáticos como 'NMO PQ RQ PS RS'
-            if any(code in row_text.upper() for code in ['NMO', 'PQ', 'RQ', 'PS', 'RS']):
+            if RE_CODIGOS_PROBLEMATICOS.search(row_text.upper()):
                 print(f"Rejeitando linha com códigos problemáticos: '{row_text}'", file=sys.stderr)
                 continue
             
@@ -830,12 +1210,9 @@ class PontoProcessor:
             
             # ESTRATÉGIA 1: Procurar por nomes que parecem reais (pessoas)
             if (len(row_text) > 15 and 
-                not re.search(r'[0-9\/\-:]', row_text) and  # Sem números, datas, horários
-                re.search(r'[A-Z]{3,}\s+[A-Z]{3,}', row_text) and  # Pelo menos 2 palavras longas
-                not any(exclude in row_text.upper() for exclude in [
-                    'CARTÃO', 'PONTO', 'EMPRESA', 'CNPJ', 'TECNOLOGIA', 'INFORMATICA',
-                    'ENDEREÇO', 'RUA', 'NOVA', 'GRANADA', 'BELO', 'HORIZONTE', 'MINAS', 'GERAIS'
-                ])):
+                not RE_NUMERO_DATA_HORA.search(row_text) and  # Sem números, datas, horários
+                RE_DUAS_PALAVRAS_LONGAS.search(row_text) and  # Pelo menos 2 palavras longas
+                not RE_EXCLUSOES_NOME.search(row_text.upper())):
                 
                 # Verificar se parece nome de pessoa (não muito longo, não muito curto)
                 if 15 < len(row_text) < 80:
@@ -849,11 +1226,9 @@ class PontoProcessor:
                 row_text = " ".join(row)
                 # Procurar por sequências que parecem nomes completos
                 if (len(row_text) > 20 and 
-                    re.search(r'[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}', row_text) and
-                    not re.search(r'[0-9\/\-:]', row_text) and
-                    not any(exclude in row_text.upper() for exclude in [
-                        'HORARIO', 'TRABALHO', 'TRT', 'RN', 'I', 'FOLGA', 'DOM', 'SEG', 'TER', 'QUA', 'QUI', 'SEX', 'SAB'
-                    ])):
+                    RE_TRES_PALAVRAS_LONGAS.search(row_text) and
+                    not RE_NUMERO_DATA_HORA.search(row_text) and
+                    not RE_EXCLUSOES_NOME_TABELA.search(row_text.upper())):
                     nome = row_text.strip()
                     print(f"Nome encontrado por padrão específico: '{nome}'")
                     break
@@ -861,7 +1236,7 @@ class PontoProcessor:
         # Procurar por datas para determinar período (MANTIDO COMO ESTAVA)
         for row in table_data:
             row_text = " ".join(row)
-            data_match = re.search(r'(\d{2}/\d{2}/\d{4})', row_text)
+            data_match = RE_DATA.search(row_text)
             if data_match:
                 data = data_match.group(1)
                 date_parts = data.split('/')
@@ -882,54 +1257,22 @@ class PontoProcessor:
             row_text = " ".join(str(cell) for cell in row if cell).lower()
             
             # Padrões específicos para assinatura digital (alta confiança)
-            specific_patterns = [
-                'assinado digitalmente',
-                'assinatura digital',
-                'documento assinado digitalmente',
-                'ponto assinado digitalmente',
-                'assinado eletronicamente',
-                'assinatura eletrônica',
-                'certificado digital',
-                'validação digital',
-                'autenticação digital',
-                'colaborador assinou digitalmente'
-            ]
+            match = RE_ASSINATURA_TABELA_ESPECIFICA.search(row_text)
+            if match:
+                print(f"Assinatura digital detectada na tabela: '{match.group()}' em '{row_text[:100]}...'")
+                return True
             
-            # Padrões de CPF formatado (média confiança)
-            import re
-            cpf_patterns = [
-                r'cpf\s*:\s*[0-9]{3}\.[0-9]{3}\.[0-9]{3}-[0-9]{2}',
-                r'cpf\s*[0-9]{3}\.[0-9]{3}\.[0-9]{3}-[0-9]{2}',
-                r'[0-9]{3}\.[0-9]{3}\.[0-9]{3}-[0-9]{2}'
-            ]
+            # CPF formatado (média confiança)
+            cpf_match = RE_CPF.search(row_text)
+            if cpf_match:
+                print(f"Assinatura detectada via CPF na tabela: '{cpf_match.group()}' em '{row_text[:100]}...'")
+                return True
             
             # Padrões genéricos (baixa confiança)
-            generic_patterns = [
-                'documento assinado',
-                'ponto assinado',
-                'colaborador assinou',
-                'verificado digitalmente',
-                'validado digitalmente',
-                'assinado por'
-            ]
-            
-            # Verificar padrões específicos primeiro
-            for pattern in specific_patterns:
-                if pattern in row_text:
-                    print(f"Assinatura digital detectada na tabela: '{pattern}' em '{row_text[:100]}...'")
-                    return True
-            
-            # Verificar padrões de CPF
-            for pattern in cpf_patterns:
-                if re.search(pattern, row_text):
-                    print(f"Assinatura detectada via CPF na tabela: '{pattern}' em '{row_text[:100]}...'")
-                    return True
-            
-            # Verificar padrões genéricos
-            for pattern in generic_patterns:
-                if pattern in row_text:
-                    print(f"Possível assinatura detectada na tabela: '{pattern}' em '{row_text[:100]}...'")
-                    return True
+            match = RE_ASSINATURA_TABELA_GENERICA.search(row_text)
+            if match:
+                print(f"Possível assinatura detectada na tabela: '{match.group()}' em '{row_text[:100]}...'")
+                return True
         
         print("Nenhuma assinatura detectada nas tabelas")
         return False
@@ -1002,42 +1345,42 @@ class PontoProcessor:
             
             # ESTRATÉGIA DIRETA: Procurar por padrões específicos no texto completo
             # Padrão 1: Nome antes de "Período"
-            nome_match = re.search(r'([A-Z][A-Z\sÇÁÉÍÓÚÀÂÊÔÃÕ\-]+?)(?=\s*-\s*Período)', text_data)
+            nome_match = RE_NOME_ANTES_PERIODO.search(text_data)
             if nome_match:
                 nome_candidato = nome_match.group(1).strip()
                 # Filtrar códigos problemáticos
                 if (len(nome_candidato) > 10 and 
-                    not any(code in nome_candidato.upper() for code in ['NMO', 'PQ', 'RQ', 'PS', 'RS'])):
+                    not RE_CODIGOS_PROBLEMATICOS.search(nome_candidato.upper())):
                     nome = nome_candidato
                     print(f"Nome encontrado por padrão 'Período': '{nome}'")
             
             # Padrão 2: Se não encontrou, procurar por sequências de palavras em maiúsculo
             if nome == "Não encontrado":
-                nome_match = re.search(r'([A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,})', text_data)
+                nome_match = RE_CINCO_PALAVRAS_LONGAS.search(text_data)
                 if nome_match:
                     nome_candidato = nome_match.group(1).strip()
                     # Verificar se não é cabeçalho, estrutura ou códigos problemáticos
-                    if (not any(exclude in nome_candidato.upper() for exclude in [
-                        'HORARIO DE TRABALHO', 'TRT RN I', 'DOM FOLGA FOLGA', 'SEG 07:30 12:00'
-                    ]) and not any(code in nome_candidato.upper() for code in ['NMO', 'PQ', 'RQ', 'PS', 'RS'])):
+                    if (not RE_CABECALHOS_TEXTO.search(nome_candidato.upper()) and
+                        not RE_CODIGOS_PROBLEMATICOS.search(nome_candidato.upper())):
                         nome = nome_candidato
                         print(f"Nome encontrado por padrão de palavras: '{nome}'")
             
             # Padrão 3: Se ainda não encontrou, procurar por qualquer sequência longa em maiúsculo
             if nome == "Não encontrado":
-                nome_match = re.search(r'([A-Z][A-Z\sÇÁÉÍÓÚÀÂÊÔÃÕ\-]{20,})', text_data)
+                nome_match = RE_NOME_LONGO.search(text_data)
                 if nome_match:
                     nome_candidato = nome_match.group(1).strip()
                     # Filtrar nomes que parecem reais e códigos problemáticos
                     if (len(nome_candidato) > 20 and 
-                        not re.search(r'[0-9\/\-:]', nome_candidato) and
-                        not any(exclude in nome_candidato.upper() for exclude in [
-                            'CARTÃO', 'PONTO', 'EMPRESA', 'CNPJ', 'TECNOLOGIA', 'INFORMATICA',
-                            'ENDEREÇO', 'RUA', 'NOVA', 'GRANADA', 'BELO', 'HORIZONTE', 'MINAS', 'GERAIS'
-                        ]) and not any(code in nome_candidato.upper() for code in ['NMO', 'PQ', 'RQ', 'PS', 'RS'])):
+                        not RE_NUMERO_DATA_HORA.search(nome_candidato) and
+                        not RE_EXCLUSOES_NOME.search(nome_candidato.upper()) and
+                        not RE_CODIGOS_PROBLEMATICOS.search(nome_candidato.upper())):
                         nome = nome_candidato
                         print(f"Nome encontrado por padrão genérico: '{nome}'")
             
+            # Conferir com a lista de colaboradores, tolerando erros de OCR
+            nome = self.resolve_colaborador_name(nome, text_data)
+            
             # ESTRATÉGIA 4: Se não encontrou no texto, procurar nas tabelas
             if nome == "Não encontrado":
                 nome, periodo = self.analyze_table_structure(table_data)
@@ -1050,10 +1393,10 @@ class PontoProcessor:
                 line = line.strip()
                 # Verificar se a linha tem características de nome completo e não contém códigos problemáticos
                 if (len(line) > 20 and 
-                    re.search(r'[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}', line) and
-                    not re.search(r'[0-9\/\-]', line) and
-                    not any(exclude in line.upper() for exclude in ['CARTÃO', 'PONTO', 'HORARIO', 'TRABALHO', 'EMPRESA', 'CNPJ']) and
-                    not any(code in line.upper() for code in ['NMO', 'PQ', 'RQ', 'PS', 'RS'])):
+                    RE_TRES_PALAVRAS_LONGAS.search(line) and
+                    not RE_NUMERO_DATA_HORA_SEM_DOIS_PONTOS.search(line) and
+                    not RE_EXCLUSOES_LINHA_NOME.search(line.upper()) and
+                    not RE_CODIGOS_PROBLEMATICOS.search(line.upper())):
                     nome = line.strip()
                     print(f"Nome encontrado por análise de linha: '{nome}'")
                     break
@@ -1062,7 +1405,7 @@ class PontoProcessor:
         if periodo == "Não encontrado":
             for row in table_data:
                 row_text = " ".join(row)
-                data_match = re.search(r'(\d{2}/\d{2}/\d{4})', row_text)
+                data_match = RE_DATA.search(row_text)
                 if data_match:
                     data = data_match.group(1)
                     date_parts = data.split('/')
@@ -1077,13 +1420,17 @@ class PontoProcessor:
         
         return nome, periodo
     
-    def check_hybrid_signature(self, text_data: str, table_data: List[List[str]], pdf_path: str = None) -> bool:
-        """Verifica assinatura apenas no texto - COM OCR"""
-        # Verificar apenas no texto extraído do PDF
-        if text_data:
-            return self.check_digital_signature(text_data, pdf_path)
-        
-        return False
+    def check_hybrid_signature(self, text_data: str, table_data: List[List[str]], pdf_path: str = None,
+                               documento: DocumentoPDF = None) -> bool:
+        """Verifica assinatura na estrutura do PDF e no texto - OCR só com texto extraído"""
+        assinado, _ = self.detect_hybrid_signature(text_data, table_data, pdf_path, documento)
+        return assinado
+    
+    def detect_hybrid_signature(self, text_data: str, table_data: List[List[str]], pdf_path: str = None,
+                                documento: DocumentoPDF = None) -> Tuple[bool, str]:
+        """Como check_hybrid_signature, informando também o método que decidiu"""
+        # Sem texto extraído o OCR não é tentado (documentos só de tabela), mas a estrutura ainda vale
+        return self.detect_signature(text_data, pdf_path, documento, usar_ocr=bool(text_data))
     
     def minutes_to_time_str(self, minutes: int) -> str:
         """Converte minutos para string HH:MM"""
@@ -1099,28 +1446,37 @@ class PontoProcessor:
         mins = abs_minutes % 60
         return f"{sign}{hours:02d}:{mins:02d}"
     
+    def build_csv_rows(self, results: List[Dict]) -> List[Dict]:
+        """Linhas do CSV de resumo - APENAS colaboradores válidos"""
+        csv_data = []
+        for result in results:
+            if 'error' not in result:
+                # VALIDAÇÃO FINAL: Só incluir colaboradores válidos
+                if self.validate_colaborador_name(result['colaborador']):
+                    # Apenas o resumo principal, sem detalhes diários
+                    csv_data.append({
+                        'colaborador': result['colaborador'],
+                        'periodo': result['periodo'],
+                        'previsto': result['previsto'],
+                        'realizado': result['realizado'],
+                        'saldo': result['saldo'],
+                        'assinatura': 'Sim' if result['assinatura'] else 'Não',
+                        'saldo_minutos': result['saldo_minutos']
+                    })
+                    print(f"✅ Colaborador '{result['colaborador']}' incluído no CSV", file=sys.stderr)
+                else:
+                    print(f"❌ Colaborador '{result['colaborador']}' EXCLUÍDO do CSV (não está na lista válida)", file=sys.stderr)
+        return csv_data
+    
+    def to_csv_content(self, results: List[Dict]) -> str:
+        """Gera o CSV de resumo em memória, no mesmo formato de save_to_csv"""
+        return pd.DataFrame(self.build_csv_rows(results)).to_csv(index=False)
+    
     def save_to_csv(self, results: List[Dict], output_path: str):
         """Salva resultados em CSV - APENAS colaboradores válidos"""
         try:
             # Preparar dados para CSV - apenas o resumo principal E colaboradores válidos
-            csv_data = []
-            for result in results:
-                if 'error' not in result:
-                    # VALIDAÇÃO FINAL: Só incluir colaboradores válidos
-                    if self.validate_colaborador_name(result['colaborador']):
-                        # Apenas o resumo principal, sem detalhes diários
-                        csv_data.append({
-                            'colaborador': result['colaborador'],
-                            'periodo': result['periodo'],
-                            'previsto': result['previsto'],
-                            'realizado': result['realizado'],
-                            'saldo': result['saldo'],
-                            'assinatura': 'Sim' if result['assinatura'] else 'Não',
-                            'saldo_minutos': result['saldo_minutos']
-                        })
-                        print(f"✅ Colaborador '{result['colaborador']}' incluído no CSV", file=sys.stderr)
-                    else:
-                        print(f"❌ Colaborador '{result['colaborador']}' EXCLUÍDO do CSV (não está na lista válida)", file=sys.stderr)
+            csv_data = self.build_csv_rows(results)
             
             print(f"Preparando {len(csv_data)} registros para CSV")
             
@@ -1188,6 +1544,142 @@ class PontoProcessor:
                 print(f"ERRO: {pdf_path} falhou: {e}")
         
         return results
+    
+    def process_multiple_pdfs_parallel(self, pdf_paths: List[str], max_workers: Optional[int] = None) -> List[Dict]:
+        """Processa múltiplos PDFs em paralelo, um PDF por processo, mantendo a ordem de entrada"""
+        max_workers = max_workers or os.cpu_count() or 1
+        max_workers = min(max_workers, len(pdf_paths))
+        
+        if max_workers <= 1:
+            return self.process_multiple_pdfs(pdf_paths)
+        
+        print(f"Processando {len(pdf_paths)} PDFs com {max_workers} processos", file=sys.stderr)
+        
+        results = [None] * len(pdf_paths)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(processar_pdf_ponto, pdf_path): i for i, pdf_path in enumerate(pdf_paths)}
+            for future in as_completed(futures):
+                i = futures[future]
+                pdf_path = pdf_paths[i]
+                try:
+                    results[i] = future.result()
+                    print(f"SUCESSO: {pdf_path} processado com sucesso")
+                except Exception as e:
+                    # Falha do próprio processo (ex.: worker encerrado); erros do PDF já vêm como dict
+                    results[i] = {"error": f"Erro ao processar {pdf_path}: {str(e)}"}
+                    print(f"ERRO: {pdf_path} falhou: {e}")
+        
+        return results
+    
+    def split_by_collaborator(self, pdf_path: str, conteudo: bytes = None) -> List[Dict]:
+        """Trechos de um PDF com as folhas de vários colaboradores, pela linha "NOME - Período: ..." de cada página.
+        Retorna [{'colaborador', 'periodo', 'inicio', 'fim'}] com páginas base 0 (fim inclusivo); páginas sem
+        cabeçalho continuam o trecho anterior, e as do início (capa, resumo) entram no primeiro trecho com cabeçalho"""
+        import fitz  # PyMuPDF
+        
+        doc = fitz.open(stream=conteudo, filetype="pdf") if conteudo is not None else fitz.open(pdf_path)
+        segmentos = []
+        try:
+            for page_num in range(doc.page_count):
+                # Texto do PyMuPDF: bem mais rápido que o pdfplumber, basta para achar o cabeçalho
+                match = RE_CABECALHO_COLABORADOR.search(doc.load_page(page_num).get_text())
+                chave = (' '.join(match.group(1).split()), f"{match.group(2)} à {match.group(3)}") if match else None
+                
+                atual = segmentos[-1] if segmentos else None
+                if atual and (chave is None or chave == (atual['colaborador'], atual['periodo'])):
+                    atual['fim'] = page_num
+                else:
+                    colaborador, periodo = chave or (None, None)
+                    segmentos.append({'colaborador': colaborador, 'periodo': periodo, 'inicio': page_num, 'fim': page_num})
+        finally:
+            doc.close()
+        
+        # Páginas iniciais sem cabeçalho não são de um colaborador próprio
+        if len(segmentos) > 1 and segmentos[0]['colaborador'] is None:
+            capa = segmentos.pop(0)
+            segmentos[0]['inicio'] = capa['inicio']
+        
+        print(f"📑 {pdf_path}: {len(segmentos)} colaborador(es) em {sum(s['fim'] - s['inicio'] + 1 for s in segmentos)} páginas", file=sys.stderr)
+        return segmentos
+    
+    def recortar_lote(self, pdf_path: str, conteudo: bytes = None) -> List[Tuple[Dict, str, bytes]]:
+        """(segmento, nome, bytes do PDF do trecho) por colaborador; cada trecho é processado como um PDF avulso
+        (process_pdf / processar_pdf_ponto) e o resultado completado com completar_lote.
+        Com um colaborador só, devolve o próprio documento sem segmento: [(None, pdf_path, conteudo)]"""
+        import fitz  # PyMuPDF
+        
+        segmentos = self.split_by_collaborator(pdf_path, conteudo)
+        if len(segmentos) <= 1:
+            return [(None, pdf_path, conteudo)]
+        
+        trechos = []
+        # A origem é reaberta a cada trecho: o insert_pdf só copia o formulário (campos de assinatura)
+        # na primeira cópia feita de um mesmo documento
+        for segmento in segmentos:
+            with fitz.open(stream=conteudo, filetype="pdf") if conteudo is not None else fitz.open(pdf_path) as doc:
+                parte = fitz.open()
+                parte.insert_pdf(doc, from_page=segmento['inicio'], to_page=segmento['fim'])
+                nome = f"{pdf_path} [páginas {segmento['inicio'] + 1}-{segmento['fim'] + 1}]"
+                trechos.append((segmento, nome, parte.tobytes()))
+                parte.close()
+        return trechos
+    
+    @staticmethod
+    def completar_lote(segmento: Optional[Dict], result: Dict) -> Dict:
+        """Acrescenta ao resultado de um trecho as páginas de origem e, se faltar, o nome do cabeçalho"""
+        if segmento is None:
+            return result
+        result['paginas'] = f"{segmento['inicio'] + 1}-{segmento['fim'] + 1}"
+        # Sem nome no texto do trecho (ex.: extração pobre), usar o do cabeçalho que delimitou o trecho
+        if result.get('colaborador') in (None, "Não encontrado") and segmento['colaborador']:
+            result['colaborador'] = segmento['colaborador']
+        return result
+    
+    def process_bulk_pdf(self, pdf_path: str, conteudo: bytes = None, max_workers: Optional[int] = None) -> List[Dict]:
+        """Processa um PDF exportado com as folhas de vários colaboradores: um resultado por colaborador,
+        com os trechos processados em paralelo (um processo por trecho), na ordem do documento"""
+        trechos = self.recortar_lote(pdf_path, conteudo)
+        if trechos[0][0] is None:
+            return [self.process_pdf(pdf_path, conteudo)]
+        
+        max_workers = min(max_workers or os.cpu_count() or 1, len(trechos))
+        if max_workers <= 1:
+            results = []
+            for _, nome, dados in trechos:
+                try:
+                    results.append(self.process_pdf(nome, dados))
+                except Exception as e:
+                    results.append({"error": f"Erro ao processar {nome}: {str(e)}"})
+        else:
+            print(f"Processando {len(trechos)} colaboradores de {pdf_path} com {max_workers} processos", file=sys.stderr)
+            results = [None] * len(trechos)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(processar_pdf_ponto, nome, dados): i for i, (_, nome, dados) in enumerate(trechos)}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        results[i] = {"error": f"Erro ao processar {trechos[i][1]}: {str(e)}"}
+        
+        return [self.completar_lote(segmento, result) for (segmento, _, _), result in zip(trechos, results)]
+
+def processar_pdf_ponto(pdf_path: str, conteudo: bytes = None, progress_queue=None) -> Dict:
+    """Ponto de entrada de biblioteca: processa um único PDF (caminho ou bytes) com um processador próprio.
+    Função de módulo para poder ser enviada a um pool de processos; com progress_queue (ex.: fila de um
+    multiprocessing.Manager), cada etapa concluída é publicada como {'arquivo', 'etapa', ...}"""
+    progress_callback = None
+    if progress_queue is not None:
+        progress_callback = lambda etapa, dados: progress_queue.put({'arquivo': pdf_path, 'etapa': etapa, **dados})
+    processor = PontoProcessor(progress_callback=progress_callback)
+    try:
+        return processor.process_pdf(pdf_path, conteudo)
+    except Exception as e:
+        return {"error": f"Erro ao processar {pdf_path}: {str(e)}"}
+
+def recortar_pdf_lote(pdf_path: str, conteudo: bytes = None) -> List[Tuple[Optional[Dict], str, bytes]]:
+    """PontoProcessor.recortar_lote como função de módulo, para dividir o PDF em um processo do pool"""
+    return PontoProcessor().recortar_lote(pdf_path, conteudo)
 
 def main():
     """Função principal com suporte a argumentos de linha de comando"""
@@ -1197,6 +1689,11 @@ def main():
         parser = argparse.ArgumentParser(description='Processa PDFs de ponto e gera CSV')
         parser.add_argument('--pdfs', nargs='+', help='Caminhos para os PDFs a serem processados')
         parser.add_argument('--output', default='resultados_ponto.csv', help='Nome do arquivo CSV de saída')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processos paralelos para o lote (padrão: número de núcleos; 1 = sequencial)')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Cada PDF pode conter as folhas de vários colaboradores: dividir pelo cabeçalho '
+                                 'e gerar um resultado por colaborador')
         
         args = parser.parse_args()
         print(f"Argumentos recebidos: {args}")
@@ -1226,7 +1723,14 @@ def main():
         
         # Processar todos os PDFs
         print("=== INICIANDO PROCESSAMENTO ===", file=sys.stderr)
-        results = processor.process_multiple_pdfs(pdf_files)
+        if args.bulk:
+            results = []
+            for pdf_file in pdf_files:
+                results.extend(processor.process_bulk_pdf(pdf_file, max_workers=args.workers))
+        elif len(pdf_files) > 1 and args.workers != 1:
+            results = processor.process_multiple_pdfs_parallel(pdf_files, args.workers)
+        else:
+            results = processor.process_multiple_pdfs(pdf_files)
         print(f"[OK] Processamento concluído: {len(results)} resultados", file=sys.stderr)
         
         # Salvar resultados em CSV
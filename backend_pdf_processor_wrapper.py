@@ -16,25 +16,10 @@ def main():
     if hasattr(sys.stderr, 'reconfigure'):
         sys.stderr.reconfigure(encoding='utf-8')
     
-    # Testar comandos Python disponíveis (Windows primeiro)
-    if os.name == 'nt':  # Windows
-        python_cmds = ['python', 'python3', 'py']
-    else:  # Unix/Linux
-        python_cmds = ['python3', 'python', '/usr/bin/python3', '/usr/bin/python']
-    python_cmd = None
-    
-    for cmd in python_cmds:
-        try:
-            test_result = subprocess.run([cmd, '--version'], capture_output=True, text=True)
-            if test_result.returncode == 0:
-                python_cmd = cmd
-                print(f"✓ Python encontrado: {cmd} - {test_result.stdout.strip()}", file=sys.stderr)
-                break
-        except:
-            continue
-    
+    # Usar o próprio interpretador que executa o wrapper, sem testar outros comandos
+    python_cmd = sys.executable
     if not python_cmd:
-        print(json.dumps({"error": "Python não encontrado no sistema. Tentei: " + ", ".join(python_cmds)}))
+        print(json.dumps({"error": "Não foi possível determinar o interpretador Python"}))
         sys.exit(1)
     
     # Caminho para o script principal
@@ -46,8 +31,13 @@ def main():
         sys.exit(1)
     
     # Construir comando com argumentos corretos
-    # O script espera: --pdfs arquivo1.pdf arquivo2.pdf --output nome.csv
-    cmd = [python_cmd, script_path, '--pdfs'] + sys.argv[1:-2] + ['--output', sys.argv[-1]]
+    # O script espera: --pdfs arquivo1.pdf arquivo2.pdf --output nome.csv [--bulk]
+    # (--bulk, se vier, é o primeiro argumento do wrapper: PDFs com as folhas de vários colaboradores)
+    args = sys.argv[1:]
+    bulk = args[:1] == ['--bulk']
+    if bulk:
+        args = args[1:]
+    cmd = [python_cmd, script_path, '--pdfs'] + args[:-2] + ['--output', args[-1]] + (['--bulk'] if bulk else [])
     
     try:
         print(f"Executando: {' '.join(cmd)}", file=sys.stderr)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Índice em memória da lista de colaboradores válidos
+Carrega colaboradores_validos.txt (e, se configurado, a tabela colaboradores_validos do banco) uma única vez,
+em um conjunto de nomes normalizados sem acentos; recarrega apenas quando o arquivo ou a tabela mudam
+"""
+
+import os
+import sys
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from sqlalchemy import create_engine, text as sql_text
+except ImportError:
+    create_engine = None
+
+DEFAULT_CHECK_INTERVAL = 5.0
+DEFAULT_FUZZY_THRESHOLD = 0.85
+MAX_CANDIDATOS = 8
+
+
+def normalizar_nome(nome: str) -> str:
+    """Maiúsculas, sem acentos, apenas letras e espaços simples: 'João  da Silva' -> 'JOAO DA SILVA'"""
+    if not nome:
+        return ''
+    sem_acentos = unicodedata.normalize('NFD', nome)
+    sem_acentos = ''.join(c for c in sem_acentos if unicodedata.category(c) != 'Mn')
+    apenas_letras = ''.join(c if c.isalpha() else ' ' for c in sem_acentos.upper())
+    return ' '.join(apenas_letras.split())
+
+
+def compactar_nome(nome: str) -> str:
+    """Forma sem espaços usada na busca aproximada: o OCR frequentemente perde os espaços entre os nomes"""
+    return normalizar_nome(nome).replace(' ', '')
+
+
+def trigramas(chave: str) -> set:
+    chave = f"^{chave}$"
+    return {chave[i:i + 3] for i in range(len(chave) - 2)}
+
+
+def distancia_limitada(a: str, b: str, limite: int) -> int:
+    """Distância de Levenshtein restrita a uma faixa diagonal; retorna limite + 1 assim que o limite é excedido"""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    if len(a) > len(b):
+        a, b = b, a
+
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        inicio = max(1, i - limite)
+        fim = min(len(b), i + limite)
+        atual = [limite + 1] * (len(b) + 1)
+        atual[0] = i if i <= limite else limite + 1
+        for j in range(inicio, fim + 1):
+            custo = 0 if ca == b[j - 1] else 1
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+        if min(atual[inicio - 1:fim + 1]) > limite:
+            return limite + 1
+        anterior = atual
+    return min(anterior[len(b)], limite + 1)
+
+
+class ColaboradoresIndex:
+    """
+    Conjunto de nomes válidos para consulta O(1). As fontes (mtime do arquivo e assinatura da tabela)
+    são verificadas no máximo a cada check_interval segundos, então a consulta normalmente não faz I/O
+    """
+
+    def __init__(self, arquivo: str = None, database_url: str = None, check_interval: float = None):
+        self.arquivo = arquivo or os.getenv('CLP_COLABORADORES_FILE') or os.path.join(os.getcwd(), 'colaboradores_validos.txt')
+        self.database_url = database_url or os.getenv('COLABORADORES_DATABASE_URL') or os.getenv('DATABASE_URL')
+        if check_interval is None:
+            check_interval = float(os.getenv('CLP_COLABORADORES_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL))
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._engine = None
+        self._assinatura = None
+        self._ultima_verificacao = None
+        self.nomes: List[str] = []
+        self._normalizados = set()
+        self._por_chave: Dict[str, str] = {}
+        self._indice_trigramas: Dict[str, List[str]] = {}
+
+    # ----- fontes -----
+
+    def _assinatura_arquivo(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.arquivo)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _get_engine(self):
+        if self._engine is None and self.database_url and create_engine is not None:
+            self._engine = create_engine(self.database_url, pool_pre_ping=True)
+        return self._engine
+
+    def _assinatura_banco(self):
+        """Quantidade de ativos e última atualização: muda sempre que a tabela é editada"""
+        try:
+            # Criar o engine também pode falhar (ex.: driver do "mysql://" não instalado): fica só o arquivo
+            engine = self._get_engine()
+            if engine is None:
+                return None
+            with engine.connect() as conn:
+                row = conn.execute(sql_text(
+                    "SELECT COUNT(*), MAX(data_atualizacao) FROM colaboradores_validos WHERE ativo = :ativo"
+                ), {'ativo': True}).fetchone()
+            return (row[0], str(row[1]))
+        except Exception as e:
+            print(f"⚠️ Tabela colaboradores_validos indisponível: {e}", file=sys.stderr)
+            return None
+
+    def _ler_arquivo(self) -> List[str]:
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                return [linha.strip() for linha in f if linha.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _ler_banco(self) -> List[str]:
+        try:
+            engine = self._get_engine()
+            if engine is None:
+                return []
+            with engine.connect() as conn:
+                rows = conn.execute(sql_text(
+                    "SELECT nome FROM colaboradores_validos WHERE ativo = :ativo"
+                ), {'ativo': True}).fetchall()
+            return [row[0].strip() for row in rows if row[0] and row[0].strip()]
+        except Exception as e:
+            print(f"⚠️ Erro ao ler colaboradores do banco: {e}", file=sys.stderr)
+            return []
+
+    # ----- recarga -----
+
+    def _verificacao_vencida(self, agora: float) -> bool:
+        return self._ultima_verificacao is None or agora - self._ultima_verificacao >= self.check_interval
+
+    def atualizar(self, forcar: bool = False):
+        """Recarrega os nomes se alguma fonte mudou desde a última carga"""
+        agora = time.monotonic()
+        if not forcar and not self._verificacao_vencida(agora):
+            return
+
+        with self._lock:
+            if not forcar and not self._verificacao_vencida(agora):
+                return
+            self._ultima_verificacao = agora
+
+            assinatura = (self._assinatura_arquivo(), self._assinatura_banco())
+            if not forcar and assinatura == self._assinatura:
+                return
+
+            nomes = []
+            vistos = set()
+            for nome in self._ler_arquivo() + self._ler_banco():
+                normalizado = normalizar_nome(nome)
+                if normalizado and normalizado not in vistos:
+                    vistos.add(normalizado)
+                    nomes.append(nome)
+
+            self._carregar(nomes)
+            self._assinatura = assinatura
+            print(f"Lista de colaboradores carregada: {len(nomes)} nomes", file=sys.stderr)
+
+    def _carregar(self, nomes: List[str]):
+        """Monta o conjunto exato e o índice invertido de trigramas sobre a forma compacta dos nomes"""
+        por_chave = {}
+        indice = {}
+        for nome in nomes:
+            chave = compactar_nome(nome)
+            por_chave[chave] = nome
+            for trigrama in trigramas(chave):
+                indice.setdefault(trigrama, []).append(chave)
+
+        self._normalizados = {normalizar_nome(nome) for nome in nomes}
+        self._por_chave = por_chave
+        self._indice_trigramas = indice
+        self.nomes = nomes
+
+    # ----- consultas -----
+
+    def __len__(self) -> int:
+        self.atualizar()
+        return len(self.nomes)
+
+    def contem(self, nome: str) -> bool:
+        """Comparação exata, ignorando caixa, acentos, pontuação e espaços repetidos"""
+        self.atualizar()
+        return normalizar_nome(nome) in self._normalizados
+
+    def melhor_correspondencia(self, nome: str, limiar: float = DEFAULT_FUZZY_THRESHOLD) -> Optional[Tuple[str, float]]:
+        """
+        Nome da lista mais parecido com 'nome' e a similaridade (0-1), ou None abaixo do limiar.
+        Os candidatos vêm do índice de trigramas; só os mais promissores passam pela distância de edição
+        """
+        self.atualizar()
+        chave = compactar_nome(nome)
+        if len(chave) < 4:
+            return None
+
+        exato = self._por_chave.get(chave)
+        if exato:
+            return exato, 1.0
+
+        contagem: Dict[str, int] = {}
+        for trigrama in trigramas(chave):
+            for candidato in self._indice_trigramas.get(trigrama, ()):
+                contagem[candidato] = contagem.get(candidato, 0) + 1
+        if not contagem:
+            return None
+
+        melhores = sorted(contagem.items(), key=lambda item: item[1], reverse=True)[:MAX_CANDIDATOS]
+        resultado = None
+        for candidato, _ in melhores:
+            maior = max(len(chave), len(candidato))
+            limite = int(maior * (1 - limiar))
+            if resultado:
+                # Só interessa quem supera o melhor atual
+                limite = min(limite, int(maior * (1 - resultado[1])))
+            distancia = distancia_limitada(chave, candidato, limite)
+            if distancia <= limite:
+                score = 1 - distancia / maior
+                if score >= limiar and (not resultado or score > resultado[1]):
+                    resultado = (self._por_chave[candidato], score)
+        return resultado
+
+    def encontrar_no_texto(self, texto: str, limiar: float = DEFAULT_FUZZY_THRESHOLD,
+                           max_linhas: int = 60, max_palavras: int = 7) -> Optional[Tuple[str, float]]:
+        """
+        Procura um colaborador em um texto livre (OCR): testa sequências de até max_palavras palavras
+        consecutivas de cada linha e retorna o melhor nome encontrado com sua similaridade
+        """
+        self.atualizar()
+        if not self.nomes or not texto:
+            return None
+
+        resultado = None
+        linhas = [linha for linha in texto.split('\n') if linha.strip()][:max_linhas]
+        for linha in linhas:
+            palavras = normalizar_nome(linha).split()
+            for inicio in range(len(palavras)):
+                for fim in range(inicio + 1, min(len(palavras), inicio + max_palavras) + 1):
+                    trecho = ''.join(palavras[inicio:fim])
+                    if len(trecho) < 8:
+                        continue
+                    encontrado = self.melhor_correspondencia(trecho, limiar)
+                    if encontrado and (not resultado or encontrado[1] > resultado[1]):
+                        resultado = encontrado
+                        if resultado[1] == 1.0:
+                            return resultado
+        return resultado
+
+
+_default_index = None
+
+
+def get_colaboradores_index() -> ColaboradoresIndex:
+    """Instância compartilhada, configurada pelas variáveis de ambiente CLP_COLABORADORES_* / DATABASE_URL"""
+    global _default_index
+    if _default_index is None:
+        _default_index = ColaboradoresIndex()
+    return _default_index
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Extração de tabelas com motores intercambiáveis
+Cada motor (pdfplumber, PyMuPDF find_tables, coordenadas das palavras) recebe a mesma página e devolve
+tabelas no formato do extract_tables. Para cada impressão digital de layout, as primeiras páginas
+servem de calibração: todos os motores rodam, são cronometrados e pontuados contra o pdfplumber
+(referência), e o mais rápido com a precisão mínima passa a ser usado nas páginas seguintes desse
+layout. A escolha fica guardada no cache de extração, valendo também para os próximos processos
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from extraction_cache import ExtractionCache, get_default_cache
+from layouts_ponto import agrupar_linhas, extrair_tabela, reconhecer_layout
+
+# Páginas de um layout usadas na calibração antes de fixar o motor
+TABELAS_AMOSTRAS_CALIBRACAO = int(os.getenv('TABELAS_AMOSTRAS_CALIBRACAO', 3))
+# Fração mínima das linhas da tabela do layout iguais às da referência
+TABELAS_PRECISAO_MINIMA = float(os.getenv('TABELAS_PRECISAO_MINIMA', 0.98))
+# Motor para páginas de layout desconhecido
+TABELAS_BACKEND_PADRAO = os.getenv('TABELAS_BACKEND_PADRAO', 'pdfplumber')
+# Força um motor para todas as páginas (sem calibração), ex.: TABELAS_BACKEND=pymupdf
+TABELAS_BACKEND = os.getenv('TABELAS_BACKEND', '')
+
+REFERENCIA = 'pdfplumber'
+
+# Entradas do cache que não pertencem a um PDF específico
+CHAVE_LAYOUTS = 'layouts'
+
+Tabelas = List[List[List[Optional[str]]]]
+
+
+class PaginaTabelas:
+    """Uma página vista pelos motores: a página do pdfplumber, o layout reconhecido e a página PyMuPDF sob demanda"""
+
+    def __init__(self, plumber_page, documento=None, page_num: int = 0):
+        self.plumber = plumber_page
+        self.documento = documento
+        self.page_num = page_num
+        self.linhas = agrupar_linhas(plumber_page.extract_words())
+        self.reconhecido = reconhecer_layout(self.linhas)
+
+    @property
+    def assinatura(self) -> Optional[str]:
+        return self.reconhecido[1] if self.reconhecido else None
+
+    @property
+    def layout(self):
+        return self.reconhecido[0] if self.reconhecido else None
+
+
+class BackendTabelas:
+    """Interface comum: tabelas da página ou None quando o motor não se aplica a ela"""
+
+    nome = 'base'
+
+    def extrair(self, pagina: PaginaTabelas) -> Optional[Tabelas]:
+        raise NotImplementedError
+
+
+class PdfplumberBackend(BackendTabelas):
+    """Detecção genérica de linhas e retas do pdfplumber"""
+
+    nome = 'pdfplumber'
+
+    def extrair(self, pagina: PaginaTabelas) -> Optional[Tabelas]:
+        return pagina.plumber.extract_tables() or []
+
+
+class PyMuPDFBackend(BackendTabelas):
+    """page.find_tables() do PyMuPDF (1.23+)"""
+
+    nome = 'pymupdf'
+
+    def extrair(self, pagina: PaginaTabelas) -> Optional[Tabelas]:
+        if pagina.documento is None:
+            return None
+        with pagina.documento.render_lock:
+            page = pagina.documento.fitz_doc.load_page(pagina.page_num)
+            if not hasattr(page, 'find_tables'):
+                return None
+            return [tabela.extract() for tabela in page.find_tables().tables]
+
+
+class PalavrasBackend(BackendTabelas):
+    """Células pelas coordenadas das palavras, só para layouts conhecidos"""
+
+    nome = 'palavras'
+
+    def extrair(self, pagina: PaginaTabelas) -> Optional[Tabelas]:
+        if pagina.reconhecido is None:
+            return None
+        layout, _, indice, faixas = pagina.reconhecido
+        tabela = extrair_tabela(layout, pagina.linhas, indice, faixas)
+        return [tabela] if tabela is not None else None
+
+
+BACKENDS: Dict[str, BackendTabelas] = {
+    backend.nome: backend for backend in (PdfplumberBackend(), PyMuPDFBackend(), PalavrasBackend())
+}
+
+
+def _normalizar_linha(linha) -> Tuple[str, ...]:
+    return tuple(' '.join(str(celula or '').split()) for celula in linha)
+
+
+def tabela_do_layout(tabelas: Optional[Tabelas], layout) -> Optional[List[Tuple[str, ...]]]:
+    """A tabela cujo cabeçalho é o do layout, com as células normalizadas"""
+    cabecalho = tuple(' '.join(coluna) for coluna in layout.colunas)
+    for tabela in tabelas or []:
+        if tabela and _normalizar_linha(tabela[0]) == cabecalho:
+            return [_normalizar_linha(linha) for linha in tabela]
+    return None
+
+
+def pontuar(tabelas: Optional[Tabelas], referencia: Optional[Tabelas], layout) -> float:
+    """Fração das linhas da tabela do layout iguais nas duas extrações (linhas a mais ou a menos contam contra)"""
+    esperada = tabela_do_layout(referencia, layout)
+    obtida = tabela_do_layout(tabelas, layout)
+    if not esperada or not obtida:
+        return 0.0
+    iguais = sum((Counter(esperada) & Counter(obtida)).values())
+    return iguais / max(len(esperada), len(obtida))
+
+
+class SeletorTabelas:
+    """Escolhe o motor de tabelas por impressão digital de layout, calibrando nas primeiras páginas"""
+
+    def __init__(self, cache: ExtractionCache = None, amostras: int = TABELAS_AMOSTRAS_CALIBRACAO,
+                 precisao_minima: float = TABELAS_PRECISAO_MINIMA):
+        self.cache = cache or get_default_cache()
+        self.amostras = amostras
+        self.precisao_minima = precisao_minima
+        self._lock = threading.Lock()
+        self._escolhidos: Dict[str, str] = {}
+        self._medicoes: Dict[str, Dict[str, List[float]]] = {}  # assinatura -> motor -> [tempo, pontuação, n]
+
+    def backend_escolhido(self, assinatura: str) -> Optional[str]:
+        with self._lock:
+            nome = self._escolhidos.get(assinatura)
+        if nome is None:
+            escolha = self.cache.get(CHAVE_LAYOUTS, None, 'backend_tabelas', {'assinatura': assinatura})
+            if escolha and escolha.get('backend') in BACKENDS:
+                nome = escolha['backend']
+                with self._lock:
+                    self._escolhidos[assinatura] = nome
+        return nome
+
+    def extrair(self, pagina: PaginaTabelas) -> Tuple[str, Tabelas]:
+        """(motor usado, tabelas) da página"""
+        if TABELAS_BACKEND in BACKENDS:
+            return self._extrair_com(TABELAS_BACKEND, pagina)
+
+        assinatura = pagina.assinatura
+        if assinatura is None:
+            return self._extrair_com(TABELAS_BACKEND_PADRAO, pagina)
+
+        nome = self.backend_escolhido(assinatura)
+        if nome is not None:
+            return self._extrair_com(nome, pagina)
+        return REFERENCIA, self._calibrar(pagina)
+
+    def _extrair_com(self, nome: str, pagina: PaginaTabelas) -> Tuple[str, Tabelas]:
+        try:
+            tabelas = BACKENDS[nome].extrair(pagina)
+        except Exception as e:
+            print(f"⚠️ Motor de tabelas {nome} falhou: {e}", file=sys.stderr)
+            tabelas = None
+        if tabelas is None and nome != REFERENCIA:
+            return REFERENCIA, BACKENDS[REFERENCIA].extrair(pagina)
+        return nome, tabelas or []
+
+    def _calibrar(self, pagina: PaginaTabelas) -> Tabelas:
+        """Roda todos os motores na página, acumula tempo e precisão e fixa o vencedor após as amostras"""
+        resultados = {}
+        tempos = {}
+        for nome, backend in BACKENDS.items():
+            inicio = time.perf_counter()
+            try:
+                resultados[nome] = backend.extrair(pagina)
+            except Exception as e:
+                print(f"⚠️ Motor de tabelas {nome} falhou na calibração: {e}", file=sys.stderr)
+                resultados[nome] = None
+            tempos[nome] = time.perf_counter() - inicio
+
+        referencia = resultados[REFERENCIA] or []
+        assinatura = pagina.assinatura
+        with self._lock:
+            medicoes = self._medicoes.setdefault(assinatura, {})
+            for nome in BACKENDS:
+                pontuacao = 1.0 if nome == REFERENCIA else pontuar(resultados[nome], referencia, pagina.layout)
+                acumulado = medicoes.setdefault(nome, [0.0, 0.0, 0])
+                acumulado[0] += tempos[nome]
+                acumulado[1] += pontuacao
+                acumulado[2] += 1
+            concluida = medicoes[REFERENCIA][2] >= self.amostras
+
+        if concluida:
+            self._fixar(assinatura, medicoes)
+        return referencia
+
+    def _fixar(self, assinatura: str, medicoes: Dict[str, List[float]]):
+        medias = {nome: (tempo / n, pontuacao / n) for nome, (tempo, pontuacao, n) in medicoes.items()}
+        aptos = [nome for nome, (_, precisao) in medias.items() if precisao >= self.precisao_minima]
+        vencedor = min(aptos, key=lambda nome: medias[nome][0])
+
+        with self._lock:
+            self._escolhidos[assinatura] = vencedor
+            self._medicoes.pop(assinatura, None)
+        self.cache.set(CHAVE_LAYOUTS, None, 'backend_tabelas', {
+            'backend': vencedor,
+            'medicoes': {nome: {'tempo': tempo, 'precisao': precisao} for nome, (tempo, precisao) in medias.items()},
+        }, {'assinatura': assinatura})
+
+        resumo = ', '.join(f"{nome} {tempo * 1000:.0f}ms/{precisao:.0%}" for nome, (tempo, precisao) in medias.items())
+        print(f"📐 Layout {assinatura}: motor de tabelas {vencedor} ({resumo})", file=sys.stderr)
+
+
+_seletor = None
+_seletor_lock = threading.Lock()
+
+
+def get_seletor_tabelas() -> SeletorTabelas:
+    """Seletor compartilhado pelo processo, sobre o cache de extração padrão"""
+    global _seletor
+    if _seletor is None:
+        with _seletor_lock:
+            if _seletor is None:
+                _seletor = SeletorTabelas()
+    return _seletor
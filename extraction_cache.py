@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Cache em disco para resultados de extração de PDFs (texto, tabelas e OCR)
+Chaveado pelo SHA-256 do conteúdo do PDF, índice da página e parâmetros da extração
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'extracao')
+DEFAULT_MAX_MB = 256
+# Hashes de arquivos memorizados por processo (caminho, tamanho, mtime); os mais antigos saem primeiro
+DEFAULT_MAX_HASHES = 1024
+
+
+class ExtractionCache:
+    """Cache LRU em disco: cada entrada é um arquivo JSON; o mtime marca o último acesso"""
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, enabled: bool = None,
+                 max_hashes: int = DEFAULT_MAX_HASHES):
+        self.cache_dir = cache_dir or os.getenv('CLP_CACHE_DIR', DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('CLP_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        if enabled is None:
+            enabled = os.getenv('CLP_CACHE_DISABLED', '').lower() not in ('1', 'true', 'sim')
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.max_hashes = max_hashes
+        self._hashes: 'OrderedDict[tuple, str]' = OrderedDict()
+        self._hashes_lock = threading.Lock()  # separado do _lock: consultas não esperam a limpeza do disco
+
+    def hash_file(self, pdf_path: str) -> str:
+        """SHA-256 do conteúdo do arquivo, memorizado por (caminho, tamanho, mtime) até max_hashes arquivos"""
+        stat = os.stat(pdf_path)
+        memo_key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        with self._hashes_lock:
+            cached = self._hashes.get(memo_key)
+            if cached:
+                self._hashes.move_to_end(memo_key)
+                return cached
+
+        sha = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self._hashes_lock:
+            # Uploads em arquivos temporários nunca se repetem: sem limite o memo cresceria sem parar
+            self._hashes[memo_key] = digest
+            while len(self._hashes) > self.max_hashes:
+                self._hashes.popitem(last=False)
+        return digest
+
+    @staticmethod
+    def hash_bytes(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def make_key(pdf_hash: str, page_index: Optional[int], kind: str, params: Optional[Dict] = None) -> str:
+        """Chave estável a partir do hash do PDF, página, tipo de resultado e parâmetros"""
+        params_json = json.dumps(params or {}, sort_keys=True, ensure_ascii=True, default=str)
+        page = 'doc' if page_index is None else str(page_index)
+        raw = f"{pdf_hash}|{page}|{kind}|{params_json}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, pdf_hash: str, page_index: Optional[int], kind: str, params: Optional[Dict] = None) -> Optional[Any]:
+        """Retorna o valor armazenado ou None; um acerto renova a posição da entrada no LRU"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(self.make_key(pdf_hash, page_index, kind, params))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)['value']
+            os.utime(path, None)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Entrada de cache inválida ignorada ({kind}): {e}", file=sys.stderr)
+            return None
+
+    def set(self, pdf_hash: str, page_index: Optional[int], kind: str, value: Any, params: Optional[Dict] = None):
+        """Grava o valor de forma atômica e aplica o limite de tamanho"""
+        if not self.enabled:
+            return
+        path = self._entry_path(self.make_key(pdf_hash, page_index, kind, params))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'kind': kind, 'page': page_index, 'value': value}, f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar no cache ({kind}): {e}", file=sys.stderr)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += size - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _iter_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._iter_entries())
+
+    def _evict(self):
+        """Remove as entradas menos recentemente usadas até ficar abaixo de 90% do limite"""
+        entries = sorted(self._iter_entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                continue
+        self._total_bytes = total
+        if removed:
+            print(f"🧹 Cache de extração: {removed} entradas removidas (LRU)", file=sys.stderr)
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            for path, _, _ in list(self._iter_entries()):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._total_bytes = 0
+
+
+_default_cache = None
+
+
+def get_default_cache() -> ExtractionCache:
+    """Instância compartilhada do cache, configurada pelas variáveis de ambiente CLP_CACHE_*"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache()
+    return _default_cache
@@ -6,10 +6,37 @@ import { promisify } from 'util';
 
 const execAsync = promisify(exec);
 
+// Worker Python persistente (pdf_worker_daemon.py); 'off' desativa e usa sempre o wrapper
+const PDF_WORKER_URL = process.env.PDF_WORKER_URL || 'http://127.0.0.1:8765';
+
+async function processWithWorker(pdfPaths: string[], bulk: boolean): Promise<{ csvContent: string; results: unknown[] } | null> {
+  if (PDF_WORKER_URL === 'off') {
+    return null;
+  }
+  try {
+    const response = await fetch(`${PDF_WORKER_URL}/process-pdfs`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ paths: pdfPaths, bulk }),
+    });
+    if (!response.ok) {
+      console.log(`Worker Python respondeu ${response.status}, usando wrapper`);
+      return null;
+    }
+    const result = await response.json();
+    return result.success ? { csvContent: result.csvContent, results: result.results } : null;
+  } catch (error: any) {
+    console.log('Worker Python indisponível, usando wrapper:', error.message);
+    return null;
+  }
+}
+
 export async function POST(request: NextRequest) {
   try {
     const formData = await request.formData();
     const files = formData.getAll('files') as File[];
+    // PDFs exportados com as folhas de vários colaboradores: um resultado por colaborador
+    const bulk = formData.get('bulk') === 'true';
 
     if (!files || files.length === 0) {
       return NextResponse.json({ error: 'Nenhum arquivo enviado' }, { status: 400 });
@@ -32,13 +59,24 @@ export async function POST(request: NextRequest) {
 
     console.log(`Arquivos salvos em: ${tempFilePaths.join(', ')}`);
 
+    // Caminho rápido: worker persistente com os processadores já carregados
+    const workerResult = await processWithWorker(tempFilePaths, bulk);
+    if (workerResult) {
+      return NextResponse.json({
+        success: true,
+        csvContent: workerResult.csvContent,
+        results: workerResult.results,
+        message: 'Processamento de PDFs concluído com sucesso',
+      });
+    }
+
     const csvFileName = `resultados_ponto_${Date.now()}.csv`;
     const csvFilePath = join(tempDir, csvFileName);
     const wrapperPath = join(process.cwd(), 'backend_pdf_processor_wrapper.py');
     
-    // Construir comando com argumentos corretos: wrapper.py pdf1.pdf pdf2.pdf tempDir nome.csv
+    // Construir comando com argumentos corretos: wrapper.py [--bulk] pdf1.pdf pdf2.pdf tempDir nome.csv
     const pythonCmd = process.platform === 'win32' ? 'python' : 'python3';
-    const command = `${pythonCmd} "${wrapperPath}" ${tempFilePaths.map(p => `"${p}"`).join(' ')} "${tempDir}" "${csvFileName}"`;
+    const command = `${pythonCmd} "${wrapperPath}" ${bulk ? '--bulk ' : ''}${tempFilePaths.map(p => `"${p}"`).join(' ')} "${tempDir}" "${csvFileName}"`;
 
     console.log(`Executando comando: ${command}`);
 
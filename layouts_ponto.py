@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Layouts conhecidos de tabelas (modelos de documento)
+Um layout é reconhecido pelas palavras do cabeçalho e suas posições; a impressão digital
+(modelo + início de cada coluna, arredondado) identifica o modelo exato e as faixas horizontais
+das colunas ficam guardadas por ela. As células saem direto das coordenadas das palavras, sem a
+detecção genérica de linhas/retas do pdfplumber (extract_tables), que fica só para layouts desconhecidos
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from padroes_ponto import RE_DATA
+
+# Palavras cujo topo difere menos que isto (pontos) estão na mesma linha
+TOLERANCIA_LINHA = 3.0
+# Resolução da impressão digital: posições arredondadas para múltiplos disto (pontos)
+RESOLUCAO_ASSINATURA = 4.0
+# A tabela termina quando o espaço até a próxima linha passa deste múltiplo do passo entre linhas
+FATOR_FIM_TABELA = 1.8
+
+
+class LayoutTabela:
+    """Modelo de tabela: nome e a sequência de palavras do cabeçalho de cada coluna"""
+
+    def __init__(self, nome: str, colunas: Sequence[str], coluna_chave: int = 0, padrao_chave=None):
+        self.nome = nome
+        self.colunas = [tuple(coluna.split()) for coluna in colunas]
+        self.coluna_chave = coluna_chave  # coluna que toda linha de dados preenche
+        self.padrao_chave = padrao_chave  # regex que a coluna chave de ao menos uma linha deve satisfazer
+
+    def localizar_cabecalho(self, linha: List[Dict]) -> Optional[List[Tuple[float, float]]]:
+        """(x0, x1) de cada coluna se a linha for o cabeçalho deste layout, senão None"""
+        textos = [w['text'] for w in linha]
+        extensoes = []
+        inicio = 0
+        for coluna in self.colunas:
+            encontrada = False
+            for i in range(inicio, len(textos) - len(coluna) + 1):
+                if tuple(textos[i:i + len(coluna)]) == coluna:
+                    palavras = linha[i:i + len(coluna)]
+                    extensoes.append((palavras[0]['x0'], palavras[-1]['x1']))
+                    inicio = i + len(coluna)
+                    encontrada = True
+                    break
+            if not encontrada:
+                return None
+        return extensoes
+
+
+# Folha de ponto do TRT (Data | Ent 1 - Sai 1 | Ent 2 - Sai 2 | C.PRE | H.NOT | H.FAL | H.EXT | E.NOT),
+# o formato lido por analyze_table_structure e parse_table_entries
+LAYOUTS = [
+    LayoutTabela(
+        'trt_ponto',
+        ['Data', 'Ent 1 - Sai 1', 'Ent 2 - Sai 2', 'C.PRE', 'H.NOT', 'H.FAL', 'H.EXT', 'E.NOT'],
+        padrao_chave=RE_DATA,
+    ),
+]
+
+# Faixas de colunas já calculadas, por impressão digital
+_faixas_por_assinatura: Dict[str, List[Tuple[float, float]]] = {}
+_faixas_lock = threading.Lock()
+
+
+def agrupar_linhas(palavras: List[Dict], tolerancia: float = TOLERANCIA_LINHA) -> List[List[Dict]]:
+    """Palavras agrupadas em linhas pelo topo, de cima para baixo e da esquerda para a direita"""
+    linhas = []
+    topo_linha = None
+    for palavra in sorted(palavras, key=lambda w: (w['top'], w['x0'])):
+        if topo_linha is None or palavra['top'] - topo_linha > tolerancia:
+            linhas.append([])
+            topo_linha = palavra['top']
+        linhas[-1].append(palavra)
+    for linha in linhas:
+        linha.sort(key=lambda w: w['x0'])
+    return linhas
+
+
+def assinatura_layout(layout: LayoutTabela, extensoes: List[Tuple[float, float]]) -> str:
+    """Impressão digital do layout: nome do modelo + início de cada coluna do cabeçalho arredondado"""
+    posicoes = '-'.join(str(int(round(x0 / RESOLUCAO_ASSINATURA))) for x0, _ in extensoes)
+    return f"{layout.nome}:{posicoes}"
+
+
+def faixas_colunas(extensoes: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """
+    Faixas horizontais das colunas a partir do cabeçalho: o conteúdo fica centrado sob o título,
+    então o limite entre duas colunas é o ponto médio entre os centros dos títulos
+    """
+    centros = [(x0 + x1) / 2 for x0, x1 in extensoes]
+    limites = [(a + b) / 2 for a, b in zip(centros, centros[1:])]
+    return list(zip([float('-inf')] + limites, limites + [float('inf')]))
+
+
+def reconhecer_layout(linhas: List[List[Dict]]) -> Optional[Tuple[LayoutTabela, str, int, List[Tuple[float, float]]]]:
+    """(layout, impressão digital, índice da linha do cabeçalho, faixas das colunas) ou None se desconhecido"""
+    for indice, linha in enumerate(linhas):
+        for layout in LAYOUTS:
+            extensoes = layout.localizar_cabecalho(linha)
+            if extensoes is None:
+                continue
+            assinatura = assinatura_layout(layout, extensoes)
+            with _faixas_lock:
+                faixas = _faixas_por_assinatura.get(assinatura)
+                if faixas is None:
+                    faixas = _faixas_por_assinatura[assinatura] = faixas_colunas(extensoes)
+            return layout, assinatura, indice, faixas
+    return None
+
+
+def _coluna_da_palavra(palavra: Dict, faixas: List[Tuple[float, float]]) -> int:
+    centro = (palavra['x0'] + palavra['x1']) / 2
+    for i, (inicio, fim) in enumerate(faixas):
+        if inicio <= centro < fim:
+            return i
+    return len(faixas) - 1
+
+
+def extrair_tabela(layout: LayoutTabela, linhas: List[List[Dict]], indice_cabecalho: int,
+                   faixas: List[Tuple[float, float]]) -> Optional[List[List[str]]]:
+    """
+    Tabela no mesmo formato do extract_tables (cabeçalho + linhas de dados, uma string por célula)
+    montada pelas coordenadas das palavras abaixo do cabeçalho; None se nenhuma linha confirmar o layout
+    """
+    def celulas(linha):
+        textos = [[] for _ in faixas]
+        for palavra in linha:
+            textos[_coluna_da_palavra(palavra, faixas)].append(palavra['text'])
+        return [' '.join(t) for t in textos]
+
+    tabela = [[' '.join(coluna) for coluna in layout.colunas]]
+    topo_anterior = linhas[indice_cabecalho][0]['top']
+    passo = None
+    confirmada = False
+
+    for linha in linhas[indice_cabecalho + 1:]:
+        distancia = linha[0]['top'] - topo_anterior
+        if passo is None:
+            passo = distancia
+        elif distancia > passo * FATOR_FIM_TABELA:
+            break
+        topo_anterior = linha[0]['top']
+
+        linha_tabela = celulas(linha)
+        if not linha_tabela[layout.coluna_chave]:
+            break
+        if layout.padrao_chave is None or layout.padrao_chave.search(linha_tabela[layout.coluna_chave]):
+            confirmada = True
+        tabela.append(linha_tabela)
+
+    return tabela if confirmada else None
+
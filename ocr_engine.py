@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Motores de OCR usados pelo processamento de PDFs
+TesserocrEngine mantém instâncias da API C do Tesseract já inicializadas (um pool por idioma e configuração),
+então cada imagem custa apenas o reconhecimento; PytesseractEngine (um processo 'tesseract' por chamada)
+continua como alternativa quando o tesserocr não está instalado ou falha.
+A escolha é feita pela variável OCR_ENGINE: 'auto' (padrão), 'tesserocr' ou 'pytesseract'
+"""
+
+import os
+import queue
+import shlex
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Instâncias residentes por (idioma, configuração); acima disso a chamada espera uma ficar livre
+OCR_POOL_SIZE = int(os.getenv('OCR_POOL_SIZE', min(4, os.cpu_count() or 1)))
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+CAMPOS_DADOS = ('block_num', 'par_num', 'line_num', 'conf', 'text')
+
+
+class OCREngine:
+    """Interface comum: dados por palavra no formato do pytesseract.image_to_data e texto corrido"""
+
+    nome = 'base'
+
+    def dados(self, img, lang: str, config: str = '') -> Dict[str, List]:
+        raise NotImplementedError
+
+    def texto(self, img, lang: str, config: str = '') -> str:
+        raise NotImplementedError
+
+
+class PytesseractEngine(OCREngine):
+    nome = 'pytesseract'
+
+    # Caminhos comuns do Tesseract no Windows, usados se ele não estiver no PATH
+    CAMINHOS_WINDOWS = [
+        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
+    ]
+
+    def __init__(self):
+        import pytesseract
+        self._pytesseract = pytesseract
+
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            for path in self.CAMINHOS_WINDOWS:
+                if os.path.exists(path):
+                    pytesseract.pytesseract.tesseract_cmd = path
+                    print(f"⚙️ Tesseract configurado: {path}", file=sys.stderr)
+                    break
+
+    def dados(self, img, lang: str, config: str = '') -> Dict[str, List]:
+        return self._pytesseract.image_to_data(img, lang=lang, config=config,
+                                               output_type=self._pytesseract.Output.DICT)
+
+    def texto(self, img, lang: str, config: str = '') -> str:
+        return self._pytesseract.image_to_string(img, lang=lang, config=config)
+
+
+def interpretar_config(config: str) -> Tuple[int, int, Tuple[Tuple[str, str], ...]]:
+    """'--oem 3 --psm 6 -c chave=valor' -> (oem, psm, ((chave, valor), ...))"""
+    oem, psm, variaveis = 3, 3, []
+    partes = shlex.split(config or '', posix=False)
+    i = 0
+    while i < len(partes):
+        parte = partes[i]
+        if parte == '--oem' and i + 1 < len(partes):
+            oem = int(partes[i + 1])
+            i += 1
+        elif parte == '--psm' and i + 1 < len(partes):
+            psm = int(partes[i + 1])
+            i += 1
+        elif parte == '-c' and i + 1 < len(partes) and '=' in partes[i + 1]:
+            chave, valor = partes[i + 1].split('=', 1)
+            variaveis.append((chave, valor))
+            i += 1
+        i += 1
+    return oem, psm, tuple(variaveis)
+
+
+def tsv_para_dados(tsv: str) -> Dict[str, List]:
+    """Converte a saída TSV do Tesseract (a mesma que o image_to_data lê) no dicionário por coluna"""
+    dados = {campo: [] for campo in CAMPOS_DADOS}
+    linhas = tsv.split('\n')
+    # O GetTSVText da API não inclui o cabeçalho; o arquivo do executável inclui
+    if linhas and linhas[0].startswith('level'):
+        linhas = linhas[1:]
+    for linha in linhas:
+        colunas = linha.split('\t')
+        if len(colunas) < 12:
+            continue
+        dados['block_num'].append(int(colunas[2]))
+        dados['par_num'].append(int(colunas[3]))
+        dados['line_num'].append(int(colunas[4]))
+        dados['conf'].append(float(colunas[10]))
+        dados['text'].append(colunas[11])
+    return dados
+
+
+class TesserocrEngine(OCREngine):
+    """Pool de PyTessBaseAPI por (idioma, oem, psm, variáveis): o traineddata é carregado uma vez por instância"""
+
+    nome = 'tesserocr'
+
+    def __init__(self, tamanho_pool: int = OCR_POOL_SIZE, alternativo: OCREngine = None):
+        if tesserocr is None:
+            raise ImportError("tesserocr não instalado")
+        self.tamanho_pool = max(1, tamanho_pool)
+        self.alternativo = alternativo
+        self._lock = threading.Lock()
+        self._livres: Dict[tuple, queue.LifoQueue] = {}
+        self._criadas: Dict[tuple, int] = {}
+        self._falhas = set()
+
+    def _criar_api(self, chave: tuple):
+        lang, oem, psm, variaveis = chave
+        api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM(oem), psm=tesserocr.PSM(psm))
+        for nome, valor in variaveis:
+            api.SetVariable(nome, valor)
+        return api
+
+    @contextmanager
+    def _api(self, chave: tuple):
+        """Empresta uma instância livre da chave, criando-a se o pool ainda não estiver cheio"""
+        with self._lock:
+            livres = self._livres.setdefault(chave, queue.LifoQueue())
+            criar = livres.empty() and self._criadas.get(chave, 0) < self.tamanho_pool
+            if criar:
+                self._criadas[chave] = self._criadas.get(chave, 0) + 1
+
+        if criar:
+            try:
+                api = self._criar_api(chave)
+            except Exception:
+                # Ex.: idioma sem traineddata para a API; esta chave passa a usar o motor alternativo
+                with self._lock:
+                    self._criadas[chave] -= 1
+                    if self.alternativo is not None:
+                        self._falhas.add(chave)
+                raise
+            print(f"⚙️ Tesseract residente criado para {chave[0]} (psm {chave[2]})", file=sys.stderr)
+        else:
+            api = livres.get()
+
+        try:
+            yield api
+        finally:
+            api.Clear()
+            livres.put(api)
+
+    def _executar(self, img, lang: str, config: str, ler):
+        oem, psm, variaveis = interpretar_config(config)
+        chave = (lang, oem, psm, variaveis)
+        if chave not in self._falhas:
+            try:
+                with self._api(chave) as api:
+                    api.SetImage(img)
+                    return ler(api)
+            except Exception as e:
+                if self.alternativo is None:
+                    raise
+                if chave in self._falhas:
+                    print(f"⚠️ tesserocr indisponível para {lang} ({config}), usando {self.alternativo.nome}: {e}", file=sys.stderr)
+                else:
+                    # Falha desta imagem (ex.: recorte inválido): só ela vai para o alternativo
+                    print(f"⚠️ tesserocr falhou nesta imagem ({lang}, {config}), usando {self.alternativo.nome}: {e}", file=sys.stderr)
+        return None
+
+    def dados(self, img, lang: str, config: str = '') -> Dict[str, List]:
+        resultado = self._executar(img, lang, config, lambda api: tsv_para_dados(api.GetTSVText(0)))
+        return resultado if resultado is not None else self.alternativo.dados(img, lang, config)
+
+    def texto(self, img, lang: str, config: str = '') -> str:
+        resultado = self._executar(img, lang, config, lambda api: api.GetUTF8Text())
+        return resultado if resultado is not None else self.alternativo.texto(img, lang, config)
+
+    def close(self):
+        with self._lock:
+            for livres in self._livres.values():
+                while not livres.empty():
+                    livres.get().End()
+            self._livres.clear()
+            self._criadas.clear()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OCREngine:
+    """Motor compartilhado pelo processo, conforme OCR_ENGINE; levanta ImportError se nenhum estiver disponível"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _criar_engine(os.getenv('OCR_ENGINE', 'auto').lower())
+                print(f"🔧 Motor de OCR: {_engine.nome}", file=sys.stderr)
+    return _engine
+
+
+def _criar_engine(escolha: str) -> OCREngine:
+    if escolha == 'pytesseract':
+        return PytesseractEngine()
+
+    try:
+        alternativo = PytesseractEngine()
+    except ImportError:
+        alternativo = None
+
+    if tesserocr is not None:
+        return TesserocrEngine(alternativo=alternativo)
+    if escolha == 'tesserocr':
+        raise ImportError("OCR_ENGINE=tesserocr, mas o tesserocr não está instalado")
+    if alternativo is None:
+        raise ImportError("Nenhum motor de OCR disponível: instale pytesseract ou tesserocr")
+    return alternativo
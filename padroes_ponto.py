@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Registro de padrões do processamento de ponto
+Regex pré-compiladas uma única vez no carregamento do módulo, inclusive os conjuntos fixos de
+palavras-chave (frases de assinatura, listas de exclusão), cada um reunido em uma única alternação.
+As listas de exclusão estão em maiúsculas: buscar em texto.upper(), como a comparação original
+"""
+
+import re
+from typing import Iterable
+
+
+def compilar_palavras(palavras: Iterable[str]) -> 're.Pattern':
+    """
+    Alternação pré-compilada de palavras literais: a busca percorre o texto uma vez, no motor de regex em C.
+    As mais longas vêm primeiro, para que na mesma posição vença a frase completa
+    """
+    return re.compile('|'.join(re.escape(p) for p in sorted(palavras, key=len, reverse=True)))
+
+
+# ----- Regex pré-compiladas -----
+
+RE_DATA = re.compile(r'(\d{2}/\d{2}/\d{4})')
+RE_NUMERO_DATA_HORA = re.compile(r'[0-9\/\-:]')
+RE_NUMERO_DATA_HORA_SEM_DOIS_PONTOS = re.compile(r'[0-9\/\-]')
+RE_DUAS_PALAVRAS_LONGAS = re.compile(r'[A-Z]{3,}\s+[A-Z]{3,}')
+RE_TRES_PALAVRAS_LONGAS = re.compile(r'[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}')
+RE_CINCO_PALAVRAS_LONGAS = re.compile(r'([A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,}\s+[A-Z]{3,})')
+RE_NOME_ANTES_PERIODO = re.compile(r'([A-Z][A-Z\sÇÁÉÍÓÚÀÂÊÔÃÕ\-]+?)(?=\s*-\s*Período)')
+RE_NOME_LONGO = re.compile(r'([A-Z][A-Z\sÇÁÉÍÓÚÀÂÊÔÃÕ\-]{20,})')
+
+# Linha de cabeçalho de cada folha de ponto: "NOME DO COLABORADOR - Período: 01/05/25 à 31/05/25"
+RE_CABECALHO_COLABORADOR = re.compile(
+    r'^[ \t]*([A-ZÇÁÉÍÓÚÀÂÊÔÃÕ][A-ZÇÁÉÍÓÚÀÂÊÔÃÕ \-]+?)[ \t]*-[ \t]*Período:[ \t]*'
+    r'(\d{2}/\d{2}/\d{2,4})[ \t]*à[ \t]*(\d{2}/\d{2}/\d{2,4})',
+    re.MULTILINE
+)
+
+# Frases de assinatura no texto do documento (uma única alternação)
+RE_ASSINATURA_TEXTO = re.compile(
+    r'assinado'
+    r'|assinatura\s*(?:digital|eletrônica)'
+    r'|documento\s*assinado'
+    r'|digitalmente\s*assinado'
+    r'|pré-assinado'
+    r'|pre-assinado'
+)
+
+# CPF formatado (com ou sem o prefixo "cpf"): uma ocorrência do número já basta
+RE_CPF = re.compile(r'[0-9]{3}\.[0-9]{3}\.[0-9]{3}-[0-9]{2}')
+
+# ----- Conjuntos de palavras-chave -----
+
+ASSINATURA_TABELA_ESPECIFICA = [
+    'assinado digitalmente',
+    'assinatura digital',
+    'documento assinado digitalmente',
+    'ponto assinado digitalmente',
+    'assinado eletronicamente',
+    'assinatura eletrônica',
+    'certificado digital',
+    'validação digital',
+    'autenticação digital',
+    'colaborador assinou digitalmente',
+]
+
+ASSINATURA_TABELA_GENERICA = [
+    'documento assinado',
+    'ponto assinado',
+    'colaborador assinou',
+    'verificado digitalmente',
+    'validado digitalmente',
+    'assinado por',
+]
+
+# Frases de assinatura nas linhas da tabela (texto em minúsculas), por nível de confiança
+RE_ASSINATURA_TABELA_ESPECIFICA = compilar_palavras(ASSINATURA_TABELA_ESPECIFICA)
+RE_ASSINATURA_TABELA_GENERICA = compilar_palavras(ASSINATURA_TABELA_GENERICA)
+
+# Cabeçalhos e linhas estruturais do cartão de ponto
+RE_CABECALHOS_TABELA = compilar_palavras([
+    'HORARIO DE TRABALHO', 'TRT RN I', 'FOLHA DE PONTO', 'DIA E1 S1 E2 S2',
+    'DOM FOLGA FOLGA FOLGA FOLGA', 'SEG 07:30 12:00 13:00 16:30',
+    'DATA', 'ENT 1 - SAI 1', 'ENT 2 - SAI 2', 'C.PRE', 'H.NOT', 'H.FAL', 'H.EXT', 'E.NOT',
+])
+
+RE_CABECALHOS_TEXTO = compilar_palavras([
+    'HORARIO DE TRABALHO', 'TRT RN I', 'DOM FOLGA FOLGA', 'SEG 07:30 12:00',
+])
+
+# Códigos de marcação que o OCR confunde com nomes (ex.: 'NMO PQ RQ PS RS')
+RE_CODIGOS_PROBLEMATICOS = compilar_palavras(['NMO', 'PQ', 'RQ', 'PS', 'RS'])
+
+# Palavras de empresa/endereço que não fazem parte do nome do colaborador
+RE_EXCLUSOES_NOME = compilar_palavras([
+    'CARTÃO', 'PONTO', 'EMPRESA', 'CNPJ', 'TECNOLOGIA', 'INFORMATICA',
+    'ENDEREÇO', 'RUA', 'NOVA', 'GRANADA', 'BELO', 'HORIZONTE', 'MINAS', 'GERAIS',
+])
+
+RE_EXCLUSOES_NOME_TABELA = compilar_palavras([
+    'HORARIO', 'TRABALHO', 'TRT', 'RN', 'I', 'FOLGA', 'DOM', 'SEG', 'TER', 'QUA', 'QUI', 'SEX', 'SAB',
+])
+
+RE_EXCLUSOES_LINHA_NOME = compilar_palavras([
+    'CARTÃO', 'PONTO', 'HORARIO', 'TRABALHO', 'EMPRESA', 'CNPJ',
+])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Leitura de PDFs página a página com memória limitada
+O pdfplumber guarda em cada página o layout e os objetos (caracteres, linhas, retângulos) já
+interpretados, e o pdfminer guarda os objetos já lidos do arquivo; ambos só são liberados ao fechar o
+PDF, então em documentos de centenas de páginas a memória cresce com o número de páginas.
+iterar_paginas entrega uma página por vez e descarta esses caches assim que o consumidor passa para a
+próxima, então o pico fica perto do de uma única página
+"""
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import pdfplumber
+
+
+def liberar_pagina(page):
+    """Descarta o layout e os objetos em cache da página (ela continua utilizável, recalculando se preciso)"""
+    fechar = getattr(page, 'close', None)  # pdfplumber >= 0.10 também limpa o cache do mapa de texto
+    if fechar is not None:
+        fechar()
+    else:
+        page.flush_cache()
+
+
+def iterar_paginas(origem, paginas: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, 'pdfplumber.page.Page']]:
+    """
+    (índice, página pdfplumber) de cada página de 'origem' (caminho ou arquivo em memória),
+    ou só dos índices em 'paginas' (base 0). A página só é válida até a próxima ser pedida
+    """
+    numeros = None if paginas is None else sorted(i + 1 for i in paginas)
+    with pdfplumber.open(origem, pages=numeros) as pdf:
+        # Objetos do PDF já lidos pelo pdfminer (inclusive fluxos de conteúdo decodificados); é só um cache
+        objetos_lidos = getattr(pdf.doc, '_cached_objs', None)
+        for page in pdf.pages:
+            try:
+                yield page.page_number - 1, page
+            finally:
+                liberar_pagina(page)
+                if objetos_lidos is not None:
+                    objetos_lidos.clear()
+
+
+def tem_fios_de_tabela(pagina_fitz) -> bool:
+    """
+    Se a página PyMuPDF tem ao menos um fio horizontal e um vertical (ou um retângulo). O find_tables
+    padrão monta as células a partir desses fios, então sem eles não acha nada; a verificação custa uma
+    fração do find_tables, que em páginas só de texto gasta centenas de ms procurando
+    """
+    horizontal = vertical = False
+    for desenho in pagina_fitz.get_drawings():
+        for item in desenho['items']:
+            if item[0] in ('re', 'qu'):
+                return True
+            if item[0] == 'l':
+                inicio, fim = item[1], item[2]
+                if abs(inicio.y - fim.y) < 1:
+                    horizontal = True
+                elif abs(inicio.x - fim.x) < 1:
+                    vertical = True
+                if horizontal and vertical:
+                    return True
+    return False
+
+
+def tabelas_da_pagina(pagina_fitz) -> List:
+    """Tabelas do find_tables do PyMuPDF na página, sem chamá-lo em páginas sem fios de tabela"""
+    if not tem_fios_de_tabela(pagina_fitz):
+        return []
+    return pagina_fitz.find_tables().tables
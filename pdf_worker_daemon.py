@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Serviço persistente de processamento de PDFs
+Mantém os processadores carregados em memória e responde via HTTP local com JSON,
+evitando iniciar um interpretador Python (e reimportar pandas/pdfplumber) a cada upload
+
+Uso: python pdf_worker_daemon.py [--host 127.0.0.1] [--port 8765] [--workers N]
+POST /process-pdfs aceita "bulk": true para PDFs com as folhas de vários colaboradores
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Vários PDFs e páginas em OCR ao mesmo tempo: cada Tesseract com uma thread OpenMP. Definido antes de
+# importar os processadores (a biblioteca lê a variável ao carregar) e herdado pelos processos do pool
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+import backend_pdf_processor
+import processador_contracheque
+
+DEFAULT_HOST = os.getenv('PDF_WORKER_HOST', '127.0.0.1')
+DEFAULT_PORT = int(os.getenv('PDF_WORKER_PORT', 8765))
+MAX_BODY_BYTES = 200 * 1024 * 1024
+
+
+class PDFWorkerService:
+    """Pool de processos persistente com os processadores já importados"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.processor = backend_pdf_processor.PontoProcessor()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Aquecer o pool para que o primeiro upload não pague a criação dos processos
+        for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        print(f"[OK] Pool de processamento pronto com {self.workers} processos", file=sys.stderr)
+
+    def _documentos(self, payload: Dict) -> List[Tuple[str, Optional[bytes]]]:
+        """Aceita {"paths": [...]} e/ou {"files": [{"name": ..., "content": <base64>}]}"""
+        documentos = [(path, None) for path in payload.get('paths') or []]
+        for file in payload.get('files') or []:
+            documentos.append((file.get('name') or 'documento.pdf', base64.b64decode(file['content'])))
+
+        if not documentos:
+            raise ValueError("Nenhum PDF informado (use 'paths' ou 'files')")
+        for path, conteudo in documentos:
+            if conteudo is None and not os.path.exists(path):
+                raise ValueError(f"Arquivo não encontrado: {path}")
+        return documentos
+
+    def process_pontos(self, payload: Dict) -> Dict:
+        """Com {"bulk": true}, cada PDF é dividido por colaborador e os trechos vão para o pool em paralelo"""
+        documentos = self._documentos(payload)
+        if payload.get('bulk'):
+            # A divisão (PyMuPDF) também roda no pool, não na thread da requisição
+            divisoes = [self.pool.submit(backend_pdf_processor.recortar_pdf_lote, nome, conteudo)
+                        for nome, conteudo in documentos]
+            trechos = []
+            for (nome, conteudo), divisao in zip(documentos, divisoes):
+                try:
+                    trechos.extend(divisao.result())
+                except Exception as e:
+                    # Sem divisão, o documento segue inteiro (e, se estiver corrompido, vira um resultado de erro)
+                    print(f"[ERRO] Divisão por colaborador de {nome} falhou: {e}", file=sys.stderr)
+                    trechos.append((None, nome, conteudo))
+        else:
+            trechos = [(None, nome, conteudo) for nome, conteudo in documentos]
+        futures = [
+            self.pool.submit(backend_pdf_processor.processar_pdf_ponto, nome, conteudo)
+            for _, nome, conteudo in trechos
+        ]
+
+        # Resultados na ordem de entrada; falhas por documento no mesmo formato do processador
+        results = []
+        for (segmento, nome, _), future in zip(trechos, futures):
+            try:
+                results.append(self.processor.completar_lote(segmento, future.result()))
+            except Exception as e:
+                results.append({"error": f"Erro ao processar {nome}: {str(e)}"})
+
+        return {
+            "success": True,
+            "results": results,
+            "csvContent": self.processor.to_csv_content(results)
+        }
+
+    def process_contracheques(self, payload: Dict) -> Dict:
+        documentos = self._documentos(payload)
+        if any(conteudo is not None for _, conteudo in documentos):
+            raise ValueError("Contracheques devem ser enviados por caminho ('paths')")
+
+        # Contracheques e recibos são cruzados entre si, então o lote vai inteiro para um processo
+        paths = [path for path, _ in documentos]
+        results = self.pool.submit(processador_contracheque.process_documents, paths).result()
+        return {"success": True, "results": results}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class PDFWorkerHandler(BaseHTTPRequestHandler):
+    service: PDFWorkerService = None
+
+    routes = {
+        '/process-pdfs': 'process_pontos',
+        '/process-contracheques': 'process_contracheques',
+    }
+
+    def _send_json(self, status: int, data: Dict):
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {"status": "healthy", "workers": self.service.workers})
+        else:
+            self._send_json(404, {"error": f"Rota não encontrada: {self.path}"})
+
+    def do_POST(self):
+        method_name = self.routes.get(self.path)
+        if not method_name:
+            self._send_json(404, {"error": f"Rota não encontrada: {self.path}"})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Requisição muito grande"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            self._send_json(200, getattr(self.service, method_name)(payload))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            print(f"[ERRO] Falha no processamento: {e}", file=sys.stderr)
+            self._send_json(500, {"error": f"Erro no processamento: {str(e)}"})
+
+    def log_message(self, format, *args):
+        print(f"[worker] {self.address_string()} - {format % args}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serviço persistente de processamento de PDFs')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Endereço de escuta (padrão: apenas local)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Porta HTTP')
+    parser.add_argument('--workers', type=int, default=None, help='Processos de processamento (padrão: número de núcleos)')
+    args = parser.parse_args()
+
+    PDFWorkerHandler.service = PDFWorkerService(args.workers)
+    server = ThreadingHTTPServer((args.host, args.port), PDFWorkerHandler)
+    print(f"[OK] Worker de PDFs ouvindo em http://{args.host}:{args.port}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        PDFWorkerHandler.service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pré-processamento das imagens de OCR com NumPy
+As amostras do pixmap do PyMuPDF são lidas diretamente (sem codificar/decodificar PNG) como uma matriz
+em escala de cinza, e cada variante (contraste, Otsu, inversão, nitidez, suavização) é gerada sob demanda
+por operações vetorizadas sobre esse buffer, reaproveitando uma única matriz de saída
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Ordem em que as variantes são tentadas pela cascata de OCR
+NOMES_VARIANTES = ('cinza', 'contraste', 'otsu', 'invertida', 'nitidez', 'suavizada')
+
+FATOR_CONTRASTE = 3.0
+
+# Entra na chave do cache de OCR: incrementar quando a renderização em cinza, a redução ou alguma variante
+# mudar de forma que altere o texto reconhecido (2: limiar de Otsu no lugar do fixo em 128, render em cinza reduzido)
+VERSAO_PREPROCESSAMENTO = 2
+
+
+def pixmap_para_cinza(pix) -> np.ndarray:
+    """
+    Matriz (altura, largura) uint8 sobre as amostras do pixmap, sem cópia quando ele já é em cinza
+    (renderizar com colorspace=fitz.csGRAY, alpha=False). O pixmap deve continuar vivo enquanto a matriz for usada
+    """
+    amostras = getattr(pix, 'samples_mv', None) or pix.samples
+    dados = np.frombuffer(amostras, dtype=np.uint8).reshape(pix.height, pix.stride)
+    if pix.n == 1:
+        return dados[:, :pix.width]
+
+    # RGB/RGBA: luminância ITU-R 601, como o convert('L') do Pillow
+    canais = dados[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+    cinza = canais[..., 0].astype(np.uint32) * 299
+    cinza += canais[..., 1].astype(np.uint32) * 587
+    cinza += canais[..., 2].astype(np.uint32) * 114
+    return ((cinza + 500) // 1000).astype(np.uint8)
+
+
+def reduzir(cinza: np.ndarray, fator: float) -> np.ndarray:
+    """Reduz a imagem pelo fator (0-1] com média por área (filtro BOX do Pillow, em C)"""
+    if fator >= 1:
+        return cinza
+    from PIL import Image
+
+    altura, largura = cinza.shape
+    tamanho = (max(1, round(largura * fator)), max(1, round(altura * fator)))
+    return np.asarray(Image.fromarray(cinza).resize(tamanho, Image.Resampling.BOX))
+
+
+def limiar_otsu(cinza: np.ndarray) -> int:
+    """Limiar que maximiza a variância entre as classes do histograma"""
+    histograma = np.bincount(cinza.ravel(), minlength=256).astype(np.float64)
+    total = histograma.sum()
+    if not total:
+        return 128
+
+    niveis = np.arange(256, dtype=np.float64)
+    peso_fundo = np.cumsum(histograma)
+    soma_fundo = np.cumsum(histograma * niveis)
+    peso_frente = total - peso_fundo
+
+    media_fundo = np.divide(soma_fundo, peso_fundo, out=np.zeros(256), where=peso_fundo > 0)
+    media_frente = np.divide(soma_fundo[-1] - soma_fundo, peso_frente, out=np.zeros(256), where=peso_frente > 0)
+    variancia = peso_fundo * peso_frente * (media_fundo - media_frente) ** 2
+    # Entre duas classes bem separadas a variância forma um platô (níveis vazios): usar o meio dele.
+    # O limiar t separa os níveis <= t; a binarização usa "< limiar", então o corte fica em t + 1
+    maximos = np.flatnonzero(np.isclose(variancia, variancia.max()))
+    return int(round(maximos.mean())) + 1
+
+
+def _filtro_3x3(cinza: np.ndarray, centro: int, vizinhos: int, divisor: int, saida: np.ndarray) -> np.ndarray:
+    """Convolução 3x3 com peso 'centro' no pixel e 'vizinhos' nos 8 vizinhos (bordas replicadas)"""
+    borda = np.pad(cinza, 1, mode='edge').astype(np.int32)
+    altura, largura = cinza.shape
+    soma = np.zeros((altura, largura), dtype=np.int32)
+    for dy in range(3):
+        for dx in range(3):
+            soma += borda[dy:dy + altura, dx:dx + largura]
+    # soma inclui o centro uma vez com peso 'vizinhos'
+    acumulado = soma * vizinhos + borda[1:-1, 1:-1] * (centro - vizinhos)
+    np.clip((acumulado + divisor // 2) // divisor, 0, 255, out=acumulado)
+    saida[...] = acumulado
+    return saida
+
+
+def gerar_variante(cinza: np.ndarray, nome: str, saida: Optional[np.ndarray] = None) -> np.ndarray:
+    """Uma variante de pré-processamento; 'cinza' devolve o próprio buffer e as demais escrevem em 'saida'"""
+    if nome == 'cinza':
+        return cinza
+    if saida is None:
+        saida = np.empty(cinza.shape, dtype=np.uint8)
+
+    if nome == 'contraste':
+        # Mesmo cálculo do ImageEnhance.Contrast: afastar cada pixel da média global
+        media = int(cinza.mean() + 0.5)
+        np.clip(media + FATOR_CONTRASTE * (cinza.astype(np.float32) - media), 0, 255, out=saida, casting='unsafe')
+    elif nome == 'otsu':
+        np.multiply(cinza >= limiar_otsu(cinza), 255, out=saida, casting='unsafe')
+    elif nome == 'invertida':
+        np.subtract(255, cinza, out=saida)
+    elif nome == 'nitidez':
+        # Kernel SHARPEN do Pillow: 32 no centro, -2 nos vizinhos, divisor 16
+        _filtro_3x3(cinza, 32, -2, 16, saida)
+    elif nome == 'suavizada':
+        # Kernel SMOOTH do Pillow: 5 no centro, 1 nos vizinhos, divisor 13
+        _filtro_3x3(cinza, 5, 1, 13, saida)
+    else:
+        raise ValueError(f"Variante de pré-processamento desconhecida: {nome}")
+    return saida
+
+
+def variantes(cinza: np.ndarray) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    Gera as variantes em NOMES_VARIANTES sob demanda, todas no mesmo buffer de saída: cada uma só é válida
+    até a próxima ser pedida (use gerar_variante para recriar a escolhida)
+    """
+    saida = np.empty(cinza.shape, dtype=np.uint8)
+    for nome in NOMES_VARIANTES:
+        yield nome, gerar_variante(cinza, nome, saida)
@@ -7,41 +7,67 @@ import os
 import sys
 from pathlib import Path
 import backend_pdf_processor
+from colaboradores_index import get_colaboradores_index
 from typing import List, Dict, Any
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extrai texto de um PDF usando backend_pdf_processor com OCR otimizado"""
-    try:
-        processor = backend_pdf_processor.PontoProcessor()
-        
-        # Primeiro tentar extração normal
-        text = processor.extract_text_from_pdf(pdf_path)
-        print(f"📄 Extração normal de {pdf_path}: {len(text)} caracteres", file=sys.stderr)
-        
-        # SEMPRE tentar OCR para PDFs com imagens (contracheques e recibos geralmente são imagens)
-        print(f"🔍 Tentando OCR para {pdf_path}...", file=sys.stderr)
-        ocr_text = processor.extract_text_with_ocr(pdf_path)
+def _extrair_texto(processor, pdf_path: str, documento) -> str:
+    """Texto da camada do PDF e, onde a triagem indicar, do OCR, com um documento já aberto"""
+    # Primeiro tentar extração normal
+    text = processor.extract_text_from_pdf(pdf_path, documento)
+    print(f"📄 Extração normal de {pdf_path}: {len(text)} caracteres", file=sys.stderr)
+    
+    # OCR apenas nas páginas sem camada de texto confiável ou cobertas por imagens; nas que têm
+    # texto, só as regiões de interesse (imagens, rodapé, vizinhança de 'Líquido'/'Total')
+    triagem = documento.triagem_paginas()
+    paginas_ocr = [i for i, tipo in enumerate(triagem) if tipo == 'ocr']
+    paginas_roi = [i for i, tipo in enumerate(triagem) if tipo == 'ambos']
+    if paginas_ocr or paginas_roi:
+        print(f"🔍 Tentando OCR para {pdf_path} (páginas {[i + 1 for i in paginas_ocr]}, "
+              f"regiões nas páginas {[i + 1 for i in paginas_roi]})...", file=sys.stderr)
+        ocr_text = ""
+        if paginas_ocr:
+            ocr_text += processor.extract_text_with_ocr(pdf_path, doc_type='contracheque', documento=documento,
+                                                        paginas=paginas_ocr)
+        if paginas_roi:
+            ocr_text += processor.extract_text_with_ocr(pdf_path, doc_type='contracheque', documento=documento,
+                                                        paginas=paginas_roi, roi=True)
         print(f"🔍 OCR de {pdf_path}: {len(ocr_text)} caracteres", file=sys.stderr)
-        
-        # Usar o texto que for mais longo e contiver mais informações
-        if len(ocr_text.strip()) > len(text.strip()):
-            print(f"✅ Usando texto OCR (mais completo)", file=sys.stderr)
-            final_text = ocr_text
-        elif len(text.strip()) > 50:
-            print(f"✅ Usando texto normal (suficiente)", file=sys.stderr)
-            final_text = text
-        else:
-            print(f"⚠️ Ambos os métodos retornaram pouco texto", file=sys.stderr)
-            final_text = ocr_text if ocr_text else text
-        
-        # Combinar ambos os textos para ter mais informações
-        combined_text = text + "\n\n" + ocr_text if text and ocr_text else final_text
-        
-        print(f"📝 Texto final de {pdf_path}: {len(combined_text)} caracteres", file=sys.stderr)
-        if combined_text:
-            print(f"📝 Primeiros 200 chars: {repr(combined_text[:200])}", file=sys.stderr)
-        
-        return combined_text
+    else:
+        print(f"⏭️ {pdf_path} tem camada de texto em todas as páginas, OCR dispensado", file=sys.stderr)
+        ocr_text = ""
+    
+    # Usar o texto que for mais longo e contiver mais informações
+    if len(ocr_text.strip()) > len(text.strip()):
+        print(f"✅ Usando texto OCR (mais completo)", file=sys.stderr)
+        final_text = ocr_text
+    elif len(text.strip()) > 50:
+        print(f"✅ Usando texto normal (suficiente)", file=sys.stderr)
+        final_text = text
+    else:
+        print(f"⚠️ Ambos os métodos retornaram pouco texto", file=sys.stderr)
+        final_text = ocr_text if ocr_text else text
+    
+    # Combinar ambos os textos para ter mais informações
+    combined_text = text + "\n\n" + ocr_text if text and ocr_text else final_text
+    
+    print(f"📝 Texto final de {pdf_path}: {len(combined_text)} caracteres", file=sys.stderr)
+    if combined_text:
+        print(f"📝 Primeiros 200 chars: {repr(combined_text[:200])}", file=sys.stderr)
+    
+    return combined_text
+
+def extract_text_from_pdf(pdf_path: str, conteudo: bytes = None, processor=None, documento=None) -> str:
+    """Extrai texto de um PDF (caminho ou bytes) usando backend_pdf_processor com OCR otimizado
+    
+    Um documento já aberto pode ser informado para que as etapas seguintes (ex.: verificação de assinatura)
+    reaproveitem as páginas renderizadas pelo OCR.
+    """
+    try:
+        processor = processor or backend_pdf_processor.PontoProcessor()
+        if documento is not None:
+            return _extrair_texto(processor, pdf_path, documento)
+        with processor.open_document(pdf_path, conteudo) as documento:
+            return _extrair_texto(processor, pdf_path, documento)
     
     except Exception as e:
         print(f"❌ Erro ao extrair texto de {pdf_path}: {e}", file=sys.stderr)
@@ -58,104 +84,83 @@ def extract_colaborador_name(text: str) -> str:
     for i, line in enumerate(lines[:15]):
         print(f"  {i+1}: {line}", file=sys.stderr)
     
-    # Padrões para extrair nome do colaborador (ordenados por prioridade)
+    # Primeiro: busca aproximada na lista de colaboradores (tolera espaços perdidos e letras trocadas pelo OCR)
+    encontrado = get_colaboradores_index().encontrar_no_texto(text)
+    if encontrado:
+        nome, score = encontrado
+        print(f"✅ DEBUG_NOME - Nome encontrado na lista de colaboradores: '{nome}' (similaridade {score:.2f})", file=sys.stderr)
+        return nome
+    
+    # Padrões para extrair nome do colaborador (ordenados por prioridade), com o filtro aplicado a cada um:
+    # 'maiusculas' para nomes longos em maiúsculas, 'misto' para nomes com pelo menos duas palavras
     patterns = [
-        # Padrão 1: Nome específico do recibo ADRIANO - formato Nome:NOME
-        r'Nome:([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{6,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]{0,50}[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)',
+        # Padrão 1: Formato Nome:NOME (recibos)
+        (r'Nome:([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{6,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]{0,50}[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)', 'maiusculas'),
         
-        # Padrão 2: Nome específico ADRIANO (sabemos que aparece nos dois documentos)
-        r'(ADRIANO[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]*COSTA[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]*SOUZA[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]*ROQUE)',
+        # Padrão 2: Nome completo em maiúsculas após dois pontos
+        (r':([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]*[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)', 'maiusculas'),
         
-        # Padrão 3: Qualquer sequência que contenha ADRIANO
-        r'(ADRIANO[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{10,})',
+        # Padrão 3: Nome completo sem espaços contendo sobrenome comum (ex.: FULANOCOSTADESOUZA)
+        (r'([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}(?:COSTA|SILVA|SANTOS|OLIVEIRA|SOUZA|LIMA|PEREIRA)[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{5,})', 'maiusculas'),
         
-        # Padrão 4: Nome completo em maiúsculas após dois pontos
-        r':([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]*[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)',
+        # Padrão 4: Nome após empresa/CNPJ na próxima linha
+        (r'CNPJ:[^\n]*\n[^\n]*([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]*[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)', 'maiusculas'),
         
-        # Padrão 5: Nome completo específico ADRIANOCOSTADESOUZAROQUE
-        r'([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}(?:COSTA|SILVA|SANTOS|OLIVEIRA|SOUZA|LIMA|PEREIRA)[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{5,})',
+        # Padrão 5: Nome na linha seguinte a COORDENADOR: a primeira palavra de 8+ letras maiúsculas dessa linha
+        # (sem IGNORECASE, para não pegar palavras comuns); se for um cargo, as palavras proibidas a descartam
+        (r'COORDENADOR[^\n]*\n[^\n]*?((?-i:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}))', 'maiusculas'),
         
-        # Padrão 6: Nome após empresa/CNPJ na próxima linha
-        r'CNPJ:[^\n]*\n[^\n]*([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]*[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)',
+        # Padrão 6: Nome após número de matrícula ou código
+        (r'\b\d{4,6}\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{6,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]*[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)', 'misto'),
         
-        # Padrão 7: Buscar especificamente por ADRIANO ou nomes similares
-        r'(ADRIANO[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]*|[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]*ADRIANO[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]*)',
+        # Padrão 7: Nome com separação por espaços (mínimo 4 palavras)
+        (r'\b([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{4,}\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{4,}\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{2,}\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{4,}(?:\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)\b', 'misto'),
         
-        # Padrão 8: Nome específico após COORDENADOR - buscar na linha seguinte
-        r'COORDENADOR[^\n]*\n[^\n]*?([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,})',
+        # Padrão 8: Nome após matrícula numérica
+        (r'\b\d{4,6}\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]{10,50})(?=\s+[A-Z]{3,}|\s+\d)', 'misto'),
         
-        # Padrão 9: Nome longo em maiúsculas sem palavras proibidas (8+ caracteres)
-        r'\b([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{8,})\b',
-        
-        # Padrão 10: Nome após número de matrícula ou código
-        r'\b\d{4,6}\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{6,}(?:[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]*[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)',
-        
-        # Padrão 11: Nome com separação por espaços (mínimo 3 palavras)
-        r'\b([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{4,}\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{4,}\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{2,}\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{4,}(?:\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ]{3,})*)\b',
-        
-        # Padrão 12: Nome após matrícula numérica
-        r'\b\d{4,6}\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][A-ZÁÀÂÃÉÊÍÓÔÕÚÇ\s]{10,50})(?=\s+[A-Z]{3,}|\s+\d)',
-        
-        # Padrão 13: Fallback para nomes em formato misto
-        r'(?:Nome|Colaborador)\s*[:\-]?\s*([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+(?:\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+){1,4})',
+        # Padrão 9: Fallback para nomes em formato misto
+        (r'(?:Nome|Colaborador)\s*[:\-]?\s*([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+(?:\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+){1,4})', 'misto'),
     ]
     
-    for i, pattern in enumerate(patterns, 1):
+    forbidden_words = ['FUNCIONARIO', 'DEPARTAMENTO', 'AGENCIA', 'CONTA', 'VALOR', 'DATA', 'TOTAL', 'SISPAG', 'TRIBUNAL', 'FOLHA', 
+                      'COORDENADOR', 'TECNICO', 'ATENDIMENTO', 'TECHCOM', 'TECNOLOGIA', 'INFORMATICA', 'CNPJ', 'MENSALISTA']
+    forbidden_misto = ['banco', 'agencia', 'conta', 'valor', 'data', 'total', 'sispag', 'funcionario', 'departamento']
+    
+    for i, (pattern, filtro) in enumerate(patterns, 1):
         print(f"🔍 DEBUG_NOME - Testando padrão {i}: {pattern[:50]}...", file=sys.stderr)
         
         try:
-            # Padrões 8 e 10 são para linha isolada
-            if i == 8:  # Padrão de linha isolada
-                for line in text.split('\n'):
-                    match = re.search(pattern, line.strip(), re.MULTILINE)
-                    if match:
-                        nome = match.group(1).strip()
-                        if len(nome.split()) >= 2:  # Pelo menos nome e sobrenome
-                            print(f"✅ DEBUG_NOME - Nome encontrado com padrão {i}: '{nome}'", file=sys.stderr)
-                            return nome
+            match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
+            if not match:
+                continue
+            nome = match.group(1).strip()
+            
+            if filtro == 'maiusculas':
+                # Para nomes em maiúsculas, verificar se não são palavras genéricas
+                if (len(nome) >= 6 and 
+                    not any(word in nome.upper() for word in forbidden_words)):
+                    
+                    # Limpar o nome se necessário
+                    nome_limpo = nome.split('\n')[0].strip()  # Pegar apenas a primeira linha
+                    nome_limpo = re.sub(r'\s+', ' ', nome_limpo)  # Normalizar espaços
+                    
+                    # Verificar se o nome limpo ainda é válido
+                    if (len(nome_limpo) >= 6 and 
+                        not any(word in nome_limpo.upper() for word in forbidden_words)):
+                        print(f"✅ DEBUG_NOME - Nome encontrado com padrão {i}: '{nome_limpo}'", file=sys.stderr)
+                        return nome_limpo
+            
             else:
-                match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-                if match:
-                    nome = match.group(1).strip()
+                # Para nomes em formato misto, verificar se tem pelo menos 2 palavras
+                if (len(nome.split()) >= 2 and 
+                    not any(word in nome.lower() for word in forbidden_misto)):
                     
-                    # Filtros específicos por tipo de padrão
-                    if i <= 8:  # Padrões 1-8: maiúsculas, nomes longos
-                        # Para nomes em maiúsculas, verificar se não são palavras genéricas
-                        forbidden_words = ['FUNCIONARIO', 'DEPARTAMENTO', 'AGENCIA', 'CONTA', 'VALOR', 'DATA', 'TOTAL', 'SISPAG', 'TRIBUNAL', 'FOLHA', 
-                                          'COORDENADOR', 'TECNICO', 'ATENDIMENTO', 'TECHCOM', 'TECNOLOGIA', 'INFORMATICA', 'CNPJ', 'MENSALISTA']
-                        
-                        if (len(nome) >= 6 and 
-                            not any(word in nome.upper() for word in forbidden_words)):
-                            
-                            # Limpar o nome se necessário
-                            nome_limpo = nome.split('\n')[0].strip()  # Pegar apenas a primeira linha
-                            nome_limpo = re.sub(r'\s+', ' ', nome_limpo)  # Normalizar espaços
-                            
-                            # Se contém COORDENADOR, extrair apenas o nome pessoal
-                            if 'COORDENADOR' in nome_limpo.upper():
-                                # Procurar por um nome de pessoa real (ADRIANO, etc.)
-                                nome_pessoa_match = re.search(r'([A-Z]{6,}(?:[A-Z]{3,})*)', nome_limpo)
-                                if nome_pessoa_match:
-                                    nome_candidato = nome_pessoa_match.group(1)
-                                    if nome_candidato not in ['COORDENADOR', 'TECNICO', 'ATENDIMENTO', 'TRIBUNAL']:
-                                        nome_limpo = nome_candidato
-                            
-                            # Verificar se o nome limpo ainda é válido
-                            if (len(nome_limpo) >= 6 and 
-                                not any(word in nome_limpo.upper() for word in forbidden_words)):
-                                print(f"✅ DEBUG_NOME - Nome encontrado com padrão {i}: '{nome_limpo}'", file=sys.stderr)
-                                return nome_limpo
+                    nome_limpo = nome.split('\n')[0].strip()  # Pegar apenas a primeira linha
+                    nome_limpo = re.sub(r'\s+', ' ', nome_limpo)  # Normalizar espaços
                     
-                    elif i >= 9:  # Padrões 9+: nomes mistos ou formatados
-                        # Para nomes em formato misto, verificar se tem pelo menos 2 palavras
-                        if (len(nome.split()) >= 2 and 
-                            not any(word.lower() in nome.lower() for word in ['banco', 'agencia', 'conta', 'valor', 'data', 'total', 'sispag', 'funcionario', 'departamento'])):
-                            
-                            nome_limpo = nome.split('\n')[0].strip()  # Pegar apenas a primeira linha
-                            nome_limpo = re.sub(r'\s+', ' ', nome_limpo)  # Normalizar espaços
-                            
-                            print(f"✅ DEBUG_NOME - Nome encontrado com padrão {i}: '{nome_limpo}'", file=sys.stderr)
-                            return nome_limpo
+                    print(f"✅ DEBUG_NOME - Nome encontrado com padrão {i}: '{nome_limpo}'", file=sys.stderr)
+                    return nome_limpo
         
         except Exception as e:
             print(f"❌ DEBUG_NOME - Erro no padrão {i}: {e}", file=sys.stderr)
@@ -415,29 +420,36 @@ def classify_document(text: str) -> str:
     else:
         return 'indefinido'
 
-def process_documents(pdf_paths: List[str]) -> List[Dict[str, Any]]:
-    """Processa múltiplos documentos PDF"""
+def process_documents(pdf_paths: List[str], conteudos: List[bytes] = None) -> List[Dict[str, Any]]:
+    """Processa múltiplos documentos PDF; com 'conteudos', os caminhos servem apenas como nomes dos arquivos"""
     results = []
+    conteudos = conteudos or [None] * len(pdf_paths)
     
     try:
         print(f"📋 DEBUG_PROCESSAMENTO - Iniciando processamento de {len(pdf_paths)} documentos", file=sys.stderr)
         
         # Extrair texto de todos os PDFs e classificar
+        processor = backend_pdf_processor.PontoProcessor()
         documentos = []
-        for path in pdf_paths:
+        for path, conteudo in zip(pdf_paths, conteudos):
             print(f"📄 DEBUG_PROCESSAMENTO - Processando: {path}", file=sys.stderr)
-            text = extract_text_from_pdf(path)
-            if text and len(text.strip()) > 50:
-                tipo = classify_document(text + " " + path.lower())
-                documentos.append({
-                    'path': path,
-                    'text': text,
-                    'tipo': tipo,
-                    'filename': os.path.basename(path)
-                })
-                print(f"📄 DEBUG_PROCESSAMENTO - Classificado como: {tipo}", file=sys.stderr)
-            else:
-                print(f"❌ DEBUG_PROCESSAMENTO - Texto insuficiente: {path}", file=sys.stderr)
+            with processor.open_document(path, conteudo) as documento:
+                text = extract_text_from_pdf(path, conteudo, processor, documento)
+                if text and len(text.strip()) > 50:
+                    tipo = classify_document(text + " " + path.lower())
+                    doc = {
+                        'path': path,
+                        'text': text,
+                        'tipo': tipo,
+                        'filename': os.path.basename(path)
+                    }
+                    if tipo == 'contracheque':
+                        # Verificar a assinatura enquanto as páginas renderizadas pelo OCR ainda estão em memória
+                        doc['assinatura'] = processor.detect_signature(text, path, documento)
+                    documentos.append(doc)
+                    print(f"📄 DEBUG_PROCESSAMENTO - Classificado como: {tipo}", file=sys.stderr)
+                else:
+                    print(f"❌ DEBUG_PROCESSAMENTO - Texto insuficiente: {path}", file=sys.stderr)
         
         # Separar contracheques e recibos
         contracheques = [doc for doc in documentos if doc['tipo'] == 'contracheque']
@@ -472,9 +484,8 @@ def process_documents(pdf_paths: List[str]) -> List[Dict[str, Any]]:
                 # Validar cálculo
                 calculo_ok = validate_calculo(valores['vencimentos'], valores['descontos'], valores['liquido'])
                 
-                # Verificar assinatura digital
-                processor = backend_pdf_processor.PontoProcessor()
-                tem_assinatura = processor.check_digital_signature(text, contracheque['path'])
+                # Assinatura digital (verificada na extração do texto)
+                tem_assinatura, metodo_assinatura = contracheque['assinatura']
                 
                 # Procurar recibo correspondente
                 recibo_correspondente = None
@@ -546,6 +557,7 @@ def process_documents(pdf_paths: List[str]) -> List[Dict[str, Any]]:
                     'liquido': valores['liquido'] or '0,00',
                     'status': status,
                     'detalhes': ', '.join(detalhes),
+                    'metodoAssinatura': metodo_assinatura,
                     'arquivo': contracheque['filename']
                 })
                 
@@ -562,6 +574,10 @@ def process_documents(pdf_paths: List[str]) -> List[Dict[str, Any]]:
         print(f"❌ Erro no processamento geral: {e}", file=sys.stderr)
         return []
 
+def processar_arquivo_contracheque(pdf_path: str, conteudo: bytes = None) -> List[Dict[str, Any]]:
+    """Ponto de entrada de biblioteca para um único arquivo: retorna os resultados já como objetos Python"""
+    return process_documents([pdf_path], [conteudo])
+
 def main():
     """Função principal"""
     try:
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do modo em lote: PDF com as folhas de vários colaboradores dividido pelo cabeçalho
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend_pdf_processor import PontoProcessor
+from padroes_ponto import RE_CABECALHO_COLABORADOR
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+def _pdf_em_lote():
+    """pont.pdf + pontoex.pdf + continuação sem cabeçalho de pontoex.pdf"""
+    import fitz  # PyMuPDF
+    lote = fitz.open()
+    for nome in ('pont.pdf', 'pontoex.pdf'):
+        with fitz.open(os.path.join(PASTA, nome)) as doc:
+            lote.insert_pdf(doc)
+    lote.new_page().insert_text((72, 72), "Observações do departamento pessoal")
+    conteudo = lote.tobytes()
+    lote.close()
+    return conteudo
+
+def _pdf_com_capa():
+    """Capa sem cabeçalho de colaborador + pont.pdf + pontoex.pdf"""
+    import fitz  # PyMuPDF
+    lote = fitz.open()
+    lote.new_page().insert_text((72, 72), "Relatório de frequência - julho/2025")
+    for nome in ('pont.pdf', 'pontoex.pdf'):
+        with fitz.open(os.path.join(PASTA, nome)) as doc:
+            lote.insert_pdf(doc)
+    conteudo = lote.tobytes()
+    lote.close()
+    return conteudo
+
+def test_cabecalho_colaborador():
+    texto = "Endereço: Rua X\nFULANO DE TAL - Período: 01/05/25 à 31/05/25\nPIS/PASEP: 1"
+    match = RE_CABECALHO_COLABORADOR.search(texto)
+    assert match.group(1) == 'FULANO DE TAL'
+    assert match.groups()[1:] == ('01/05/25', '31/05/25')
+    assert not RE_CABECALHO_COLABORADOR.search("Período: 01/05/25 à 31/05/25")
+    print("✅ Linha de cabeçalho do colaborador")
+
+def test_divisao_por_colaborador():
+    if not all(os.path.exists(os.path.join(PASTA, nome)) for nome in ('pont.pdf', 'pontoex.pdf')):
+        print("⚠️ PDFs de exemplo não encontrados, teste ignorado")
+        return
+    segmentos = PontoProcessor().split_by_collaborator('lote.pdf', _pdf_em_lote())
+    assert [(s['colaborador'], s['inicio'], s['fim']) for s in segmentos] == [
+        ('ADRIANO COSTA DE SOUZA ROQUE', 0, 0),
+        ('BRENO PADILHA DE LIMA', 1, 2),
+    ]
+    assert segmentos[1]['periodo'] == '01/07/25 à 31/07/25'
+    print("✅ Páginas divididas por colaborador")
+
+def test_capa_entra_no_primeiro_colaborador():
+    if not all(os.path.exists(os.path.join(PASTA, nome)) for nome in ('pont.pdf', 'pontoex.pdf')):
+        print("⚠️ PDFs de exemplo não encontrados, teste ignorado")
+        return
+    processor = PontoProcessor()
+    segmentos = processor.split_by_collaborator('lote.pdf', _pdf_com_capa())
+    assert [(s['colaborador'], s['inicio'], s['fim']) for s in segmentos] == [
+        ('ADRIANO COSTA DE SOUZA ROQUE', 0, 1),
+        ('BRENO PADILHA DE LIMA', 2, 2),
+    ]
+    assert [segmento for segmento, _, _ in processor.recortar_lote('lote.pdf', _pdf_com_capa())] == segmentos
+    print("✅ Páginas iniciais sem cabeçalho não viram um colaborador")
+
+def test_lote_igual_aos_avulsos():
+    if not all(os.path.exists(os.path.join(PASTA, nome)) for nome in ('pont.pdf', 'pontoex.pdf')):
+        print("⚠️ PDFs de exemplo não encontrados, teste ignorado")
+        return
+    processor = PontoProcessor()
+    resultados = processor.process_bulk_pdf('lote.pdf', _pdf_em_lote(), max_workers=2)
+    assert [r['colaborador'] for r in resultados] == ['ADRIANO COSTA DE SOUZA ROQUE', 'BRENO PADILHA DE LIMA']
+    assert [r['paginas'] for r in resultados] == ['1-1', '2-3']
+    # A assinatura digital de pontoex.pdf continua no trecho recortado
+    assert [r['assinatura'] for r in resultados] == [False, True]
+
+    avulso = processor.process_pdf(os.path.join(PASTA, 'pont.pdf'))
+    for chave in ('periodo', 'previsto', 'realizado', 'saldo', 'dias_processados'):
+        assert resultados[0][chave] == avulso[chave], chave
+    print("✅ Um resultado por colaborador, igual ao do PDF avulso")
+
+if __name__ == "__main__":
+    test_cabecalho_colaborador()
+    test_divisao_por_colaborador()
+    test_capa_entra_no_primeiro_colaborador()
+    test_lote_igual_aos_avulsos()
+    print("✅ Modo em lote OK")
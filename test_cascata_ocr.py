@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da cascata de OCR com um motor falso (confianças roteirizadas, sem Tesseract):
+parada antecipada pela confiança mínima, chave do cache de OCR com a versão do pré-processamento
+e OCR simples de reserva sobre PDFs só em memória
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import ocr_engine
+from backend_pdf_processor import DocumentoPDF, PontoProcessor
+from extraction_cache import ExtractionCache
+from ocr_engine import OCREngine
+
+TEXTO = "Folha de ponto assinado digitalmente pelo colaborador"
+
+class MotorRoteirizado(OCREngine):
+    """Devolve TEXTO com a próxima confiança do roteiro (a última se repete) e registra cada chamada"""
+
+    nome = 'roteirizado'
+
+    def __init__(self, confiancas):
+        self.confiancas = list(confiancas)
+        self.chamadas = []
+
+    def dados(self, img, lang, config=''):
+        conf = self.confiancas[min(len(self.chamadas), len(self.confiancas) - 1)]
+        self.chamadas.append((lang, config))
+        palavras = TEXTO.split()
+        return {
+            'block_num': [1] * len(palavras),
+            'par_num': [1] * len(palavras),
+            'line_num': [1] * len(palavras),
+            'conf': [conf] * len(palavras),
+            'text': [f"{palavra}{len(self.chamadas)}" if i == 0 else palavra for i, palavra in enumerate(palavras)],
+        }
+
+    def texto(self, img, lang, config=''):
+        self.chamadas.append((lang, config))
+        return TEXTO
+
+@contextmanager
+def _motor(confiancas):
+    original = ocr_engine._engine
+    motor = MotorRoteirizado(confiancas)
+    ocr_engine._engine = motor
+    try:
+        yield motor
+    finally:
+        ocr_engine._engine = original
+
+def _pdf_uma_pagina():
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    doc.new_page(width=200, height=100).insert_text((20, 50), "Folha de ponto")
+    conteudo = doc.tobytes()
+    doc.close()
+    return conteudo
+
+def test_cascata_para_na_primeira_variante_acima_do_limiar():
+    processor = PontoProcessor()
+    imagem = np.full((40, 120), 200, dtype=np.uint8)
+    with _motor([50, 80, 99]) as motor:
+        texto, conf, execucoes = processor._ocr_cascade_for_image(imagem, threshold=70)
+    # cinza (50) não basta; contraste (80) encerra a cascata antes das demais variantes e configurações
+    assert execucoes == 2 and len(motor.chamadas) == 2
+    assert conf == 80 and texto.startswith('Folha2')
+    print("✅ Cascata encerrada na primeira variante com confiança suficiente")
+
+def test_cascata_sem_limiar_devolve_a_melhor():
+    processor = PontoProcessor()
+    imagem = np.full((40, 120), 200, dtype=np.uint8)
+    # Seis variantes com a configuração principal, depois as três alternativas na melhor variante
+    with _motor([40, 60, 55, 30, 20, 10, 50, 65, 45]) as motor:
+        texto, conf, execucoes = processor._ocr_cascade_for_image(imagem, threshold=70)
+    assert execucoes == 9
+    principal, *alternativas = processor.OCR_CONFIGS
+    assert motor.chamadas[:6] == [(principal['lang'], principal['config'])] * 6
+    assert motor.chamadas[6:] == [(c['lang'], c['config']) for c in alternativas]
+    assert conf == 65 and texto.startswith('Folha8')
+    print("✅ Sem confiança suficiente, a cascata devolve o melhor resultado")
+
+def test_resolucao_maior_so_sem_confianca():
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)  # o OCR grava debug_ocr_<arquivo>.txt no diretório atual
+        try:
+            processor = PontoProcessor(cache=ExtractionCache(enabled=False))
+            processor.OCR_RESOLUTIONS = [1, 2]
+            with DocumentoPDF('ocr.pdf', processor.cache, conteudo=_pdf_uma_pagina()) as documento:
+                with _motor([95]) as motor:
+                    processor.extract_text_with_ocr('ocr.pdf', documento=documento)
+                assert len(motor.chamadas) == 1  # a resolução 2 não chega a ser lida
+        finally:
+            os.chdir(cwd)
+    print("✅ Resolução maior só quando a menor não atinge a confiança")
+
+def test_cache_ocr_com_versao_do_preprocessamento():
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)  # o OCR grava debug_ocr_<arquivo>.txt no diretório atual
+        try:
+            cache = ExtractionCache(cache_dir=os.path.join(tmp, 'cache'), enabled=True)
+            processor = PontoProcessor(cache=cache)
+            processor.OCR_RESOLUTIONS = [1]
+
+            with DocumentoPDF('ocr.pdf', cache, conteudo=_pdf_uma_pagina()) as documento:
+                # Entrada gravada antes da versão do pré-processamento entrar na chave (limiar fixo em 128)
+                antigos = {'threshold': 70, 'resolutions': [1], 'configs': processor.OCR_CONFIGS}
+                cache.set(documento.hash, 0, 'ocr', 'TEXTO DO LIMIAR ANTIGO', antigos)
+
+                with _motor([95]) as motor:
+                    texto = processor.extract_text_with_ocr('ocr.pdf', documento=documento)
+                    assert 'ANTIGO' not in texto and len(motor.chamadas) == 1
+
+                    # Mesma versão: a segunda leitura vem do cache, sem OCR
+                    assert processor.extract_text_with_ocr('ocr.pdf', documento=documento) == texto
+                    assert len(motor.chamadas) == 1
+        finally:
+            os.chdir(cwd)
+    print("✅ Cache de OCR não reaproveita textos de outro pré-processamento")
+
+def test_fallback_simples_de_pdf_em_memoria():
+    """Falha na cascata: o OCR simples lê os bytes do upload, cujo nome não existe em disco"""
+    class ProcessadorCascataQuebrada(PontoProcessor):
+        def _ocr_page(self, *args, **kwargs):
+            raise RuntimeError("falha na cascata")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            processor = ProcessadorCascataQuebrada(cache=ExtractionCache(enabled=False))
+            nome = 'upload.pdf [páginas 1-1]'
+            with DocumentoPDF(nome, processor.cache, conteudo=_pdf_uma_pagina()) as documento:
+                with _motor([95]) as motor:
+                    assert processor.extract_text_with_ocr(nome, documento=documento) == TEXTO + "\n"
+                    assert len(motor.chamadas) == 1
+        finally:
+            os.chdir(cwd)
+    print("✅ OCR simples de reserva lê o PDF em memória")
+
+if __name__ == "__main__":
+    test_cascata_para_na_primeira_variante_acima_do_limiar()
+    test_cascata_sem_limiar_devolve_a_melhor()
+    test_resolucao_maior_so_sem_confianca()
+    test_cache_ocr_com_versao_do_preprocessamento()
+    test_fallback_simples_de_pdf_em_memoria()
+    print("✅ Cascata de OCR OK")
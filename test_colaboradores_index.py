@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do índice de colaboradores: normalização sem acentos e recarga quando o arquivo muda
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from colaboradores_index import ColaboradoresIndex, distancia_limitada, normalizar_nome
+
+def _escrever(path, nomes):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(nomes) + '\n')
+
+def test_normalizar_nome():
+    assert normalizar_nome('  João  da Silva ') == 'JOAO DA SILVA'
+    assert normalizar_nome('MARIA-CONCEIÇÃO') == 'MARIA CONCEICAO'
+    assert normalizar_nome('') == ''
+
+def test_consulta_sem_acentos_e_caixa():
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, 'colaboradores_validos.txt')
+        _escrever(arquivo, ['JOSÉ DA CONCEIÇÃO', 'ANDRE LUIZ DA COSTA BRAZ', 'jose da conceicao'])
+
+        index = ColaboradoresIndex(arquivo=arquivo, check_interval=0)
+        assert len(index) == 2  # duplicata normalizada é descartada
+        assert index.contem('Jose da Conceicao')
+        assert index.contem('ANDRÉ LUIZ DA COSTA  BRAZ')
+        assert not index.contem('ANDRE LUIZ')
+
+def test_recarga_quando_arquivo_muda():
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, 'colaboradores_validos.txt')
+        _escrever(arquivo, ['BRENO PADILHA DE LIMA'])
+
+        index = ColaboradoresIndex(arquivo=arquivo, check_interval=0)
+        assert index.contem('BRENO PADILHA DE LIMA')
+
+        _escrever(arquivo, ['DANIEL WESLEY SILVA DOS SANTOS', 'BRENO PADILHA DE LIMA ROCHA'])
+        stat = os.stat(arquivo)
+        os.utime(arquivo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert index.contem('DANIEL WESLEY SILVA DOS SANTOS')
+        assert not index.contem('BRENO PADILHA DE LIMA')
+
+def test_intervalo_de_verificacao():
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, 'colaboradores_validos.txt')
+        _escrever(arquivo, ['BRENO PADILHA DE LIMA'])
+
+        index = ColaboradoresIndex(arquivo=arquivo, check_interval=3600)
+        assert index.contem('BRENO PADILHA DE LIMA')
+
+        # Dentro do intervalo a consulta não volta ao disco
+        os.remove(arquivo)
+        assert index.contem('BRENO PADILHA DE LIMA')
+
+def test_banco_indisponivel_usa_arquivo():
+    """Driver do banco ausente: create_engine falha e a lista vem só do arquivo"""
+    import colaboradores_index
+
+    def create_engine_sem_driver(*args, **kwargs):
+        raise ImportError("No module named 'MySQLdb'")
+
+    original = colaboradores_index.create_engine
+    colaboradores_index.create_engine = create_engine_sem_driver
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            arquivo = os.path.join(tmp, 'colaboradores_validos.txt')
+            _escrever(arquivo, ['BRENO PADILHA DE LIMA'])
+            index = ColaboradoresIndex(arquivo=arquivo, database_url='mysql://u:p@localhost/db', check_interval=0)
+            assert index.contem('BRENO PADILHA DE LIMA')
+            assert len(index) == 1
+    finally:
+        colaboradores_index.create_engine = original
+
+def test_distancia_limitada():
+    assert distancia_limitada('KITTEN', 'SITTING', 5) == 3
+    assert distancia_limitada('KITTEN', 'SITTING', 1) == 2  # limite excedido: limite + 1
+    assert distancia_limitada('ABC', 'ABC', 0) == 0
+
+def test_busca_aproximada_ocr():
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, 'colaboradores_validos.txt')
+        _escrever(arquivo, ['ADRIANO COSTA DE SOUZA ROQUE', 'ANDRE LUIZ DA COSTA BRAZ', 'BRENO PADILHA DE LIMA'])
+        index = ColaboradoresIndex(arquivo=arquivo, check_interval=0)
+
+        # Espaços perdidos e letras trocadas pelo OCR
+        assert index.melhor_correspondencia('ADRIANOCOSTADESOUZAROQUE') == ('ADRIANO COSTA DE SOUZA ROQUE', 1.0)
+        nome, score = index.melhor_correspondencia('ADRlANO COSTA DE S0UZA ROQUE')
+        assert nome == 'ADRIANO COSTA DE SOUZA ROQUE' and 0.85 <= score < 1.0
+        assert index.melhor_correspondencia('MENSALISTA JULHO') is None
+
+        texto = "TECHCOM TECNOLOGIA\nCNPJ: 00.000.000/0001-00\nNome:BRENOPADILHADELlMA Mensalista\n"
+        assert index.encontrar_no_texto(texto)[0] == 'BRENO PADILHA DE LIMA'
+
+if __name__ == "__main__":
+    test_normalizar_nome()
+    test_consulta_sem_acentos_e_caixa()
+    test_recarga_quando_arquivo_muda()
+    test_intervalo_de_verificacao()
+    test_banco_indisponivel_usa_arquivo()
+    test_distancia_limitada()
+    test_busca_aproximada_ocr()
+    print("✅ Índice de colaboradores OK")
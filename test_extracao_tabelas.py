@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste dos motores de tabelas: pontuação contra a referência e calibração por layout
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import extracao_tabelas
+from extracao_tabelas import BackendTabelas, SeletorTabelas, pontuar
+from extraction_cache import ExtractionCache
+from layouts_ponto import LAYOUTS
+
+CABECALHO = ['Data', 'Ent 1 - Sai 1', 'Ent 2 - Sai 2', 'C.PRE', 'H.NOT', 'H.FAL', 'H.EXT', 'E.NOT']
+LINHA = ['02/05/2025 - Sex', '07:42 - 12:46', '13:46 - 16:39', '08:00:00', '', '', '', '']
+
+class PaginaFalsa:
+    layout = LAYOUTS[0]
+    assinatura = 'trt_ponto:teste'
+
+class MotorFalso(BackendTabelas):
+    def __init__(self, nome, tabelas):
+        self.nome = nome
+        self.tabelas = tabelas
+        self.chamadas = 0
+
+    def extrair(self, pagina):
+        self.chamadas += 1
+        return self.tabelas
+
+def test_pontuacao():
+    referencia = [[['DIA', 'E1']], [CABECALHO, LINHA]]
+    assert pontuar([[CABECALHO, LINHA]], referencia, LAYOUTS[0]) == 1.0
+    # Células com quebras de linha ou None equivalem às vazias/espaçadas
+    quebrada = [c.replace(' - ', '\n- ') or None for c in LINHA]
+    assert pontuar([[CABECALHO, quebrada]], referencia, LAYOUTS[0]) == 1.0
+    # Linhas a mais (rodapé) reduzem a pontuação; sem a tabela do layout é zero
+    assert pontuar([[CABECALHO, LINHA, ['Carga Prevista'] + [None] * 7]], referencia, LAYOUTS[0]) == 2 / 3
+    assert pontuar([[['DIA', 'E1']]], referencia, LAYOUTS[0]) == 0.0
+    print("✅ Pontuação contra a tabela de referência")
+
+def test_calibracao_escolhe_mais_rapido_preciso():
+    referencia = [[CABECALHO, LINHA]]
+    motores = {
+        'pdfplumber': MotorFalso('pdfplumber', referencia),
+        'pymupdf': MotorFalso('pymupdf', [[CABECALHO, LINHA, ['Rodapé'] + [None] * 7]]),
+        'palavras': MotorFalso('palavras', referencia),
+    }
+    originais = extracao_tabelas.BACKENDS
+    extracao_tabelas.BACKENDS = motores
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            seletor = SeletorTabelas(ExtractionCache(cache_dir=pasta, enabled=True), amostras=2)
+            assert seletor.extrair(PaginaFalsa())[0] == 'pdfplumber'
+            assert seletor.extrair(PaginaFalsa())[0] == 'pdfplumber'
+            escolhido = seletor.backend_escolhido(PaginaFalsa.assinatura)
+            # pymupdf é descartado pela precisão; entre os precisos vence o mais rápido
+            assert escolhido in ('pdfplumber', 'palavras')
+
+            chamadas = motores['pymupdf'].chamadas
+            assert seletor.extrair(PaginaFalsa())[0] == escolhido
+            assert motores['pymupdf'].chamadas == chamadas
+
+            # A escolha persiste no cache para um novo seletor (outro processo)
+            novo = SeletorTabelas(ExtractionCache(cache_dir=pasta, enabled=True), amostras=2)
+            assert novo.backend_escolhido(PaginaFalsa.assinatura) == escolhido
+    finally:
+        extracao_tabelas.BACKENDS = originais
+    print("✅ Calibração fixa e guarda o motor do layout")
+
+def test_motores_no_cartao_ponto():
+    pdf_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pont.pdf')
+    if not os.path.exists(pdf_path):
+        print("⚠️ pont.pdf não encontrado, teste ignorado")
+        return
+    import pdfplumber
+    from backend_pdf_processor import DocumentoPDF
+    from extracao_tabelas import BACKENDS, PaginaTabelas
+
+    with DocumentoPDF(pdf_path, ExtractionCache(enabled=False)) as documento, pdfplumber.open(pdf_path) as pdf:
+        pagina = PaginaTabelas(pdf.pages[0], documento, 0)
+        assert pagina.assinatura.startswith('trt_ponto:')
+        referencia = BACKENDS['pdfplumber'].extrair(pagina)
+        assert pontuar(BACKENDS['palavras'].extrair(pagina), referencia, pagina.layout) == 1.0
+        assert pontuar(BACKENDS['pymupdf'].extrair(pagina), referencia, pagina.layout) > 0.9
+    print("✅ Motores comparados em pont.pdf")
+
+if __name__ == "__main__":
+    test_pontuacao()
+    test_calibracao_escolhe_mais_rapido_preciso()
+    test_motores_no_cartao_ponto()
+    print("✅ Motores de tabelas OK")
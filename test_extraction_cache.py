@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do cache de extração: chaves por conteúdo, parâmetros e eviction LRU
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from extraction_cache import ExtractionCache
+
+def test_cache_por_conteudo_e_parametros():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExtractionCache(cache_dir=tmp, max_bytes=10 * 1024 * 1024, enabled=True)
+
+        pdf_a = os.path.join(tmp, 'a.pdf')
+        pdf_b = os.path.join(tmp, 'b.pdf')
+        for path in (pdf_a, pdf_b):
+            with open(path, 'wb') as f:
+                f.write(b'%PDF-1.4 mesmo conteudo')
+
+        # Mesmo conteúdo em caminhos diferentes gera o mesmo hash
+        hash_a = cache.hash_file(pdf_a)
+        assert hash_a == cache.hash_file(pdf_b)
+
+        cache.set(hash_a, 0, 'ocr', 'TEXTO OCR', {'threshold': 70})
+        assert cache.get(hash_a, 0, 'ocr', {'threshold': 70}) == 'TEXTO OCR'
+
+        # Página ou parâmetros diferentes não colidem
+        assert cache.get(hash_a, 1, 'ocr', {'threshold': 70}) is None
+        assert cache.get(hash_a, 0, 'ocr', {'threshold': 80}) is None
+
+        # Estruturas com None (células vazias de tabelas) sobrevivem à serialização
+        tabelas = [[['01/07/2025', None, '08:00:00']]]
+        cache.set(hash_a, 0, 'pdfplumber', {'text': 'x', 'tables': tabelas})
+        assert cache.get(hash_a, 0, 'pdfplumber')['tables'] == tabelas
+
+def test_eviction_lru():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExtractionCache(cache_dir=tmp, max_bytes=3000, enabled=True)
+        valor = 'x' * 900
+
+        cache.set('h', 0, 'ocr', valor)
+        time.sleep(0.01)
+        cache.set('h', 1, 'ocr', valor)
+        time.sleep(0.01)
+
+        # Acessar a página 0 a torna a mais recente
+        assert cache.get('h', 0, 'ocr') == valor
+        time.sleep(0.01)
+
+        cache.set('h', 2, 'ocr', valor)
+        cache.set('h', 3, 'ocr', valor)
+
+        assert cache.get('h', 1, 'ocr') is None  # menos recentemente usada
+        assert cache.get('h', 3, 'ocr') == valor
+        assert cache._scan_size() <= 3000
+
+def test_memo_de_hashes_limitado():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExtractionCache(cache_dir=tmp, enabled=True, max_hashes=2)
+        paths = []
+        for nome in ('a', 'b', 'c'):
+            path = os.path.join(tmp, f'{nome}.pdf')
+            with open(path, 'wb') as f:
+                f.write(f'%PDF-1.4 {nome}'.encode())
+            paths.append(path)
+
+        cache.hash_file(paths[0])
+        cache.hash_file(paths[1])
+        cache.hash_file(paths[0])  # a volta a ser o mais recente
+        digest_c = cache.hash_file(paths[2])
+
+        memorizados = [key[0] for key in cache._hashes]
+        assert memorizados == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]
+        assert cache.hash_file(paths[2]) == digest_c == ExtractionCache.hash_bytes(b'%PDF-1.4 c')
+
+def test_cache_desabilitado():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExtractionCache(cache_dir=tmp, enabled=False)
+        cache.set('h', 0, 'ocr', 'texto')
+        assert cache.get('h', 0, 'ocr') is None
+
+if __name__ == "__main__":
+    test_cache_por_conteudo_e_parametros()
+    test_eviction_lru()
+    test_memo_de_hashes_limitado()
+    test_cache_desabilitado()
+    print("✅ Cache de extração OK")
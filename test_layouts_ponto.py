@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste dos layouts conhecidos: tabela da folha de ponto montada pelas coordenadas das palavras
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from layouts_ponto import agrupar_linhas, extrair_tabela, reconhecer_layout
+
+def _palavra(texto, x0, top):
+    return {'text': texto, 'x0': x0, 'x1': x0 + 6 * len(texto), 'top': top}
+
+def _linha(top, *palavras):
+    return [_palavra(texto, x0, top) for texto, x0 in palavras]
+
+CABECALHO = _linha(200, ('Data', 44), ('Ent', 110), ('1', 130), ('-', 140), ('Sai', 150), ('1', 172),
+                   ('Ent', 204), ('2', 224), ('-', 234), ('Sai', 244), ('2', 266), ('C.PRE', 310),
+                   ('H.NOT', 369), ('H.FAL', 425), ('H.EXT', 494), ('E.NOT', 551))
+
+def test_tabela_por_coordenadas():
+    palavras = (
+        _linha(70, ('FULANO', 10), ('DE', 60), ('TAL', 80), ('-', 100), ('Período:', 110))
+        + CABECALHO
+        + _linha(214, ('02/05/2025', 15), ('-', 70), ('Sex', 82), ('07:42', 101), ('-', 139), ('12:46', 154),
+                 ('13:46', 195), ('-', 237), ('16:39', 247), ('08:00:00', 303))
+        + _linha(228, ('03/05/2025', 15), ('-', 70), ('Sab', 82), ('ATESTADO', 200))
+        + _linha(242, ('Totais', 15), ('184:00:00', 300))
+        + _linha(290, ('Carga', 14), ('Prevista:', 41))
+    )
+    linhas = agrupar_linhas(palavras)
+    layout, assinatura, indice, faixas = reconhecer_layout(linhas)
+    assert layout.nome == 'trt_ponto' and assinatura.startswith('trt_ponto:')
+
+    tabela = extrair_tabela(layout, linhas, indice, faixas)
+    assert tabela[0] == ['Data', 'Ent 1 - Sai 1', 'Ent 2 - Sai 2', 'C.PRE', 'H.NOT', 'H.FAL', 'H.EXT', 'E.NOT']
+    assert tabela[1] == ['02/05/2025 - Sex', '07:42 - 12:46', '13:46 - 16:39', '08:00:00', '', '', '', '']
+    assert tabela[2][:3] == ['03/05/2025 - Sab', '', 'ATESTADO']
+    # A linha de totais ainda é da tabela; o rodapé, depois do espaço maior, não
+    assert tabela[-1][0] == 'Totais' and len(tabela) == 4
+    print("✅ Células pelas coordenadas das palavras")
+
+def test_layout_desconhecido():
+    linhas = agrupar_linhas(_linha(100, ('Nome', 10), ('Cargo', 80)) + _linha(114, ('FULANO', 10), ('ANALISTA', 80)))
+    assert reconhecer_layout(linhas) is None
+    print("✅ Layout desconhecido fica para a detecção genérica")
+
+if __name__ == "__main__":
+    test_tabela_por_coordenadas()
+    test_layout_desconhecido()
+    print("✅ Layouts conhecidos OK")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da extração do nome do colaborador nos contracheques pelos padrões de texto
+(com a lista de colaboradores vazia, para que a busca aproximada não responda antes dos padrões)
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import processador_contracheque
+from colaboradores_index import ColaboradoresIndex
+
+@contextmanager
+def _sem_lista_de_colaboradores():
+    original = processador_contracheque.get_colaboradores_index
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, 'colaboradores_validos.txt')
+        open(arquivo, 'w').close()
+        index = ColaboradoresIndex(arquivo=arquivo, check_interval=0)
+        processador_contracheque.get_colaboradores_index = lambda: index
+        try:
+            yield
+        finally:
+            processador_contracheque.get_colaboradores_index = original
+
+def test_nome_apos_coordenador():
+    texto = "TRIBUNAL REGIONAL\nCOORDENADOR TECNICO\nMARCELOFERREIRAGOMES 01/2025\nVencimentos 5.000,00"
+    with _sem_lista_de_colaboradores():
+        assert processador_contracheque.extract_colaborador_name(texto) == 'MARCELOFERREIRAGOMES'
+
+        # Palavras minúsculas na linha seguinte não são nome
+        assert processador_contracheque.extract_colaborador_name(
+            "COORDENADOR\nresponsavel pelo setor") != 'responsavel'
+
+        # Cargo na linha seguinte: descartado pelas palavras proibidas
+        assert processador_contracheque.extract_colaborador_name(
+            "COORDENADOR\nATENDIMENTO PRESENCIAL") != 'ATENDIMENTO'
+    print("✅ Nome na linha seguinte a COORDENADOR")
+
+def test_nome_apos_dois_pontos():
+    with _sem_lista_de_colaboradores():
+        assert processador_contracheque.extract_colaborador_name(
+            "Nome:BRENOPADILHADELIMA\n01/07/2025") == 'BRENOPADILHADELIMA'
+    print("✅ Nome no formato Nome:NOME")
+
+if __name__ == "__main__":
+    test_nome_apos_coordenador()
+    test_nome_apos_dois_pontos()
+    print("✅ Nome do colaborador nos contracheques OK")
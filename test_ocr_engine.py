@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do motor de OCR: leitura das configurações do Tesseract e da saída TSV, e o pool do tesserocr
+(com um módulo tesserocr falso, sem depender do Tesseract instalado)
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ocr_engine
+from ocr_engine import OCREngine, TesserocrEngine, interpretar_config, tsv_para_dados
+
+class TesserocrFalso:
+    """Imita a API do tesserocr: 'xxx' não tem traineddata e a imagem 'ruim' falha no reconhecimento"""
+
+    criadas = []
+
+    OEM = staticmethod(lambda valor: valor)
+    PSM = staticmethod(lambda valor: valor)
+
+    class PyTessBaseAPI:
+        def __init__(self, lang, oem, psm):
+            if lang == 'xxx':
+                raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+            self.lang = lang
+            self.imagem = None
+            self.encerrada = False
+            TesserocrFalso.criadas.append(self)
+
+        def SetVariable(self, nome, valor):
+            pass
+
+        def SetImage(self, img):
+            self.imagem = img
+
+        def GetUTF8Text(self):
+            if self.imagem == 'ruim':
+                raise RuntimeError("Failed to recognize")
+            return f"tesserocr:{self.imagem}"
+
+        def Clear(self):
+            self.imagem = None
+
+        def End(self):
+            self.encerrada = True
+
+class MotorAlternativo(OCREngine):
+    nome = 'alternativo'
+
+    def __init__(self):
+        self.chamadas = []
+
+    def texto(self, img, lang, config=''):
+        self.chamadas.append(img)
+        return f"alternativo:{img}"
+
+@contextmanager
+def _motor_falso(tamanho_pool=2):
+    """(motor tesserocr sobre o módulo falso, motor alternativo), restaurando o módulo no fim"""
+    original = ocr_engine.tesserocr
+    ocr_engine.tesserocr = TesserocrFalso
+    TesserocrFalso.criadas = []
+    alternativo = MotorAlternativo()
+    try:
+        yield TesserocrEngine(tamanho_pool=tamanho_pool, alternativo=alternativo), alternativo
+    finally:
+        ocr_engine.tesserocr = original
+
+def test_interpretar_config():
+    assert interpretar_config(r'--oem 3 --psm 6') == (3, 6, ())
+    assert interpretar_config('') == (3, 3, ())
+    oem, psm, variaveis = interpretar_config(r'--oem 1 --psm 3 -c tessedit_char_whitelist=ABC0123.,:-/')
+    assert (oem, psm) == (1, 3)
+    assert variaveis == (('tessedit_char_whitelist', 'ABC0123.,:-/'),)
+
+def test_tsv_para_dados():
+    tsv = "\n".join([
+        "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext",
+        "1\t1\t0\t0\t0\t0\t0\t0\t100\t50\t-1\t",
+        "5\t1\t1\t1\t1\t1\t10\t10\t30\t12\t96.5\tDocumento",
+        "5\t1\t1\t1\t1\t2\t45\t10\t30\t12\t91\tassinado",
+        "5\t1\t1\t1\t2\t1\t10\t30\t30\t12\t88.25\tdigitalmente",
+    ])
+    dados = tsv_para_dados(tsv)
+    assert dados['text'] == ['', 'Documento', 'assinado', 'digitalmente']
+    assert dados['conf'] == [-1.0, 96.5, 91.0, 88.25]
+    assert dados['line_num'] == [0, 1, 1, 2]
+
+    # A saída da API (GetTSVText) vem sem cabeçalho
+    sem_cabecalho = tsv_para_dados("\n".join(tsv.split("\n")[1:]))
+    assert sem_cabecalho == dados
+
+def test_pool_tesserocr():
+    with _motor_falso(tamanho_pool=2) as (motor, alternativo):
+        # Chamadas seguidas reaproveitam a mesma instância residente
+        assert motor.texto('a', 'por') == 'tesserocr:a'
+        assert motor.texto('b', 'por') == 'tesserocr:b'
+        assert len(TesserocrFalso.criadas) == 1
+
+        # Duas em uso ao mesmo tempo: uma segunda instância, até o tamanho do pool
+        chave = ('por', 3, 3, ())
+        with motor._api(chave) as primeira, motor._api(chave) as segunda:
+            assert primeira is not segunda
+        assert len(TesserocrFalso.criadas) == 2
+        # Outra configuração tem o seu próprio pool
+        motor.texto('c', 'por', '--psm 6')
+        assert len(TesserocrFalso.criadas) == 3
+        assert not alternativo.chamadas
+
+def test_falha_por_imagem_nao_desativa_a_configuracao():
+    with _motor_falso() as (motor, alternativo):
+        assert motor.texto('ruim', 'por') == 'alternativo:ruim'
+        # A próxima imagem volta para o tesserocr, na mesma instância
+        assert motor.texto('boa', 'por') == 'tesserocr:boa'
+        assert alternativo.chamadas == ['ruim']
+        assert not motor._falhas and len(TesserocrFalso.criadas) == 1
+
+def test_falha_ao_inicializar_usa_alternativo():
+    with _motor_falso() as (motor, alternativo):
+        assert motor.texto('a', 'xxx') == 'alternativo:a'
+        assert ('xxx', 3, 3, ()) in motor._falhas
+        # Sem nova tentativa de criar a API para essa chave; outros idiomas seguem no tesserocr
+        assert motor.texto('b', 'xxx') == 'alternativo:b'
+        assert motor.texto('c', 'por') == 'tesserocr:c'
+        assert motor._criadas[('xxx', 3, 3, ())] == 0
+
+def test_close_encerra_instancias():
+    with _motor_falso() as (motor, _):
+        motor.texto('a', 'por')
+        motor.texto('b', 'eng')
+        motor.close()
+        assert len(TesserocrFalso.criadas) == 2
+        assert all(api.encerrada for api in TesserocrFalso.criadas)
+        # Depois do close, uma nova chamada cria outra instância
+        assert motor.texto('c', 'por') == 'tesserocr:c'
+        assert len(TesserocrFalso.criadas) == 3
+
+if __name__ == "__main__":
+    test_interpretar_config()
+    test_tsv_para_dados()
+    test_pool_tesserocr()
+    test_falha_por_imagem_nao_desativa_a_configuracao()
+    test_falha_ao_inicializar_usa_alternativo()
+    test_close_encerra_instancias()
+    print("✅ Motor de OCR OK")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do registro de padrões: alternações de palavras-chave contra a busca por substring
+"""
+
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from padroes_ponto import (
+    compilar_palavras, RE_ASSINATURA_TABELA_ESPECIFICA, RE_ASSINATURA_TABELA_GENERICA, RE_CODIGOS_PROBLEMATICOS,
+    RE_EXCLUSOES_NOME, RE_ASSINATURA_TEXTO, RE_CPF
+)
+
+def test_frase_mais_longa_primeiro():
+    padrao = compilar_palavras(['assinado', 'assinado digitalmente', 'c.pre'])
+    assert padrao.search('ponto assinado digitalmente').group() == 'assinado digitalmente'
+    # Palavras são literais: o ponto não é curinga
+    assert not padrao.search('cxpre')
+    assert padrao.search('c.pre')
+
+def test_fuzz_equivalencia_com_substring():
+    rng = random.Random(14)
+    alfabeto = 'ABRSNMOPQ.* '
+    for _ in range(300):
+        palavras = list({''.join(rng.choice(alfabeto) for _ in range(rng.randint(1, 4))) for _ in range(6)})
+        texto = ''.join(rng.choice(alfabeto + alfabeto.lower()) for _ in range(rng.randint(0, 60)))
+        padrao = compilar_palavras(palavras)
+        assert bool(padrao.search(texto.upper())) == any(p in texto.upper() for p in palavras)
+
+def test_conjuntos_do_ponto():
+    assert RE_CODIGOS_PROBLEMATICOS.search('nmo pq rq ps rs'.upper())
+    assert not RE_CODIGOS_PROBLEMATICOS.search('JOAO DA SILVA')
+    assert RE_EXCLUSOES_NOME.search('Rua Nova Granada, Belo Horizonte'.upper())
+
+    linha = 'documento assinado digitalmente por fulano'
+    assert RE_ASSINATURA_TABELA_ESPECIFICA.search(linha).group() == 'documento assinado digitalmente'
+    assert RE_ASSINATURA_TABELA_GENERICA.search(linha).group() == 'documento assinado'
+    assert not RE_ASSINATURA_TABELA_ESPECIFICA.search('ponto assinado por fulano')
+
+def test_regex_pre_compiladas():
+    assert RE_ASSINATURA_TEXTO.search('assinatura   eletrônica do colaborador')
+    assert not RE_ASSINATURA_TEXTO.search('documento sem marca')
+    assert RE_CPF.search('cpf: 123.456.789-00').group() == '123.456.789-00'
+
+if __name__ == "__main__":
+    test_frase_mais_longa_primeiro()
+    test_fuzz_equivalencia_com_substring()
+    test_conjuntos_do_ponto()
+    test_regex_pre_compiladas()
+    print("✅ Registro de padrões OK")
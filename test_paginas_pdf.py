@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da leitura página a página: cada página é liberada antes da próxima
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def _pdf_de_teste(paginas):
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    for i in range(paginas):
+        doc.new_page().insert_text((72, 72), f"Pagina {i + 1} do documento de teste")
+    conteudo = doc.tobytes()
+    doc.close()
+    return conteudo
+
+def test_paginas_liberadas():
+    import io
+    from paginas_pdf import iterar_paginas
+
+    anteriores = []
+    textos = []
+    for indice, page in iterar_paginas(io.BytesIO(_pdf_de_teste(4))):
+        # A página anterior já não guarda layout nem objetos interpretados
+        assert all(not hasattr(p, '_layout') and not hasattr(p, '_objects') for p in anteriores)
+        textos.append((indice, page.extract_text()))
+        assert hasattr(page, '_objects')
+        anteriores.append(page)
+
+    assert [indice for indice, _ in textos] == [0, 1, 2, 3]
+    assert textos[2][1].startswith("Pagina 3")
+    print("✅ Cache de cada página liberado ao avançar")
+
+def test_subconjunto_de_paginas():
+    import io
+    from paginas_pdf import iterar_paginas
+
+    textos = {indice: page.extract_text() for indice, page in iterar_paginas(io.BytesIO(_pdf_de_teste(5)), [3, 1])}
+    assert sorted(textos) == [1, 3]
+    assert textos[3].startswith("Pagina 4")
+    print("✅ Só as páginas pedidas, com o índice original")
+
+def test_fios_de_tabela():
+    import fitz  # PyMuPDF
+    from paginas_pdf import tabelas_da_pagina, tem_fios_de_tabela
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Pagina so de texto")
+    sublinhado = doc.new_page()
+    sublinhado.draw_line((72, 80), (300, 80))
+    grade = doc.new_page()
+    for y in (100, 120, 140):
+        grade.draw_line((72, y), (300, y))
+    for x in (72, 180, 300):
+        grade.draw_line((x, 100), (x, 140))
+    for y in (115, 135):
+        grade.insert_text((76, y), "Item")
+        grade.insert_text((184, y), "Valor")
+    caixa = doc.new_page()
+    caixa.draw_rect(fitz.Rect(72, 100, 300, 140))
+
+    assert [tem_fios_de_tabela(doc[i]) for i in range(4)] == [False, False, True, True]
+    # Onde não há fios o find_tables também não acha tabelas
+    assert not doc[0].find_tables().tables and not doc[1].find_tables().tables
+    assert len(doc[2].find_tables().tables) == 1
+    assert [len(tabelas_da_pagina(doc[i])) for i in range(3)] == [0, 0, 1]
+    doc.close()
+    print("✅ Páginas sem fios de tabela identificadas")
+
+if __name__ == "__main__":
+    test_paginas_liberadas()
+    test_subconjunto_de_paginas()
+    test_fios_de_tabela()
+    print("✅ Leitura página a página OK")
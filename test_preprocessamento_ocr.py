@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do pré-processamento vetorizado do OCR: limiar de Otsu, variantes sobre um único buffer e redução de escala
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from preprocessamento_ocr import NOMES_VARIANTES, gerar_variante, limiar_otsu, reduzir, variantes
+
+def _imagem_bimodal():
+    """Texto escuro (40) sobre fundo claro (220), com um pouco de ruído"""
+    rng = np.random.default_rng(18)
+    img = np.full((60, 80), 220, dtype=np.uint8)
+    img[20:40, 10:70] = 40
+    ruido = rng.integers(-10, 10, img.shape)
+    return np.clip(img.astype(np.int16) + ruido, 0, 255).astype(np.uint8)
+
+def test_limiar_otsu():
+    img = _imagem_bimodal()
+    limiar = limiar_otsu(img)
+    assert 50 < limiar < 210
+    binaria = gerar_variante(img, 'otsu')
+    assert set(np.unique(binaria)) == {0, 255}
+    assert (binaria[20:40, 10:70] == 0).all() and (binaria[:10] == 255).all()
+
+def test_limiar_otsu_plato():
+    """Só dois níveis: a variância entre classes é máxima em todo o intervalo vazio entre eles"""
+    img = np.full((10, 10), 200, dtype=np.uint8)
+    img[:3] = 100
+    # Qualquer t em [100, 199] dá a mesma variância; o limiar fica no meio do platô, não na borda
+    assert limiar_otsu(img) == 151
+    img[:5] = 40
+    img[5:] = 220
+    assert limiar_otsu(img) == 131
+    binaria = gerar_variante(img, 'otsu')
+    assert (binaria[:5] == 0).all() and (binaria[5:] == 255).all()
+
+def test_variantes():
+    img = _imagem_bimodal()
+    nomes = []
+    for nome, variante in variantes(img):
+        nomes.append(nome)
+        assert variante.shape == img.shape and variante.dtype == np.uint8
+        # Cada variante gerada no buffer compartilhado é igual à gerada isoladamente
+        assert np.array_equal(variante, gerar_variante(img, nome))
+    assert tuple(nomes) == NOMES_VARIANTES
+
+    assert np.array_equal(gerar_variante(img, 'invertida'), 255 - img)
+    assert gerar_variante(img, 'cinza') is img
+    # Suavizar uma imagem constante não a altera
+    constante = np.full((5, 5), 100, dtype=np.uint8)
+    assert (gerar_variante(constante, 'suavizada') == 100).all()
+    assert (gerar_variante(constante, 'nitidez') == 100).all()
+
+def test_reducao_de_escala():
+    """Renderização única na maior escala: 6x reduzida para 2x e 4x"""
+    img = _imagem_bimodal()
+    assert reduzir(img, 1.0) is img
+    menor = reduzir(img, 2 / 6)
+    assert menor.shape == (20, 27) and menor.dtype == np.uint8
+    assert reduzir(img, 4 / 6).shape == (40, 53)
+    # A média por área preserva o nível do fundo
+    assert abs(int(menor[0, 0]) - 220) <= 10
+
+if __name__ == "__main__":
+    test_limiar_otsu()
+    test_limiar_otsu_plato()
+    test_variantes()
+    test_reducao_de_escala()
+    print("✅ Pré-processamento do OCR OK")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do processamento de vários PDFs em paralelo: ordem de entrada e falha isolada por arquivo
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend_pdf_processor import PontoProcessor
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+def test_ordem_e_falha_isolada():
+    pont = os.path.join(PASTA, 'pont.pdf')
+    if not os.path.exists(pont):
+        print("⚠️ pont.pdf não encontrado, teste ignorado")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        invalido = os.path.join(tmp, 'invalido.pdf')
+        with open(invalido, 'wb') as f:
+            f.write(b'isto nao e um PDF')
+
+        processor = PontoProcessor()
+        resultados = processor.process_multiple_pdfs_parallel([invalido, pont, invalido], max_workers=2)
+
+    assert len(resultados) == 3
+    # O arquivo inválido vira uma entrada de erro na sua posição; o lote continua
+    assert 'error' in resultados[0] and 'error' in resultados[2]
+    assert 'invalido.pdf' in resultados[0]['error']
+    assert 'error' not in resultados[1]
+    assert resultados[1]['colaborador'] == 'ADRIANO COSTA DE SOUZA ROQUE'
+    print("✅ Resultados na ordem de entrada, com erro isolado por arquivo")
+
+if __name__ == "__main__":
+    test_ordem_e_falha_isolada()
+    print("✅ Processamento paralelo OK")
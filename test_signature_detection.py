@@ -77,5 +77,83 @@ def test_signature_patterns():
     
     print("\n=== TESTE CONCLUÍDO ===")
 
+def test_signature_method():
+    """Testa o método informado pela detecção (sem PDF não há verificação estrutural nem OCR)"""
+    processor = PontoProcessor()
+    
+    assinado, metodo = processor.detect_signature("Documento assinado digitalmente")
+    assert assinado and metodo == 'texto', metodo
+    print(f"Texto assinado: ✅ PASSOU ({metodo})")
+    
+    assinado, metodo = processor.detect_signature("Cartão ponto emitido em 01/01/2025")
+    assert not assinado and metodo == 'nenhum', metodo
+    print(f"Texto sem assinatura: ✅ PASSOU ({metodo})")
+    
+    # Com um PDF, a estrutura (campos /Sig, /ByteRange) é verificada antes do texto e do OCR
+    if os.path.exists('pont.pdf'):
+        with processor.open_document('pont.pdf') as documento:
+            estrutura = documento.assinatura_estrutural()
+            print(f"Assinatura estrutural em pont.pdf: {estrutura or 'nenhuma'}")
+
+def _pdf_em_memoria(montar=None):
+    """PDF de uma página com texto sem assinatura; montar(doc) acrescenta a estrutura a testar"""
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Folha de ponto - julho/2025")
+    if montar:
+        montar(doc)
+    conteudo = doc.tobytes()
+    doc.close()
+    return conteudo
+
+def _dicionario_byterange(doc):
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<</Type/Sig/Filter/Adobe.PPKLite/ByteRange[0 100 200 300]/Contents<0011>>>")
+
+def _campo_assinatura(doc, preenchido=False):
+    import fitz  # PyMuPDF
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_SIGNATURE
+    widget.field_name = "Assinatura"
+    widget.rect = fitz.Rect(50, 50, 200, 100)
+    doc[0].add_widget(widget)
+    if preenchido:
+        # Sem SigFlags no AcroForm: só o valor (/V) do campo indica a assinatura
+        xref = doc.get_new_xref()
+        doc.update_object(xref, "<</Type/Sig/Contents<0011>>>")
+        doc.xref_set_key(next(doc[0].widgets()).xref, "V", f"{xref} 0 R")
+        doc.xref_set_key(doc.pdf_catalog(), "AcroForm/SigFlags", "0")
+
+def test_signature_structure():
+    """Assinatura na estrutura do PDF decide sem texto nem OCR; PDF comum sem OCR dá (False, 'nenhum')"""
+    from extraction_cache import ExtractionCache
+    from backend_pdf_processor import DocumentoPDF
+
+    chamadas_ocr = []
+
+    class ProcessadorSemOCR(PontoProcessor):
+        def extract_text_with_ocr(self, *args, **kwargs):
+            chamadas_ocr.append(args)
+            return ""
+
+    processor = ProcessadorSemOCR()
+    casos = [
+        (_dicionario_byterange, '/ByteRange'),
+        (_campo_assinatura, '/SigFlags'),
+        (lambda doc: _campo_assinatura(doc, preenchido=True), 'campo /Sig'),
+    ]
+    for montar, descricao in casos:
+        with DocumentoPDF('assinado.pdf', ExtractionCache(enabled=False), conteudo=_pdf_em_memoria(montar)) as documento:
+            assert descricao in documento.assinatura_estrutural()
+            assert processor.detect_signature("Folha de ponto", 'assinado.pdf', documento) == (True, 'estrutura')
+
+    with DocumentoPDF('comum.pdf', ExtractionCache(enabled=False), conteudo=_pdf_em_memoria()) as documento:
+        assert documento.assinatura_estrutural() is None
+        assert processor.detect_signature("Folha de ponto", 'comum.pdf', documento, usar_ocr=False) == (False, 'nenhum')
+    assert not chamadas_ocr
+    print("Assinatura estrutural (/ByteRange, /SigFlags, campo /Sig): ✅ PASSOU")
+
 if __name__ == "__main__":
-    test_signature_patterns()
\ No newline at end of file
+    test_signature_patterns()
+    test_signature_method()
+    test_signature_structure()
\ No newline at end of file
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do tokenizador de linhas diárias do ponto: equivalência com as regex antigas e entradas patológicas
+"""
+
+import os
+import random
+import re
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from tokenizador_ponto import extrair_dias_estrito, extrair_dias_tolerante, tokenizar
+
+# Implementação anterior de parse_daily_entries, usada como referência
+def _referencia_estrita(text):
+    dias = []
+    for data in re.findall(r'(\d{2}/\d{2}/\d{4})', text):
+        linha_pattern = rf'{re.escape(data)}[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?([0-9]{{1,2}}:[0-9]{{2}})[^0-9]*?(0[68]:00:00)'
+        match = re.search(linha_pattern, text)
+        if match:
+            dias.append((data,) + match.groups())
+    return dias
+
+def _referencia_tolerante(text):
+    alt_pattern = r'(\d{2}/\d{2}/\d{4}).*?(\d{1,2}:\d{2}).*?(\d{1,2}:\d{2}).*?(\d{1,2}:\d{2}).*?(\d{1,2}:\d{2}).*?(0[68]:00:00)'
+    return [match.groups() for match in re.finditer(alt_pattern, text)]
+
+def _tupla(dia):
+    return (dia['data'], dia['campo1'], dia['campo2'], dia['campo3'], dia['campo4'], dia['cpre'])
+
+def _texto_aleatorio(rng, n_tokens):
+    """Tokens bem formados (datas, horários, C.PRE, números, palavras) com separadores sem dígitos"""
+    geradores = [
+        lambda: f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+        lambda: f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+        lambda: f"{rng.randint(0, 9)}:{rng.randint(0, 59):02d}",
+        lambda: rng.choice(['06:00:00', '08:00:00', '07:30:00', '00:00:00']),
+        lambda: str(rng.randint(0, 999)),
+        lambda: rng.choice(['SEG', 'TER', 'Folga', 'C.PRE', 'Feriado', '-', '|']),
+    ]
+    partes = []
+    for _ in range(n_tokens):
+        partes.append(rng.choice(geradores)())
+        partes.append(rng.choice([' ', '  ', ' | ', ' - ', ' x ']))
+    return ''.join(partes)
+
+def test_linha_tipica():
+    texto = "01/07/2025 TER 07:30 12:00 13:00 17:30 08:00:00 02/07/2025 QUA 07:00 11:00 12:00 14:00 06:00:00"
+    dias = extrair_dias_estrito(texto)
+    assert [_tupla(d) for d in dias] == [
+        ('01/07/2025', '07:30', '12:00', '13:00', '17:30', '08:00:00'),
+        ('02/07/2025', '07:00', '11:00', '12:00', '14:00', '06:00:00'),
+    ]
+    assert [t.tipo for t in tokenizar("01/07/2025 07:30 08:00:00 9")] == ['data', 'hora', 'hora_seg', 'digito']
+
+def test_fuzz_equivalencia_com_regex():
+    rng = random.Random(1234)
+    for _ in range(500):
+        texto = _texto_aleatorio(rng, rng.randint(0, 40))
+
+        assert [_tupla(d) for d in extrair_dias_tolerante(texto)] == _referencia_tolerante(texto), texto
+
+        # A regex antiga buscava cada data a partir do início do texto: vale a primeira linha válida de cada data
+        primeiras = {}
+        for dia in extrair_dias_estrito(texto):
+            primeiras.setdefault(dia['data'], _tupla(dia))
+        esperado = [primeiras[data] for data in re.findall(r'(\d{2}/\d{2}/\d{4})', texto) if data in primeiras]
+        assert esperado == _referencia_estrita(texto), texto
+
+def test_fuzz_caracteres_arbitrarios():
+    rng = random.Random(99)
+    for _ in range(300):
+        texto = ''.join(rng.choice('0123456789/: .-aZ\n') for _ in range(rng.randint(0, 300)))
+        for dia in extrair_dias_estrito(texto) + extrair_dias_tolerante(texto):
+            assert re.fullmatch(r'\d{2}/\d{2}/\d{4}', dia['data'])
+            assert dia['cpre'] in ('06:00:00', '08:00:00')
+            assert all(re.fullmatch(r'\d{1,2}:\d{2}', dia[f'campo{i}']) for i in range(1, 5))
+
+def test_entradas_patologicas_em_tempo_linear():
+    # Muitas datas e horários sem nenhum C.PRE: o padrão alternativo antigo retrocedia sobre o texto inteiro
+    casos = [
+        "01/07/2025 " + "1:11 " * 50000,
+        ("01/07/2025 12:00 " * 20000),
+        "0" * 200000,
+        "1:1:1:1:1:" * 20000,
+        "01/07/2025" * 20000,
+    ]
+    for texto in casos:
+        inicio = time.perf_counter()
+        extrair_dias_estrito(texto)
+        extrair_dias_tolerante(texto)
+        assert time.perf_counter() - inicio < 2.0
+
+if __name__ == "__main__":
+    test_linha_tipica()
+    test_fuzz_equivalencia_com_regex()
+    test_fuzz_caracteres_arbitrarios()
+    test_entradas_patologicas_em_tempo_linear()
+    print("✅ Tokenizador de ponto OK")
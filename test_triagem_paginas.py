@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da triagem de páginas (camada de texto, OCR ou ambos) e das regiões de interesse do OCR
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend_pdf_processor import DocumentoPDF
+from extraction_cache import ExtractionCache
+
+class DocumentoFalso(DocumentoPDF):
+    """Páginas e cobertura de imagens definidas no teste, sem abrir PDF"""
+
+    def __init__(self, textos, coberturas):
+        super().__init__('falso.pdf', ExtractionCache(enabled=False), conteudo=b'%PDF-falso')
+        self._pages = [{'text': texto, 'tables': []} for texto in textos]
+        self.coberturas = coberturas
+
+    def _cobertura_imagens(self, page_num):
+        return self.coberturas[page_num]
+
+def test_triagem():
+    texto_nativo = "CONTRACHEQUE Mensalista Vencimentos 7.066,00 Descontos 1.648,00 Líquido 5.418,00"
+    texto_cid = " ".join("(cid:%d)" % i for i in range(40)) + " Nome"
+
+    documento = DocumentoFalso(
+        [texto_nativo, "", texto_cid, texto_nativo],
+        [0.0, 1.0, 0.0, 0.9]
+    )
+    assert documento.triagem_paginas() == ['texto', 'ocr', 'ocr', 'ambos']
+    print("✅ Triagem: texto nativo sem OCR, páginas escaneadas e com CID para OCR")
+
+def test_unir_regioes():
+    import fitz  # PyMuPDF
+    regioes = [fitz.Rect(0, 0, 10, 10), fitz.Rect(5, 5, 20, 20), fitz.Rect(100, 100, 110, 110)]
+    unidas = DocumentoPDF._unir_regioes(regioes)
+    assert sorted(tuple(r) for r in unidas) == [(0, 0, 20, 20), (100, 100, 110, 110)]
+    print("✅ Regiões de interesse sobrepostas são fundidas")
+
+def _pdf_com_imagem(largura_imagem):
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    page = doc.new_page(width=600, height=800)
+    page.insert_text((72, 72), "Folha de ponto")
+    pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 40, 20), False)
+    pixmap.clear_with(128)
+    page.insert_image(fitz.Rect(50, 300, 50 + largura_imagem, 400), pixmap=pixmap)
+    conteudo = doc.tobytes()
+    doc.close()
+    return conteudo
+
+def test_regioes_interesse():
+    with DocumentoPDF('imagem.pdf', ExtractionCache(enabled=False), conteudo=_pdf_com_imagem(200)) as documento:
+        regioes = documento.regioes_interesse(0)
+        # A imagem (com a margem) e a faixa do rodapé, de cima para baixo
+        assert len(regioes) == 2
+        x0, y0, x1, y1 = regioes[0]
+        assert x0 <= 50 and y0 <= 300 and x1 >= 250 and y1 >= 400
+        assert regioes[1][1] <= 800 * (1 - DocumentoPDF.ROI_FAIXA_RODAPE)
+
+    # Imagem ocupando quase a página toda: OCR da página inteira
+    with DocumentoPDF('imagem.pdf', ExtractionCache(enabled=False), conteudo=_pdf_com_imagem(550)) as documento:
+        documento.ROI_MAX_COBERTURA = 0.1
+        assert documento.regioes_interesse(0) is None
+    print("✅ Regiões de interesse: imagens e rodapé, ou página inteira se cobrirem demais")
+
+def test_assinatura_ocr_uma_passada():
+    """Documento sem assinatura: o OCR por regiões não é seguido de um segundo OCR da página inteira"""
+    from backend_pdf_processor import PontoProcessor
+
+    chamadas = []
+
+    class ProcessadorFalso(PontoProcessor):
+        def extract_text_with_ocr(self, pdf_path, doc_type='ponto', documento=None, paginas=None, roi=False):
+            chamadas.append(roi)
+            return "FOLHA DE PONTO SEM CARIMBO"
+
+    pdf_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pont.pdf')
+    if not os.path.exists(pdf_path):
+        print("⚠️ pont.pdf não encontrado, teste ignorado")
+        return
+    assert ProcessadorFalso().detect_signature("Folha de ponto", pdf_path) == (False, 'nenhum')
+    assert chamadas == [True]
+    print("✅ Assinatura: uma única passada de OCR por regiões")
+
+def test_documento_aberto_pelo_metodo_e_fechado():
+    """Sem documento do chamador, cada extração abre o seu e o fecha no fim (inclusive com erro)"""
+    from backend_pdf_processor import PontoProcessor
+
+    fechados = []
+
+    class DocumentoRegistrado(DocumentoPDF):
+        def close(self):
+            fechados.append(self.pdf_path)
+            super().close()
+
+    class ProcessadorRegistrado(PontoProcessor):
+        def open_document(self, pdf_path, conteudo=None):
+            return DocumentoRegistrado(pdf_path, ExtractionCache(enabled=False), conteudo)
+
+    processor = ProcessadorRegistrado()
+    pdf_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pont.pdf')
+    if os.path.exists(pdf_path):
+        processor.extract_text_from_pdf(pdf_path)
+        processor.extract_table_data(pdf_path)
+        assert fechados == [pdf_path, pdf_path]
+
+    # Arquivo inexistente: a extração falha e o documento aberto para ela é fechado mesmo assim
+    fechados.clear()
+    assert processor.extract_text_from_pdf('inexistente.pdf') == ""
+    assert processor.extract_table_data('inexistente.pdf') == []
+    assert fechados == ['inexistente.pdf', 'inexistente.pdf']
+
+    # Documento do chamador continua aberto
+    fechados.clear()
+    with processor.open_document('inexistente.pdf') as documento:
+        processor.extract_table_data('inexistente.pdf', documento)
+        assert fechados == []
+    print("✅ Documentos abertos pelas extrações são fechados")
+
+if __name__ == "__main__":
+    test_triagem()
+    test_unir_regioes()
+    test_regioes_interesse()
+    test_assinatura_ocr_uma_passada()
+    test_documento_aberto_pelo_metodo_e_fechado()
+    print("✅ Triagem de páginas OK")
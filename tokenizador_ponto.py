@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tokenizador das linhas diárias do cartão de ponto
+Percorre o texto uma única vez emitindo tokens de data, horário e C.PRE e monta os registros de cada dia,
+com custo linear no tamanho do documento (sem regex por data nem cadeias de '.*?' sobre o texto inteiro)
+"""
+
+import re
+from typing import Dict, Iterator, List, NamedTuple
+
+# Alternativas de tamanho limitado: cada posição do texto é examinada uma vez.
+# 'digito' consome dígitos soltos um a um, para que um horário possa começar no meio de um número (ex.: 123:45 -> 23:45)
+TOKEN_RE = re.compile(
+    r'(?P<data>\d{2}/\d{2}/\d{4})'
+    r'|(?P<hora_seg>\d{1,2}:\d{2}:\d{2})'
+    r'|(?P<hora>\d{1,2}:\d{2})'
+    r'|(?P<digito>\d)'
+)
+
+CPRE_VALIDOS = ('06:00:00', '08:00:00')
+CAMPOS_POR_DIA = 4
+
+
+class Token(NamedTuple):
+    tipo: str  # 'data', 'hora_seg', 'hora' ou 'digito'
+    valor: str
+    pos: int
+
+
+def tokenizar(text: str) -> Iterator[Token]:
+    for match in TOKEN_RE.finditer(text):
+        yield Token(match.lastgroup, match.group(), match.start())
+
+
+def _registro(data: str, horas: List[str], cpre: str) -> Dict:
+    registro = {'data': data}
+    for i, hora in enumerate(horas, 1):
+        registro[f'campo{i}'] = hora
+    registro['cpre'] = cpre
+    return registro
+
+
+def extrair_dias_estrito(text: str) -> List[Dict]:
+    """
+    DATA, quatro horários HH:MM e C.PRE (06:00:00 ou 08:00:00) em sequência, separados apenas por texto sem dígitos.
+    Qualquer outro número no meio descarta a linha
+    """
+    dias = []
+    data = None
+    horas = []
+    for token in tokenizar(text):
+        if token.tipo == 'data':
+            data, horas = token.valor, []
+        elif data is None:
+            continue
+        elif len(horas) < CAMPOS_POR_DIA and token.tipo == 'hora':
+            horas.append(token.valor)
+        else:
+            if len(horas) == CAMPOS_POR_DIA and token.tipo == 'hora_seg' and token.valor in CPRE_VALIDOS:
+                dias.append(_registro(data, horas, token.valor))
+            data, horas = None, []
+    return dias
+
+
+def extrair_dias_tolerante(text: str) -> List[Dict]:
+    """
+    DATA seguida dos quatro primeiros horários e do primeiro C.PRE depois deles, ignorando o que houver no meio.
+    Horários com segundos valem como HH:MM; a próxima linha começa depois do C.PRE encontrado
+    """
+    dias = []
+    data = None
+    horas = []
+    for token in tokenizar(text):
+        if data is None:
+            if token.tipo == 'data':
+                data, horas = token.valor, []
+        elif len(horas) < CAMPOS_POR_DIA:
+            if token.tipo == 'hora':
+                horas.append(token.valor)
+            elif token.tipo == 'hora_seg':
+                horas.append(token.valor[:-3])
+        elif token.tipo == 'hora_seg' and token.valor in CPRE_VALIDOS:
+            dias.append(_registro(data, horas, token.valor))
+            data = None
+    return dias